@@ -0,0 +1,430 @@
+import argparse
+import gc
+import json
+import math
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+import numpy as np
+
+from components.evaluate import evaluate_recursive
+from components.phase_timer import PhaseTimer
+from components.renderers.svg_renderer import SvgRenderer
+from components.renderers.raster_renderer import RasterRenderer
+from components.fractals.fractal import FractalType
+from components.fractals.graphics import LSystem_geometry, load_palette, TEA_cell_color
+from components.fractals.checker import determine_fractal_type
+from components.fractals.lsystem import LSystem
+from components.fractals.ifs import IFS
+from components.fractals.tea import TEA
+from components.vector import Vector
+
+
+# Directory of the bundled fractal definitions (one subdirectory for each fractal type)
+DEFINITIONS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "components", "json")
+COLORS_FILE = os.path.join(DEFINITIONS, "colors", "basic.json")
+TYPES = ("lsystems", "ifs", "tea")
+
+# Parameters of the runs of every definition: iteration counts (drawn into a window of the given size) for
+# L-systems and IFS, grid sizes for TEA (an iteration count of None means the count given by the definition)
+LADDERS = {
+    "quick": {
+        "lsystems": [(2, 640, 480), (3, 640, 480)],
+        "ifs": [(2, 640, 480), (4, 640, 480)],
+        "tea": [(50, 160, 120)],
+    },
+    "full": {
+        "lsystems": [(2, 640, 480), (4, 640, 480), (6, 1280, 720)],
+        "ifs": [(2, 640, 480), (4, 640, 480), (6, 1280, 720)],
+        "tea": [(None, 320, 240), (None, 640, 480)],
+    },
+}
+
+# Runs with fewer figures than this are compared to the naive reference implementation
+REFERENCE_LIMIT = 200000
+
+# Changes of phase times shorter than this are ignored when comparing to a baseline (timer noise)
+MIN_DELTA = 0.005
+
+# Maximum fraction of TEA cells which may differ from the double precision reference without orbit sharing (points
+# next to the boundary may escape at a different iteration in another precision or inherit the escape time of a
+# neighbouring orbit)
+TEA_MISMATCH_LIMIT = 0.01
+
+
+def parse_console_arguments() -> dict:
+    """
+    Parses command line arguments of the benchmark.
+
+    Returns:
+        dict: A dictionary containing the parsed command line arguments.
+    """
+    parser = argparse.ArgumentParser(description="Fractal Generator Benchmark")
+
+    parser.add_argument("-ladder", type=str, choices=sorted(LADDERS), default="quick", help="Iteration counts and resolutions of the runs (default: quick)")
+    parser.add_argument("-types", type=str, nargs="+", choices=TYPES, default=list(TYPES), help="Fractal types to run (default: all)")
+    parser.add_argument("-filter", type=str, default=None, help="Run only definitions whose file name contains the given text")
+    parser.add_argument("-repeat", type=int, default=3, help="Number of timed runs of every case, the fastest is reported (default: 3)")
+    parser.add_argument("-output", type=str, default=None, help="Path to save the results as JSON")
+    parser.add_argument("-baseline", type=str, default=None, help="Path of saved results to compare with (exits with status 1 on a regression)")
+    parser.add_argument("-threshold", type=float, default=0.25, help="Relative slowdown or memory growth reported as a regression (default: 0.25)")
+    parser.add_argument("--no-memory", action="store_true", help="Don't measure the peak memory (an extra traced run of every case)")
+    parser.add_argument("--no-check", action="store_true", help="Don't compare the outputs to the reference implementations")
+
+    return vars(parser.parse_args())
+
+
+def load_definition(path: str, timer: PhaseTimer) -> tuple:
+    """
+    Loads a fractal definition (timed as the 'load' phase).
+
+    Parameters:
+        path (str): The path of the JSON definition.
+        timer (PhaseTimer): The timer of the run.
+
+    Returns:
+        tuple: The definition and its fractal type.
+    """
+    with timer.phase("load"):
+        with open(path) as f:
+            fractal = json.loads(f.read())
+        fractal_type = determine_fractal_type(fractal)
+        if fractal_type == FractalType.IFS:
+            fractal['mappings'] = evaluate_recursive(fractal['mappings'])
+            fractal['starting_figure'] = evaluate_recursive(fractal['starting_figure'])
+    return fractal, fractal_type
+
+
+def run_LSystem(fractal: dict, iterations: int, width: int, height: int, svg_path: str, timer: PhaseTimer) -> tuple:
+    """
+    Runs the phases of drawing an L-System fitted to a window.
+
+    Returns:
+        tuple: The number of drawn segments and the segments drawn with a unit step (for the reference check).
+    """
+    args = {"start_angle": 0, "workers": 1}
+
+    with timer.phase("iterate"):
+        lsystem = LSystem(fractal["axiom"], fractal["rules"])
+        lsystem.iterate(iterations)
+
+    with timer.phase("interpret"):
+        geometry = LSystem_geometry(fractal, args, lsystem)
+        (x_min, y_min, x_max, y_max), unit = geometry[0], geometry[1:]
+        step = 0.9 * min(width / max(x_max - x_min, 1e-9), height / max(y_max - y_min, 1e-9))
+        offset = np.array([width / 2 - step * (x_min + x_max) / 2, height / 2 - step * (y_min + y_max) / 2] * 2)
+        segments = unit * step + offset
+
+    with timer.phase("render"):
+        RasterRenderer(None, width, height).draw_segments(segments, "black", 1)
+
+    with timer.phase("svg"):
+        renderer = SvgRenderer(svg_path, width, height)
+        renderer.draw_segments(segments, "black", 1)
+        renderer.close()
+
+    return len(unit), unit
+
+
+def run_IFS(fractal: dict, iterations: int, width: int, height: int, svg_path: str, timer: PhaseTimer) -> tuple:
+    """
+    Runs the phases of drawing an IFS fitted to a window.
+
+    Returns:
+        tuple: The number of drawn figures and the figures before the view transform (for the reference check).
+    """
+    with timer.phase("iterate"):
+        ifs = IFS([Vector(x, y) for x, y in fractal['starting_figure']], fractal['mappings'])
+        ifs.iterate(iterations)
+        figures = ifs.figures_array
+
+    with timer.phase("transform"):
+        extent = max(np.ptp(figures[..., 0]), np.ptp(figures[..., 1]), 1e-9)
+        ifs.scale(0.9 * min(width, height) / extent)
+        ifs.rotate(180)
+        ifs.center_to(width // 2, height // 2)
+        polygons = ifs.figures_array
+
+    with timer.phase("render"):
+        RasterRenderer(None, width, height).draw_polygons(polygons, "red", "black", 1)
+
+    with timer.phase("svg"):
+        renderer = SvgRenderer(svg_path, width, height)
+        renderer.draw_polygons(polygons, "red", "black", 1)
+        renderer.close()
+
+    return len(polygons), figures
+
+
+def run_TEA(fractal: dict, iterations: int, width: int, height: int, svg_path: str, timer: PhaseTimer) -> tuple:
+    """
+    Runs the phases of drawing a TEA fractal (with the precision chosen from the pixel spacing).
+
+    Returns:
+        tuple: The number of grid cells and the iteration counts of the cells (for the reference check).
+    """
+    with timer.phase("iterate"):
+        tea = TEA(width, height, fractal['sequence'], 1, fractal["escape_radius"], tuple(fractal["plot_range"]), fractal['next_member'], fractal['explore_var'])
+        tea.iterate(iterations)
+
+    with timer.phase("color"):
+        palette = load_palette(COLORS_FILE)
+        raster = [
+            [TEA_cell_color(count, z, iterations, palette) for count, z in zip(counts, values)]
+            for counts, values in zip(tea.point_iteration_counts, tea.point_last_values)
+        ]
+
+    with timer.phase("render"):
+        RasterRenderer(None, width, height).draw_raster(raster)
+
+    with timer.phase("svg"):
+        renderer = SvgRenderer(svg_path, width, height)
+        renderer.draw_raster(raster)
+        renderer.close()
+
+    return width * height, np.array(tea.point_iteration_counts)
+
+
+RUNS = {FractalType.LSYSTEM: run_LSystem, FractalType.IFS: run_IFS, FractalType.TEA: run_TEA}
+
+
+def reference_LSystem(fractal: dict, iterations: int) -> np.ndarray:
+    """
+    Draws an L-System with a unit step by direct string rewriting and a complex-number turtle (independent of the
+    L-System, turtle and interpretation classes).
+
+    Returns:
+        np.ndarray: An array of shape (n, 4) of the segments in the drawing order.
+    """
+    word = fractal["axiom"]
+    for _ in range(iterations):
+        word = "".join(fractal["rules"].get(char, char) for char in word)
+
+    turn = math.radians(fractal["rotateByAngle"])
+    position, heading, stack, segments = 0j, 0.0, [], []
+    for char in word:
+        if char == '+':
+            heading += turn
+        elif char == '-':
+            heading -= turn
+        elif char == '[':
+            stack.append((position, heading))
+        elif char == ']':
+            position, heading = stack.pop()
+        else:
+            end = position + complex(math.cos(heading), math.sin(heading))
+            if char != 'f':
+                segments.append((position.real, position.imag, end.real, end.imag))
+            position = end
+    return np.array(segments, dtype=float).reshape(-1, 4)
+
+
+def reference_IFS(fractal: dict, iterations: int) -> np.ndarray:
+    """
+    Expands an IFS by applying every mapping to every figure of the previous level (no composed transformations, no
+    deduplication).
+
+    Returns:
+        np.ndarray: An array of shape (figures, points, 2).
+    """
+    figures = [[(float(x), float(y)) for x, y in fractal['starting_figure']]]
+    for _ in range(iterations):
+        figures = [
+            [(a * x + b * y + e, c * x + d * y + f) for x, y in figure]
+            for figure in figures for a, b, c, d, e, f in fractal['mappings']
+        ]
+    return np.array(figures, dtype=float).reshape(len(figures), -1, 2)
+
+
+def distinct_figures(figures: np.ndarray, quantum: float) -> set:
+    """
+    Quantises figures to a set which does not depend on their order (nor on the order of their points).
+    """
+    keys = set()
+    for figure in np.round(np.asarray(figures) / quantum).astype(np.int64):
+        keys.add(tuple(sorted(map(tuple, figure.tolist()))))
+    return keys
+
+
+def check_output(fractal: dict, fractal_type: FractalType, iterations: int, width: int, height: int, output: object) -> dict:
+    """
+    Compares the output of a run to the reference implementation.
+
+    Returns:
+        dict: The result as {"passed": bool or None (not checked), "detail": str}.
+    """
+    if fractal_type == FractalType.LSYSTEM:
+        if len(output) > REFERENCE_LIMIT:
+            return {"passed": None, "detail": "too large for the reference"}
+        reference = reference_LSystem(fractal, iterations)
+        if reference.shape != output.shape:
+            return {"passed": False, "detail": f"{len(output)} segments, reference {len(reference)}"}
+        error = float(np.abs(reference - output).max()) if len(output) else 0.0
+        return {"passed": error <= 1e-6 * max(1.0, float(np.abs(reference).max(initial=0))), "detail": f"max error {error:.1e}"}
+
+    if fractal_type == FractalType.IFS:
+        if len(fractal['mappings']) ** iterations > REFERENCE_LIMIT:
+            return {"passed": None, "detail": "too large for the reference"}
+        reference = reference_IFS(fractal, iterations)
+        quantum = 1e-7 * max(float(np.ptp(reference.reshape(-1, 2), axis=0).max()), 1e-9)
+        expected, actual = distinct_figures(reference, quantum), distinct_figures(output, quantum)
+        missing, extra = len(expected - actual), len(actual - expected)
+        return {"passed": not missing and not extra, "detail": f"{len(actual)} distinct figures, {missing} missing, {extra} extra"}
+
+    reference = TEA(width, height, fractal['sequence'], 1, fractal["escape_radius"], tuple(fractal["plot_range"]), fractal['next_member'], fractal['explore_var'], "double", None)
+    reference.iterate(iterations)
+    mismatch = float(np.mean(np.array(reference.point_iteration_counts) != output))
+    return {"passed": mismatch <= TEA_MISMATCH_LIMIT, "detail": f"{mismatch:.2%} cells differ from double precision"}
+
+
+def run_case(path: str, iterations: int, width: int, height: int, args: dict, svg_path: str) -> dict:
+    """
+    Runs a definition with one set of parameters: timed runs, an optional traced run (peak memory) and an optional
+    reference check.
+
+    Returns:
+        dict: The result of the case.
+    """
+    runs = []
+    for _ in range(max(args["repeat"], 1)):
+        gc.collect()
+        timer = PhaseTimer()
+        fractal, fractal_type = load_definition(path, timer)
+        count = iterations if iterations is not None else fractal.get("iterations", 100)
+        items, output = RUNS[fractal_type](fractal, count, width, height, svg_path, timer)
+        runs.append(timer.results)
+
+    # The fastest time of every phase over the runs
+    phases = {name: min(run[name]["wall"] for run in runs) for name in runs[0]}
+    cpu = {name: min(run[name]["cpu"] for run in runs) for name in runs[0]}
+
+    result = {
+        "name": os.path.relpath(path, DEFINITIONS).replace(os.sep, "/"),
+        "type": fractal_type.name,
+        "iterations": count,
+        "width": width,
+        "height": height,
+        "items": items,
+        "phases": phases,
+        "cpu": cpu,
+        "total": sum(phases.values()),
+    }
+
+    if not args["no_memory"]:
+        # Tracing slows the run down, so the peak is measured by a separate run
+        gc.collect()
+        tracemalloc.start()
+        try:
+            timer = PhaseTimer()
+            fractal, _ = load_definition(path, timer)
+            RUNS[fractal_type](fractal, count, width, height, svg_path, timer)
+            result["peak_memory"] = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    if not args["no_check"]:
+        result["check"] = check_output(fractal, fractal_type, count, width, height, output)
+
+    return result
+
+
+def case_key(case: dict) -> str:
+    """
+    Identifies a case of the results (for the comparison with a baseline).
+    """
+    return f"{case['name']}|{case['iterations']}|{case['width']}x{case['height']}"
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """
+    Compares results to a baseline.
+
+    Returns:
+        list: Descriptions of the regressions (phases slower, or peak memory larger, by more than the threshold).
+    """
+    previous = {case_key(case): case for case in baseline["cases"]}
+    regressions = []
+    for case in results["cases"]:
+        old = previous.get(case_key(case))
+        if old is None:
+            continue
+        for name, seconds in case["phases"].items():
+            before = old["phases"].get(name)
+            if before is not None and seconds > before * (1 + threshold) and seconds - before > MIN_DELTA:
+                regressions.append(f"{case_key(case)} {name}: {before * 1000:.1f} ms -> {seconds * 1000:.1f} ms")
+        if "peak_memory" in case and "peak_memory" in old and case["peak_memory"] > old["peak_memory"] * (1 + threshold):
+            regressions.append(f"{case_key(case)} peak memory: {old['peak_memory'] / 2**20:.1f} MiB -> {case['peak_memory'] / 2**20:.1f} MiB")
+    return regressions
+
+
+def main() -> None:
+    """
+    Runs the benchmark of the bundled fractal definitions, prints a summary line for every case and optionally saves
+    the results and compares them to a baseline.
+    """
+    args = parse_console_arguments()
+
+    baseline = None
+    if args["baseline"]:
+        try:
+            with open(args["baseline"]) as f:
+                baseline = json.loads(f.read())
+        except (OSError, json.JSONDecodeError) as err:
+            print(f"Baseline error: {err}")
+            sys.exit(1)
+
+    results = {
+        "ladder": args["ladder"],
+        "repeat": args["repeat"],
+        "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "cases": [],
+    }
+    failed = 0
+
+    with tempfile.TemporaryDirectory() as directory:
+        svg_path = os.path.join(directory, "benchmark.svg")
+        for kind in args["types"]:
+            for file_name in sorted(os.listdir(os.path.join(DEFINITIONS, kind))):
+                if not file_name.endswith(".json") or (args["filter"] and args["filter"] not in file_name):
+                    continue
+                for iterations, width, height in LADDERS[args["ladder"]][kind]:
+                    case = run_case(os.path.join(DEFINITIONS, kind, file_name), iterations, width, height, args, svg_path)
+                    results["cases"].append(case)
+
+                    phases = " ".join(f"{name} {seconds * 1000:.1f}" for name, seconds in case["phases"].items())
+                    line = f"{case_key(case)}: {case['total'] * 1000:.1f} ms ({phases}), {case['items']} items"
+                    if "peak_memory" in case:
+                        line += f", peak {case['peak_memory'] / 2**20:.1f} MiB"
+                    if "check" in case:
+                        status = {True: "ok", False: "FAILED", None: "skipped"}[case["check"]["passed"]]
+                        line += f", check {status} ({case['check']['detail']})"
+                        failed += case["check"]["passed"] is False
+                    print(line)
+
+    if args["output"]:
+        with open(args["output"], "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Results saved to {args['output']}")
+
+    status = 0
+    if failed:
+        print(f"{failed} case(s) differ from the reference")
+        status = 1
+    if baseline is not None:
+        regressions = compare(results, baseline, args["threshold"])
+        for regression in regressions:
+            print(f"Regression: {regression}")
+        print(f"{len(regressions)} regression(s) against {args['baseline']}")
+        if regressions:
+            status = 1
+    sys.exit(status)
+
+
+if __name__ == "__main__":
+    main()
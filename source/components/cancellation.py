@@ -0,0 +1,113 @@
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from contextlib import contextmanager
+
+# Interval (in seconds) of the checks of the cancellation event while waiting for worker processes
+POLL_INTERVAL = 0.05
+
+class RenderCancelled(Exception):
+    """
+    Raised in the computing thread when drawing has been cancelled.
+    """
+    pass
+
+
+def check_cancelled(cancel: object) -> None:
+    """
+    Stops a computation whose cancellation event has been set.
+
+    Parameters:
+        cancel (object): The cancellation event (a threading.Event), or None if the computation is not cancellable.
+
+    Raises:
+        RenderCancelled: If the event has been set.
+    """
+    if cancel is not None and cancel.is_set():
+        raise RenderCancelled()
+
+
+@contextmanager
+def worker_pool(workers: int):
+    """
+    Creates a pool of worker processes, which is shut down when the block is left. If the block is left by an
+    exception (e.g. RenderCancelled), the tasks which have not started are cancelled and the workers running the
+    other ones are terminated (they would hold back the exit of the program until their tasks finish).
+
+    Parameters:
+        workers (int): The number of worker processes.
+
+    Yields:
+        ProcessPoolExecutor: The pool.
+    """
+    executor = ProcessPoolExecutor(max_workers=workers)
+    try:
+        yield executor
+    except BaseException:
+        # The pool forgets its processes on shutdown (and has no public way of terminating them before Python 3.14)
+        processes = list((executor._processes or {}).values())
+        executor.shutdown(wait=False, cancel_futures=True)
+        for process in processes:
+            process.terminate()
+        raise
+    executor.shutdown()
+
+
+def pool_results(executor: ProcessPoolExecutor, function, *iterables, cancel: object = None):
+    """
+    Runs a function for every tuple of arguments in a pool of worker processes and yields the results as the tasks
+    finish, checking the cancellation event meanwhile. The tasks which have not started are cancelled when the
+    results are not consumed to the end (e.g. after an exception). Finished tasks are not referenced any more, so
+    their results can be released as soon as they have been consumed.
+
+    Parameters:
+        executor (ProcessPoolExecutor): The pool (see 'worker_pool').
+        function: The function run in the worker processes.
+        *iterables: The iterables of the arguments.
+        cancel (object): The cancellation event (a threading.Event). Defaults to None.
+
+    Yields:
+        tuple: The index of the arguments and the result.
+
+    Raises:
+        RenderCancelled: If the event has been set.
+    """
+    futures = {executor.submit(function, *arguments): index for index, arguments in enumerate(zip(*iterables))}
+    try:
+        while futures:
+            check_cancelled(cancel)
+            done, _ = wait(futures, timeout=POLL_INTERVAL if cancel is not None else None, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield futures.pop(future), future.result()
+    finally:
+        for future in futures:
+            future.cancel()
+
+
+def pool_map(executor: ProcessPoolExecutor, function, *iterables, cancel: object = None, discard=None) -> list:
+    """
+    Runs a function for every tuple of arguments in a pool of worker processes (as 'executor.map') and waits for
+    all results, checking the cancellation event meanwhile.
+
+    Parameters:
+        executor (ProcessPoolExecutor): The pool (see 'worker_pool').
+        function: The function run in the worker processes.
+        *iterables: The iterables of the arguments.
+        cancel (object): The cancellation event (a threading.Event). Defaults to None.
+        discard: A callback function called with the results of finished tasks when the results are not returned
+            (e.g. to release resources they hold). Defaults to None.
+
+    Returns:
+        list: The results in the order of the arguments.
+
+    Raises:
+        RenderCancelled: If the event has been set.
+    """
+    results = {}
+    try:
+        for index, result in pool_results(executor, function, *iterables, cancel=cancel):
+            results[index] = result
+    except BaseException:
+        if discard is not None:
+            for result in results.values():
+                discard(result)
+        raise
+    return [results[index] for index in range(len(results))]
@@ -1,4 +1,5 @@
 import colorsys
+from .color_names import COLOR_NAMES
 
 def hsv_to_hex(h: float, s: float, v: float):
     """
@@ -18,4 +19,33 @@ def hsv_to_hex(h: float, s: float, v: float):
         int(round(r * 255)),
         int(round(g * 255)),
         int(round(b * 255))
-    )
\ No newline at end of file
+    )
+
+
+def color_to_rgb(color: str) -> tuple:
+    """
+    Convert a color given as a hexadecimal string ('#rgb', '#rrggbb', '#rrrgggbbb' or '#rrrrggggbbbb') or a color
+    name accepted by Tkinter (case and spaces are ignored) to RGB components.
+
+    Parameters:
+        color (str): The color.
+
+    Returns:
+        tuple: The (r, g, b) components in [0, 255].
+
+    Raises:
+        ValueError: If the color is not recognised.
+    """
+    name = color.replace(" ", "").lower()
+    if name in COLOR_NAMES:
+        return COLOR_NAMES[name]
+
+    # Components of 1 to 4 hex digits each (the highest 8 bits are kept)
+    digits = name[1:]
+    if name.startswith("#") and len(digits) in (3, 6, 9, 12) and all(digit in "0123456789abcdef" for digit in digits):
+        size = len(digits) // 3
+        if size == 1:
+            return tuple(int(digit * 2, 16) for digit in digits)
+        return tuple(int(digits[i:i + size], 16) >> (4 * size - 8) for i in range(0, len(digits), size))
+
+    raise ValueError(f"Color error: unknown color '{color}'.")
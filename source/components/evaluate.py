@@ -1,4 +1,4 @@
-import math
+from .expression import compile_expression
 
 def evaluate_recursive(data, variables: list[str, float] = {}):
     """
@@ -9,7 +9,8 @@ def evaluate_recursive(data, variables: list[str, float] = {}):
     Parameters:
     data (list, str, int, float, complex):
         Input data, which can be in the form of a string, list, or numerical type (int, float, complex).
-        - If the element is of type `str`, it attempts to evaluate it as a mathematical expression using `eval()`.
+        - If the element is of type `str`, it is evaluated as a mathematical expression (compiled and memoized,
+          see `compile_expression`; every distinct expression is evaluated once).
         - If the element is of type `list`, the function recursively evaluates all its elements.
         - If the element is of type `int`, `float`, or `complex`, it returns it unchanged.
     
@@ -24,17 +25,23 @@ def evaluate_recursive(data, variables: list[str, float] = {}):
         it returns an error message.
     """
 
-    if isinstance(data, str):
-        try:
-            return eval(data, {**vars(math)}, variables)
-        except Exception as e:
-            raise ValueError(f"Error in evaluating expression: {e}")
+    # Variables are bound once for the whole structure, every distinct expression is evaluated once
+    names = tuple(sorted(variables))
+    values = {}
 
-    elif isinstance(data, list):
-        return [evaluate_recursive(element, variables) for element in data]
+    def evaluate(element):
+        if isinstance(element, str):
+            if element not in values:
+                values[element] = compile_expression(element, names).evaluate(variables)
+            return values[element]
 
-    elif isinstance(data, (int, float, complex)):
-        return data
+        elif isinstance(element, list):
+            return [evaluate(item) for item in element]
 
-    else:
-        raise ValueError(f"Unsupported type: {type(data)}")
\ No newline at end of file
+        elif isinstance(element, (int, float, complex)):
+            return element
+
+        else:
+            raise ValueError(f"Unsupported type: {type(element)}")
+
+    return evaluate(data)
@@ -1,3 +1,6 @@
+import time
+
+
 class Event(object):
     """
     Represents a simple event system that allows handlers (functions) to be registered, removed, and called.
@@ -45,3 +48,111 @@ class Event(object):
         """
         for eventhandler in self.__eventhandlers:
             eventhandler(*args, **keywargs)
+
+    def __len__(self) -> int:
+        """
+        Gets the number of registered event handlers.
+        
+        Returns:
+            int: The number of handlers.
+        """
+        return len(self.__eventhandlers)
+
+    def __bool__(self) -> bool:
+        """
+        Indicates whether any handler is registered. Allows the caller to skip preparing event arguments
+        (e.g. 'if event: event(...)') when nobody is listening.
+        
+        Returns:
+            bool: True if at least one handler is registered, False otherwise.
+        """
+        return len(self.__eventhandlers) > 0
+
+
+class BatchedEvent(Event):
+    """
+    Represents an event which collects pushed items and delivers them to the handlers in chunks.
+    Handlers are called with a single argument, the list of collected items.
+    """
+
+    def __init__(self, batch_size: int = 1024):
+        """
+        Initializes a new instance of the BatchedEvent class.
+        
+        Parameters:
+            batch_size (int): The number of items delivered in a single chunk. Defaults to 1024.
+        """
+        super().__init__()
+        self._batch_size = batch_size
+        self._batch = []
+
+    @property
+    def batch_size(self) -> int:
+        """
+        Gets the number of items delivered in a single chunk.
+        
+        Returns:
+            int: The chunk size.
+        """
+        return self._batch_size
+
+    @batch_size.setter
+    def batch_size(self, new_batch_size: int) -> None:
+        """
+        Sets the number of items delivered in a single chunk.
+        
+        Parameters:
+            new_batch_size (int): The new chunk size.
+        """
+        self._batch_size = new_batch_size
+
+    def push(self, item: object) -> None:
+        """
+        Adds an item to the current chunk, delivering the chunk once it is full.
+        
+        Parameters:
+            item (object): The item to be delivered.
+        """
+        self._batch.append(item)
+        if len(self._batch) >= self._batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """
+        Delivers the current (possibly incomplete) chunk to the handlers.
+        """
+        if self._batch:
+            batch, self._batch = self._batch, []
+            self(batch)
+
+
+class ProgressEvent(Event):
+    """
+    Represents a rate-limited progress event. Handlers are called with two arguments, the amount of work done
+    and the total amount of work, at most once per given time interval (the final report is always delivered).
+    """
+
+    def __init__(self, min_interval: float = 0.1):
+        """
+        Initializes a new instance of the ProgressEvent class.
+        
+        Parameters:
+            min_interval (float): The minimum time (in seconds) between two reports. Defaults to 0.1.
+        """
+        super().__init__()
+        self._min_interval = min_interval
+        self._last_report = None
+
+    def report(self, done: int, total: int) -> None:
+        """
+        Reports progress to the handlers, unless the last report is too recent.
+        
+        Parameters:
+            done (int): The amount of work done.
+            total (int): The total amount of work.
+        """
+        now = time.monotonic()
+        if done < total and self._last_report is not None and now - self._last_report < self._min_interval:
+            return
+        self._last_report = now
+        self(done, total)
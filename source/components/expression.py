@@ -0,0 +1,237 @@
+import ast
+import cmath
+import math
+from functools import lru_cache
+
+
+# Functions and constants available in expressions (besides the variables)
+NAMESPACE = {
+    **{name: value for name, value in vars(math).items() if not name.startswith("_")},
+    "abs": abs, "min": min, "max": max, "round": round, "pow": pow,
+    "int": int, "float": float, "complex": complex,
+    "math": math, "cmath": cmath,
+    "__builtins__": {}
+}
+
+# Modules whose (public) attributes may be accessed
+MODULES = {"math", "cmath"}
+
+# Attributes of variables (complex numbers) which may be read, and methods of variables which may be called
+VARIABLE_ATTRIBUTES = {"real", "imag"}
+VARIABLE_METHODS = {"conjugate"}
+
+OPERATORS = (
+    ast.Add, ast.Sub, ast.Mult, ast.Div, ast.FloorDiv, ast.Mod, ast.Pow, ast.UAdd, ast.USub, ast.Not, ast.And, ast.Or,
+    ast.Eq, ast.NotEq, ast.Lt, ast.LtE, ast.Gt, ast.GtE
+)
+
+NODES = (
+    ast.Expression, ast.BinOp, ast.UnaryOp, ast.BoolOp, ast.Compare, ast.IfExp, ast.Call, ast.Name, ast.Load,
+    ast.Constant, ast.Attribute
+) + OPERATORS
+
+
+class Expression:
+    """
+    A compiled arithmetic expression.
+
+    The expression is parsed once, checked against a whitelist of syntax (arithmetic, comparisons, conditional
+    expressions, calls of the functions in NAMESPACE and the parts and the conjugate of variables), its constant subexpressions are folded and the rest is
+    compiled to a code object. An expression without variables is reduced to its value.
+    """
+
+    def __init__(self, text: str, variables: tuple = ()) -> None:
+        """
+        Initializes an instance of the Expression class.
+
+        Parameters:
+            text (str): The expression.
+            variables (tuple): The names of the variables (names which are never folded, even if they shadow
+                a constant such as 'e'). Defaults to no variables.
+
+        Raises:
+            ValueError: If the expression is not valid or uses unsupported syntax or names.
+        """
+        self._text = text
+        self._variables = frozenset(variables)
+
+        try:
+            tree = ast.parse(text.strip(), mode="eval")
+        except SyntaxError as err:
+            raise ValueError(f"Expression error: invalid expression '{text}' ({err.msg}).")
+
+        self.__check(tree)
+        tree = ast.fix_missing_locations(self.__fold(tree))
+
+        self._free = frozenset(node.id for node in ast.walk(tree) if isinstance(node, ast.Name)) & self._variables
+        if isinstance(tree.body, ast.Constant):
+            self._code, self._value = None, tree.body.value
+        else:
+            self._code, self._value = compile(tree, "<expression>", "eval"), None
+
+    @property
+    def text(self) -> str:
+        """
+        Gets the source text of the expression.
+
+        Returns:
+            str: The expression.
+        """
+        return self._text
+
+    @property
+    def is_constant(self) -> bool:
+        """
+        Gets whether the expression does not depend on any variable.
+
+        Returns:
+            bool: True if the expression is constant, False otherwise.
+        """
+        return self._code is None
+
+    @property
+    def free_variables(self) -> frozenset:
+        """
+        Gets the variables the expression depends on.
+
+        Returns:
+            frozenset: The names of the variables.
+        """
+        return self._free
+
+    def evaluate(self, variables: dict = None) -> object:
+        """
+        Evaluates the expression.
+
+        Parameters:
+            variables (dict): The values of the variables. Defaults to no variables.
+
+        Returns:
+            object: The value of the expression.
+
+        Raises:
+            ValueError: If the evaluation fails (e.g. a variable is missing or a math domain error occurs).
+            OverflowError: If a value overflows (left unwrapped, so that iterated sequences can treat it as escape).
+        """
+        if self._code is None:
+            return self._value
+
+        try:
+            return eval(self._code, NAMESPACE, variables or {})
+        except OverflowError:
+            raise
+        except (ArithmeticError, AttributeError, NameError, TypeError, ValueError) as err:
+            raise ValueError(f"Error in evaluating expression: {err}")
+
+    def __check(self, tree: ast.AST) -> None:
+        """
+        Checks that an expression tree only uses whitelisted syntax and names.
+
+        Parameters:
+            tree (ast.AST): The parsed expression.
+
+        Raises:
+            ValueError: If a node is not allowed.
+        """
+        callees = {id(node.func) for node in ast.walk(tree) if isinstance(node, ast.Call)}
+        for node in ast.walk(tree):
+            if not isinstance(node, NODES):
+                raise ValueError(f"Expression error: unsupported syntax '{type(node).__name__}' in '{self._text}'.")
+
+            if isinstance(node, ast.Constant) and not isinstance(node.value, (int, float, complex)):
+                raise ValueError(f"Expression error: unsupported constant {node.value!r} in '{self._text}'.")
+            if isinstance(node, ast.Name) and (node.id not in NAMESPACE or node.id.startswith("_")):
+                if node.id not in self._variables:
+                    raise ValueError(f"Expression error: unknown name '{node.id}' in '{self._text}'.")
+            if isinstance(node, ast.Attribute):
+                if not isinstance(node.value, ast.Name):
+                    allowed = False
+                elif node.value.id in self._variables:
+                    allowed = node.attr in VARIABLE_ATTRIBUTES or (node.attr in VARIABLE_METHODS and id(node) in callees)
+                else:
+                    allowed = node.value.id in MODULES and not node.attr.startswith("_")
+                if not allowed:
+                    raise ValueError(f"Expression error: unsupported attribute '{node.attr}' in '{self._text}'.")
+            if isinstance(node, ast.Call) and node.keywords:
+                raise ValueError(f"Expression error: keyword arguments are not supported in '{self._text}'.")
+
+    def __fold(self, node: ast.AST) -> ast.AST:
+        """
+        Replaces constant subexpressions by their values (bottom-up).
+
+        Parameters:
+            node (ast.AST): The node.
+
+        Returns:
+            ast.AST: The folded node.
+        """
+        for field, value in ast.iter_fields(node):
+            if isinstance(value, list):
+                setattr(node, field, [self.__fold(item) if isinstance(item, ast.AST) else item for item in value])
+            elif isinstance(value, ast.AST):
+                setattr(node, field, self.__fold(value))
+
+        if isinstance(node, ast.Name):
+            # Constants of the namespace (names of functions and modules are kept)
+            value = NAMESPACE.get(node.id)
+            if node.id not in self._variables and isinstance(value, (int, float)):
+                return ast.copy_location(ast.Constant(value), node)
+            return node
+
+        if isinstance(node, ast.Attribute):
+            if node.value.id in self._variables:
+                return node
+            value = getattr(NAMESPACE[node.value.id], node.attr, None)
+            if isinstance(value, (int, float, complex)):
+                return ast.copy_location(ast.Constant(value), node)
+            return node
+
+        if isinstance(node, (ast.BinOp, ast.UnaryOp, ast.BoolOp, ast.Compare, ast.IfExp, ast.Call)):
+            operands = [child for child in ast.iter_child_nodes(node) if not isinstance(child, OPERATORS)]
+            if isinstance(node, ast.Call):
+                # The callee is a name or an attribute of a module, only the arguments have to be constant
+                operands = node.args
+            if all(isinstance(operand, ast.Constant) for operand in operands) and self.__pure_call(node):
+                try:
+                    value = eval(compile(ast.fix_missing_locations(ast.Expression(node)), "<expression>", "eval"), NAMESPACE)
+                except (ArithmeticError, TypeError, ValueError):
+                    # Left to fail when (and if) it is evaluated
+                    return node
+                return ast.copy_location(ast.Constant(value), node)
+
+        return node
+
+    def __pure_call(self, node: ast.AST) -> bool:
+        """
+        Checks whether a node is not a call, or a call of a known function (not of a variable).
+
+        Parameters:
+            node (ast.AST): The node.
+
+        Returns:
+            bool: True if the node can be folded when its operands are constant.
+        """
+        if not isinstance(node, ast.Call):
+            return True
+        callee = node.func
+        if isinstance(callee, ast.Name):
+            return callee.id in NAMESPACE and callee.id not in self._variables
+        return isinstance(callee, ast.Attribute) and callee.value.id not in self._variables
+
+
+@lru_cache(maxsize=65536)
+def compile_expression(text: str, variables: tuple = ()) -> Expression:
+    """
+    Compiles an expression (memoized by its text and the names of the variables).
+
+    Parameters:
+        text (str): The expression.
+        variables (tuple): The names of the variables. Defaults to no variables.
+
+    Returns:
+        Expression: The compiled expression.
+
+    Raises:
+        ValueError: If the expression is not valid or uses unsupported syntax or names.
+    """
+    return Expression(text, variables)
@@ -1,4 +1,7 @@
+import math
+
 from ..fractals.fractal import FractalType
+from ..evaluate import evaluate_recursive
 
 lsystem_keys = ["name", "axiom", "rules", "rotateByAngle"]
 ifs_keys = ["name", "starting_figure", "mappings"]
@@ -43,6 +46,17 @@ def determine_fractal_type(fractal: dict) -> FractalType:
             raise ValueError("IFS error: 'mappings' must be a list of lists of six floats or ints.")
         if not all(isinstance(mapping, list) and len(mapping) == 6 and all(isinstance(value, (float, int, str)) for value in mapping) for mapping in fractal["mappings"]):
             raise ValueError("IFS error: Each element in 'mappings' must be a list of six floats or ints.")
+        if "probabilities" in fractal.keys():
+            if not isinstance(fractal.get("probabilities"), list) or len(fractal["probabilities"]) != len(fractal["mappings"]):
+                raise ValueError("IFS error: 'probabilities' must be a list with one value for each mapping.")
+            if not all(isinstance(value, (float, int, str)) for value in fractal["probabilities"]):
+                raise ValueError("IFS error: Each element in 'probabilities' must be a float or an int.")
+            # Expressions are evaluated to check the values (chaos game weights)
+            probabilities = evaluate_recursive(fractal["probabilities"])
+            if not all(isinstance(value, (float, int)) and math.isfinite(value) and value >= 0 for value in probabilities):
+                raise ValueError("IFS error: Each element in 'probabilities' must be a finite non-negative number.")
+            if sum(probabilities) <= 0:
+                raise ValueError("IFS error: The sum of 'probabilities' must be positive.")
         return FractalType.IFS
 
     # Check for TEA specific structure
@@ -2,16 +2,30 @@
 import math
 import json
 import sys
+import numpy as np
+from concurrent.futures import FIRST_COMPLETED, wait
 
 from ..stack import Stack
 from ..vector import Vector
 from ..turtle import Turtle
-from ..color import hsv_to_hex
+from ..color import hsv_to_hex, color_to_rgb
+from ..precision import relative_spacing, choose_precision
+from ..renderers.i_renderer import IRenderer
+from ..geometry_cache import GeometryCache
+from ..png_writer import PngWriter
+from ..poster import Poster
+from ..profiler import profile_phase
+from ..cancellation import check_cancelled, worker_pool
 
 from ..fractals.lsystem import LSystem
+from ..fractals.lsystem_summary import LSystemSummary
+from ..fractals.lsystem_parallel import interpret_parallel
 from ..fractals.ifs import IFS
 from ..fractals.tea import TEA
 
+# Number of symbols of an L-System word interpreted between checks of the cancellation event
+INTERPRET_CHUNK = 65536
+
 
 def lagrange_interpolate(points, x):
     """
@@ -31,65 +45,396 @@ def lagrange_interpolate(points, x):
     return total
 
 
-def draw_LSystem(fractal: dict, args: dict, canvas: object) -> None:
+def interpret_LSystem(word: str, turtle: Turtle, angle: float, cancel: object = None) -> None:
+    """
+    Moves the turtle according to the symbols of an L-System word.
+    
+    Parameters:
+        word (str): The L-System word.
+        turtle (Turtle): The turtle to be moved.
+        angle (float): The rotation angle (in degrees) used for symbols '+' and '-'.
+        cancel (object): The cancellation event (a threading.Event) checked every INTERPRET_CHUNK symbols.
+            Defaults to None.
+
+    Raises:
+        RenderCancelled: If the cancellation event has been set.
+    """
+    stack = Stack([])
+    for start in range(0, len(word), INTERPRET_CHUNK):
+        check_cancelled(cancel)
+        for char in word[start:start + INTERPRET_CHUNK]:
+            if char == '+':
+                turtle.rotate(angle)
+            elif char == '-':
+                turtle.rotate(-angle)
+            elif char == 'f':
+                turtle.pen_down = False
+                turtle.forward()
+            elif char == '[':
+                stack.push(turtle.state)
+            elif char == ']':
+                turtle.state = stack.pop()
+            else:
+                turtle.pen_down = True
+                turtle.forward()
+
+
+def LSystem_bounds(fractal: dict, args: dict, lsystem: LSystem) -> tuple:
+    """
+    Determines the bounding box of an L-System drawn with a unit step. Uses memoised geometry summaries if the rules
+    allow it, otherwise the whole word is interpreted.
+    
+    Parameters:
+        fractal (dict): The fractal definition including axiom and rules.
+        args (dict): Configuration for drawing (the start angle is used).
+        lsystem (LSystem): The iterated L-System.
+    
+    Returns:
+        tuple: The bounding box as (x_min, y_min, x_max, y_max).
+    """
+    angle = fractal["rotateByAngle"]
+
+    if LSystemSummary.supports(fractal["axiom"], fractal["rules"]):
+        summary = LSystemSummary(fractal["axiom"], fractal["rules"], angle, args["start_angle"])
+        return summary.summarize(lsystem.total_iterations).bounds
+
+    turtle = Turtle(position=Vector(), step=1, angle=args["start_angle"], angle_step=angle)
+    interpret_LSystem(lsystem.word, turtle, angle, args.get("cancel"))
+    return turtle.bounds
+
+
+def LSystem_cache_key(fractal: dict, args: dict) -> str:
+    """
+    Computes the geometry cache key of an L-System drawn with a unit step (the geometry depends only on the rules
+    and the start angle).
+
+    Parameters:
+        fractal (dict): The fractal definition including axiom and rules.
+        args (dict): Configuration for drawing (the start angle is used).
+
+    Returns:
+        str: The key.
+    """
+    return GeometryCache.key("lsystem-segments", {
+        "axiom": fractal["axiom"], "rules": fractal["rules"], "angle": fractal["rotateByAngle"],
+        "start_angle": args["start_angle"]
+    })
+
+
+def LSystem_geometry(fractal: dict, args: dict, lsystem: LSystem, on_segments=None) -> np.ndarray:
+    """
+    Interprets an iterated L-System with a unit step from the origin.
+
+    Parameters:
+        fractal (dict): The fractal definition including axiom and rules.
+        args (dict): Configuration for drawing (the start angle and the number of workers are used).
+        lsystem (LSystem): The iterated L-System.
+        on_segments: A callback function called with batches of segments (arrays of shape (n, 4)) as they are
+            interpreted (serial interpretation only). Defaults to None.
+
+    Returns:
+        np.ndarray: An array whose first row is the bounding box of all visited positions (x_min, y_min, x_max, y_max)
+            and whose other rows are the segments (x0, y0, x1, y1).
+    """
+    angle = fractal["rotateByAngle"]
+
+    if args.get("workers", 1) > 1:
+        coords, bounds = interpret_parallel(lsystem.word, angle, 1, args["start_angle"], Vector(), args["workers"], cancel=args.get("cancel"))
+        segments = np.asarray(coords, dtype=float).reshape(-1, 4)
+        if on_segments is not None and len(segments):
+            on_segments(segments)
+        return np.vstack((np.array(bounds, dtype=float), segments))
+
+    turtle = Turtle(position=Vector(), step=1, angle=args["start_angle"], angle_step=angle, lattice=True)
+    batches = []
+
+    def collect(lines: list) -> None:
+        batch = np.array([(start.x, start.y, end.x, end.y) for start, end in lines], dtype=float).reshape(-1, 4)
+        batches.append(batch)
+        if on_segments is not None:
+            on_segments(batch)
+
+    turtle.add_segments_drawn_subscriber(collect, batch_size=4096)
+    interpret_LSystem(lsystem.word, turtle, angle, args.get("cancel"))
+    turtle.flush_events()
+
+    return np.vstack([np.array(turtle.bounds, dtype=float)] + batches)
+
+
+def load_palette(colors_file: str) -> tuple:
+    """
+    Loads the interpolation points of hue, saturation and value from a JSON file.
+    
+    Parameters:
+        colors_file (str): Path to the JSON file defining interpolating colors.
+    
+    Returns:
+        tuple: Lists of (index, value) points for hue, saturation and value.
+    """
+    with open(colors_file) as f:
+        try:
+            colors = json.loads(f.read())
+        except json.JSONDecodeError as err:
+            print(err)
+            sys.exit(-1)
+
+    hue_points = [(i, h) for i, h in enumerate(colors["hue"])]
+    saturation_points = [(i, s) for i, s in enumerate(colors["saturation"])]
+    value_points = [(i, v) for i, v in enumerate(colors["value"])]
+    return hue_points, saturation_points, value_points
+
+
+def palette_color(palette: tuple, norm: float) -> str:
     """
-    Draws an L-System fractal on a canvas using Turtle graphics.
+    Interpolates a color of the palette.
+    
+    Parameters:
+        palette (tuple): Lists of (index, value) points for hue, saturation and value (see 'load_palette').
+        norm (float): The position in the palette.
+    
+    Returns:
+        str: Hex color string in the form '#rrggbb'.
+    """
+    hue_points, saturation_points, value_points = palette
+
+    # LERP
+    hue = min(1, max(lagrange_interpolate(hue_points, norm), 0))
+    saturation = min(1, max(lagrange_interpolate(saturation_points, norm), 0))
+    value = min(1, max(lagrange_interpolate(value_points, norm), 0))
+
+    return hsv_to_hex(hue, saturation, value)
+
+
+def draw_density(density: object, args: dict, renderer: IRenderer) -> None:
+    """
+    Draws a pixel density grid as a heat map (logarithmic scale, colors interpolated from the palette).
+    
+    Parameters:
+        density (np.ndarray): An array of shape (height, width) holding the number of hits of each pixel.
+        args (dict): Configuration for drawing (the colors file is used).
+        renderer (IRenderer): The renderer used for drawing.
+    """
+    palette = load_palette(args["colors_file"])
+    levels = 256
+    colors = ["#FFFFFF"] + [palette_color(palette, level / (levels - 1)) for level in range(1, levels)]
+
+    log_density = np.log1p(density)
+    norm = log_density / max(log_density.max(), 1e-12)
+    indexes = np.where(density > 0, np.maximum(1, np.round(norm * (levels - 1))), 0).astype(int)
+
+    renderer.draw_raster([[colors[index] for index in row] for row in indexes.tolist()])
+
+
+def draw_orbit_density(density: object, renderer: IRenderer, cell_size: int = 1) -> None:
+    """
+    Draws an orbit density (see 'TEA.orbit_density') as an RGB image on a black background. Every channel is
+    scaled linearly so that its brightest 0.1 % of cells saturate.
+
+    Parameters:
+        density (np.ndarray): An array of shape (3, rows, columns) of the visits of each cell in the red, green and
+            blue channel.
+        renderer (IRenderer): The renderer used for drawing.
+        cell_size (int): The size of a cell in pixels. Defaults to 1.
+    """
+    channels = []
+    for channel in density:
+        nonzero = channel[channel > 0]
+        scale = np.percentile(nonzero, 99.9) if len(nonzero) else 1
+        channels.append(np.round(255 * np.clip(channel / scale, 0, 1)).astype(np.int64))
+
+    codes = (channels[0] << 16) | (channels[1] << 8) | channels[2]
+    renderer.draw_raster([[f"#{code:06X}" for code in row] for row in codes.tolist()], cell_size=cell_size)
+
+
+def draw_LSystem(fractal: dict, args: dict, renderer: IRenderer, cache: GeometryCache = None) -> None:
+    """
+    Draws an L-System fractal using Turtle graphics.
     
     Parameters:
         fractal (dict): The fractal definition including axiom and rules.
         args (dict): Configuration for drawing, such as step size, start angle, iteration count, etc.
-        canvas (object): The canvas where the fractal will be drawn.
+        renderer (IRenderer): The renderer used for drawing.
+        cache (GeometryCache): The cache of the segments drawn with a unit step (not used with a viewport).
+            Defaults to None.
     """
-    # Turtle
-    turtle = Turtle(
-        position=Vector(),
-        step=args["step"],
-        angle=args["start_angle"]
-    )
+    angle = fractal["rotateByAngle"]
+    width, height = args["window_width"], args["window_height"]
+    viewport = args.get("viewport")
+
+    summary = None
+    if LSystemSummary.supports(fractal["axiom"], fractal["rules"]):
+        summary = LSystemSummary(fractal["axiom"], fractal["rules"], angle, args["start_angle"])
     
-    # Load L-system
+    # Load L-system (the word is not needed when only the visible part is rendered from summaries)
     lsystem = LSystem(fractal["axiom"], fractal["rules"])
     
     if args["prompt"]:
         lsystem.add_iteration_performed_subscriber(lambda word, iteration: print(f"Iteration n. {iteration} string length: {len(word)}"))
 
-    lsystem.iterate(args["iteration_count"])
-
-    angle = fractal["rotateByAngle"]
-    stack = Stack()
-    for char in lsystem.word:
-        if char == '+':
-            turtle.rotate(angle)
-        elif char == '-':
-            turtle.rotate(-angle)
-        elif char == 'f':
-            turtle.pen_down = False
-            turtle.forward()
-        elif char == '[':
-            stack.push((turtle.position, turtle.angle))
-        elif char == ']':
-            state = stack.pop()
-            turtle.position = state[0]
-            turtle.angle = state[1]
-        else:
-            turtle.pen_down = True
-            turtle.forward()
-
-    turtle.center_to(args["window_width"] // 2, args["window_height"] // 2)
+    profiler = args.get("profiler")
+
+    # Segments drawn with a unit step (reused from the cache, or interpreted now if the bounds are needed first)
+    geometry = None
+    if cache is not None and viewport is None:
+        key = LSystem_cache_key(fractal, args)
+        with profile_phase(args, "cache"):
+            geometry = cache.load(key, args["iteration_count"])
+
+    if (summary is None or viewport is None) and geometry is None:
+        with profile_phase(args, "iterate"):
+            lsystem.iterate(args["iteration_count"], args.get("cancel"))
+    elif args["prompt"] and summary is not None:
+        # The word is not expanded, progress is reported from the summaries
+        for iteration in range(1, args["iteration_count"] + 1):
+            print(f"Iteration n. {iteration} line count: {summary.summarize(iteration).segment_count}")
+
+    if cache is not None and viewport is None and geometry is None and summary is None:
+        with profile_phase(args, "interpret"):
+            geometry = LSystem_geometry(fractal, args, lsystem)
+        cache.store(key, args["iteration_count"], geometry)
+        if profiler is not None:
+            profiler.count("turtle_segments", len(geometry) - 1)
+
+    # Bounding box known in advance (summaries), the turtle can start at its final position
+    step = args["step"]
+    bounds = None
+    if summary is not None:
+        bounds = summary.summarize(args["iteration_count"]).bounds
+    elif geometry is not None and args.get("fit"):
+        bounds = tuple(geometry[0])
+    elif args.get("fit") or viewport is not None:
+        bounds = LSystem_bounds(fractal, args, lsystem)
+
+    # Fit step to the window
+    if args.get("fit"):
+        factors = [
+            width / (bounds[2] - bounds[0]) if bounds[2] > bounds[0] else None,
+            height / (bounds[3] - bounds[1]) if bounds[3] > bounds[1] else None
+        ]
+        factors = [factor for factor in factors if factor is not None]
+        if factors:
+            step = 0.95 * min(factors)
+
+    position = Vector()
+    if bounds is not None:
+        position = Vector(
+            width // 2 - (bounds[0] + bounds[2]) * step // 2,
+            height // 2 - (bounds[1] + bounds[3]) * step // 2
+        )
+
+    # Magnify the viewport (given in canvas coordinates of the whole figure) to the window
+    if viewport is not None:
+        x_min, y_min, x_max, y_max = viewport
+        zoom = min(width / (x_max - x_min), height / (y_max - y_min))
+        position = Vector(
+            (position.x - (x_min + x_max) / 2) * zoom + width / 2,
+            (position.y - (y_min + y_max) / 2) * zoom + height / 2
+        )
+        step *= zoom
+
+        margin = args["stroke_width"]
+        visible = (-margin, -margin, width + margin, height + margin)
+
+    if cache is not None and viewport is None:
+        offset = np.array([position.x, position.y, position.x, position.y])
+        if geometry is None:
+            # Bounds known from the summaries, segments are drawn while they are interpreted
+            with profile_phase(args, "interpret"):
+                geometry = LSystem_geometry(fractal, args, lsystem, lambda segments: renderer.draw_segments(
+                    segments * step + offset, args["stroke_color"], args["stroke_width"]
+                ))
+            cache.store(key, args["iteration_count"], geometry)
+            if profiler is not None:
+                profiler.count("turtle_segments", len(geometry) - 1)
+            return
+
+        if bounds is None:
+            # Centered as by 'Turtle.center_to'
+            x_min, y_min, x_max, y_max = geometry[0] * step
+            offset = np.array([width // 2 - (x_min + x_max) // 2, height // 2 - (y_min + y_max) // 2] * 2)
+        renderer.draw_segments(geometry[1:] * step + offset, args["stroke_color"], args["stroke_width"])
+        return
+
+    if viewport is not None and summary is not None:
+        # Descend only into visible subtrees, stop at pixel size
+        with profile_phase(args, "interpret"):
+            lines = summary.visible_segments(args["iteration_count"], position, step, visible)
+            segments = [(line[0].x, line[0].y, line[1].x, line[1].y) for line in lines]
+        if profiler is not None:
+            profiler.count("turtle_segments", len(segments))
+    elif args.get("workers", 1) > 1:
+        # Interpret chunks of the word in worker processes
+        with profile_phase(args, "interpret"):
+            coords, word_bounds = interpret_parallel(
+                lsystem.word, angle, step, args["start_angle"], position, args["workers"], cancel=args.get("cancel")
+            )
+        if profiler is not None:
+            profiler.count("turtle_segments", len(coords) // 4)
+
+        translation = Vector()
+        if bounds is None:
+            translation = Vector(width // 2, height // 2) - Vector((word_bounds[0] + word_bounds[2]) // 2, (word_bounds[1] + word_bounds[3]) // 2)
+
+        segments = [
+            (coords[i] + translation.x, coords[i + 1] + translation.y, coords[i + 2] + translation.x, coords[i + 3] + translation.y)
+            for i in range(0, len(coords), 4)
+        ]
+    else:
+        # Turtle (heading tracked as a multiple of the rotation angle, exact lattice coordinates where possible)
+        turtle = Turtle(
+            position=position,
+            step=step,
+            angle=args["start_angle"],
+            angle_step=angle,
+            lattice=True
+        )
+
+        # Position known in advance, lines are drawn in chunks while the word is being interpreted
+        stream = bounds is not None and viewport is None
+        if stream:
+            turtle.add_segments_drawn_subscriber(
+                lambda lines: renderer.draw_segments(
+                    [(start.x, start.y, end.x, end.y) for start, end in lines], args["stroke_color"], args["stroke_width"]
+                ),
+                batch_size=4096
+            )
+        if profiler is not None:
+            turtle.add_segments_drawn_subscriber(lambda lines: profiler.count("turtle_segments", len(lines)), batch_size=4096)
+
+        with profile_phase(args, "interpret"):
+            interpret_LSystem(lsystem.word, turtle, angle, args.get("cancel"))
+
+        if stream or profiler is not None:
+            turtle.flush_events()
+        if stream:
+            return
+
+        if bounds is None:
+            turtle.center_to(width // 2, height // 2)
+
+        segments = [(line[0].x, line[0].y, line[1].x, line[1].y) for line in turtle.lines]
+
+    if viewport is not None:
+        segments = [
+            segment for segment in segments
+            if not (max(segment[0], segment[2]) < visible[0] or min(segment[0], segment[2]) > visible[2] or
+                    max(segment[1], segment[3]) < visible[1] or min(segment[1], segment[3]) > visible[3])
+        ]
 
     # Draw figure
-    for line in turtle.lines:
-        canvas.create_line(line[0].x, line[0].y, line[1].x, line[1].y, fill=args["stroke_color"], width=args["stroke_width"])
+    renderer.draw_segments(segments, args["stroke_color"], args["stroke_width"])
 
 
-def draw_IFS(fractal: dict, args: dict, canvas: object) -> None:
+def draw_IFS(fractal: dict, args: dict, renderer: IRenderer, cache: GeometryCache = None) -> None:
     """
-    Draws an Iteration Function System (IFS) fractal on a canvas using transformations.
+    Draws an Iteration Function System (IFS) fractal using transformations.
     
     Parameters:
         fractal (dict): The fractal definition including starting figure and mappings.
         args (dict): Configuration for drawing, such as iteration count, scale, start angle, etc.
-        canvas (object): The canvas where the fractal will be drawn.
+        renderer (IRenderer): The renderer used for drawing.
+        cache (GeometryCache): The cache of the composed transformations of every level (not used with random
+            iteration or pruning with '-min-size'). Defaults to None.
     """
     # Represent all points as vectors
     starting_figure = []
@@ -97,26 +442,174 @@ def draw_IFS(fractal: dict, args: dict, canvas: object) -> None:
         starting_figure.append(Vector(point[0], point[1]))
 
     ifs = IFS(starting_figure, fractal['mappings'])
-    ifs.iterate(args['iteration_count'])
 
-    ifs.scale(args['scale'])
-    ifs.rotate(180 - args['start_angle'])
-    ifs.center_to(args["window_width"] // 2, args["window_height"] // 2)
+    # Random iteration (chaos game), independent of the iteration count
+    if args.get("chaos"):
+        density = ifs.chaos_game(
+            args["chaos"], args["window_width"], args["window_height"],
+            probabilities=fractal.get("probabilities"), rotation=180 - args['start_angle'], cancel=args.get("cancel")
+        )
+        draw_density(density, args, renderer)
+        return
 
-    result_figures = ifs.figures
+    if args["prompt"]:
+        ifs.add_iteration_performed_subscriber(lambda figures, iteration: print(f"Iteration n. {iteration} figure count: {len(figures)}"))
+
+    profiler = args.get("profiler")
+    if profiler is not None:
+        ifs.add_iteration_performed_subscriber(lambda figures, iteration: profiler.record("ifs_figures", iteration, len(figures)))
+
+    pruned = bool(args.get("min_size"))
+    if pruned and not ifs.prunable:
+        print("IFS warning: -min-size requires contractive mappings, all figures are expanded.", file=sys.stderr)
+        pruned = False
+
+    if pruned:
+        # Final view determined from a shallow expansion (at most 4096 figures), then only visible figures are refined
+        levels = 0
+        while levels < args['iteration_count'] and len(fractal['mappings']) ** (levels + 1) <= 4096:
+            levels += 1
+        with profile_phase(args, "iterate"):
+            shallow = IFS(starting_figure, fractal['mappings'])
+            shallow.iterate(levels)
+            view = shallow.view_matrix(args['scale'], 180 - args['start_angle'], args["window_width"] // 2, args["window_height"] // 2)
+
+            ifs.iterate_pruned(
+                args['iteration_count'], view, (args["window_width"], args["window_height"]), args["min_size"],
+                args["stroke_width"], cancel=args.get("cancel")
+            )
+        with profile_phase(args, "transform"):
+            ifs.transform(view)
+            figures = ifs.figures_array
+    else:
+        iterations, workers, cancel = args['iteration_count'], args.get('workers', 1), args.get("cancel")
+        with profile_phase(args, "iterate"):
+            if cache is not None:
+                # Expanded from the deepest stored level, every new level is stored (with workers, the levels
+                # expanded serially and the last one)
+                key = GeometryCache.key("ifs-transformations", {
+                    "starting_figure": fractal['starting_figure'], "mappings": fractal['mappings']
+                })
+                with profile_phase(args, "cache"):
+                    level, transformations = cache.nearest(key, iterations)
+                if transformations is not None:
+                    ifs.restore(transformations, level)
+
+                def store_level(transformations: np.ndarray, level: int) -> None:
+                    with profile_phase(args, "cache"):
+                        cache.store(key, level, transformations)
+
+                # Figures are built only for the last level
+                ifs.add_level_expanded_subscriber(store_level)
+                ifs.iterate(iterations - level, workers, cancel)
+            else:
+                ifs.iterate(iterations, workers, cancel)
+
+        with profile_phase(args, "transform"):
+            ifs.scale(args['scale'])
+            ifs.rotate(180 - args['start_angle'])
+            ifs.center_to(args["window_width"] // 2, args["window_height"] // 2)
+            figures = ifs.figures_array
 
     # Plot figures
-    figures_listified = []
-    for figure in result_figures:
-        figure_listified = []
-        for point in figure: figure_listified.append(point.as_list)
-        figures_listified.append(figure_listified)
+    renderer.draw_polygons(figures, args['fill_color'], args['stroke_color'], args["stroke_width"])
+
+
+def TEA_cell_color(iterations: int, z: complex, max_iterations: int, palette: tuple, colors: bool = True) -> str:
+    """
+    Determines the color of a TEA grid cell (smooth coloring of the escape time).
 
-    for figure in figures_listified:
-        canvas.create_polygon(*[coord for point in figure for coord in point], fill=args['fill_color'], outline=args['stroke_color'], width=args["stroke_width"])
+    Parameters:
+        iterations (int): The number of iterations before the sequence escaped.
+        z (complex): The last computed member of the sequence.
+        max_iterations (int): The maximum number of iterations.
+        palette (tuple): The palette (see 'load_palette').
+        colors (bool): Whether escaping points are colored (otherwise they are not drawn). Defaults to True.
+
+    Returns:
+        str: The hexadecimal color, or None if the cell is not drawn.
+    """
+    if iterations >= max_iterations:
+        # Point lies inside the set
+        return "#000000"
+
+    # Black-and-white coloring used (point not drawn)
+    if not colors:
+        return None
 
+    abs_z = max(abs(z), 1e-10)
+    smooth_iter = iterations + 1 - math.log(math.log(abs_z)) / math.log(2)
+    return palette_color(palette, smooth_iter / max_iterations)
+
+
+def region_TEA(fractal: dict, args: dict, rectangle: tuple, width: int, height: int) -> TEA:
+    """
+    Computes the escape times of a region of a TEA fractal.
 
-def draw_TEA(fractal: dict, args: dict, canvas: object) -> None:
+    Parameters:
+        fractal (dict): The fractal definition.
+        args (dict): Configuration for drawing (window size, step, iteration count and precision are used).
+        rectangle (tuple): The region as (x_min, y_min, x_max, y_max) in window coordinates of the whole plot range.
+        width (int): The width of the region in pixels.
+        height (int): The height of the region in pixels.
+
+    Returns:
+        TEA: The iterated sequence of the region.
+    """
+    x_min, x_max, y_min, y_max = fractal["plot_range"]
+    x_scale = (x_max - x_min) / args["window_width"]
+    y_scale = (y_max - y_min) / args["window_height"]
+    bounds = (
+        x_min + rectangle[0] * x_scale, x_min + rectangle[2] * x_scale,
+        y_min + rectangle[1] * y_scale, y_min + rectangle[3] * y_scale
+    )
+
+    tea = TEA(
+        width, height, fractal["sequence"], args["step"], fractal["escape_radius"], bounds,
+        fractal["next_member"], fractal["explore_var"], args.get("precision"), TEA_share_tolerance(args)
+    )
+    tea.iterate(args["iteration_count"], args.get("cancel"))
+    return tea
+
+
+def compute_TEA_region(fractal: dict, args: dict, rectangle: tuple, width: int, height: int) -> list:
+    """
+    Computes the cell colors of a region of a TEA fractal.
+
+    Parameters:
+        fractal (dict): The fractal definition.
+        args (dict): Configuration for drawing (window size, step, iteration count and colors are used).
+        rectangle (tuple): The region as (x_min, y_min, x_max, y_max) in window coordinates of the whole plot range.
+        width (int): The width of the region in pixels.
+        height (int): The height of the region in pixels.
+
+    Returns:
+        list: A list of rows of cell colors (None for cells which are not drawn).
+    """
+    max_iterations = args["iteration_count"]
+    tea = region_TEA(fractal, args, rectangle, width, height)
+
+    palette = load_palette(args["colors_file"])
+    return [
+        [TEA_cell_color(iterations, z, max_iterations, palette, args["no_colors"]) for iterations, z in zip(counts, values)]
+        for counts, values in zip(tea.point_iteration_counts, tea.point_last_values)
+    ]
+
+
+def TEA_share_tolerance(args: dict) -> int:
+    """
+    Gets the tolerance of orbit sharing of TEA fractals.
+
+    Parameters:
+        args (dict): Configuration for drawing.
+
+    Returns:
+        int: The tolerance, or None if orbits are not shared.
+    """
+    return args.get("share_tolerance")
+
+
+def draw_TEA(fractal: dict, args: dict, renderer: IRenderer) -> None:
     width, height = args['window_width'], args['window_height']
     step = args['step']
     max_iterations = args['iteration_count']
@@ -128,30 +621,65 @@ def draw_TEA(fractal: dict, args: dict, canvas: object) -> None:
     draw_boundary = args['draw_boundary']
     no_colors = args['no_colors']
 
-    tea = TEA(width, height, sequence, step, escape_radius, tuple(plot_range), next_member, explore_var)
-    tea.iterate(max_iterations)
-    iter_counts = tea.point_iteration_counts
-    final_values = tea.point_last_values
+    tea = TEA(
+        width, height, sequence, step, escape_radius, tuple(plot_range), next_member, explore_var,
+        args.get("precision"), TEA_share_tolerance(args)
+    )
 
-    # Drawing information
-    point_size = step / 2
-    correction = 1
+    # Orbit density (Buddhabrot) instead of escape times
+    if args.get("orbits"):
+        with profile_phase(args, "iterate"):
+            density = tea.orbit_density(
+                args["orbits"], max_iterations, args.get("orbit_bands"), args.get("workers", 1), cancel=args.get("cancel")
+            )
+        with profile_phase(args, "color"):
+            draw_orbit_density(density, renderer, step)
+        return
+
+    if args["prompt"]:
+        tea.add_progress_subscriber(lambda done, total: print(f"Computed rows: {done}/{total}"))
 
     # Parse interpolation colors
-    colors_file = args["colors_file"]
-    with open(colors_file) as f:
-        try:
-            colors = json.loads(f.read())
-        except json.JSONDecodeError as err:
-            print(err)
-            sys.exit(-1)
+    palette = load_palette(args["colors_file"])
+
+    def cell_color(iterations: int, z: complex) -> str:
+        return TEA_cell_color(iterations, z, max_iterations, palette, no_colors)
+
+    def draw_rows(rows: list) -> None:
+        with profile_phase(args, "color"):
+            raster = [[cell_color(iterations, z) for iterations, z in zip(counts, values)] for _, counts, values in rows]
+        renderer.draw_raster(raster, y=rows[0][0] * step, cell_size=step)
+
+    profiler = args.get("profiler")
+    if profiler is not None:
+        def count_rows(rows: list) -> None:
+            for _, counts, _ in rows:
+                profiler.count("tea_points", len(counts))
+                profiler.count("tea_escaped", sum(count < max_iterations for count in counts))
+        tea.add_rows_computed_subscriber(count_rows)
+
+    if not draw_boundary:
+        # Strips of rows are drawn as soon as they are computed (each cell is a square of the step size)
+        tea.add_rows_computed_subscriber(draw_rows)
+
+    with profile_phase(args, "iterate"):
+        tea.iterate(max_iterations, args.get("cancel"))
+    if args["prompt"]:
+        print(f"TEA precision: {tea.precision_description}, relative pixel spacing {relative_spacing(tuple(plot_range), width, height, step):.1e}")
+        if tea.orbit_sharing:
+            total = tea.evaluated_iterations + tea.saved_iterations
+            print(f"TEA orbit sharing: saved {tea.saved_iterations} of {total} iterations ({tea.saved_iterations / max(total, 1):.1%})")
+    if profiler is not None:
+        profiler.count("tea_orbit_steps", tea.evaluated_iterations)
+        profiler.count("tea_saved_steps", tea.saved_iterations)
+    if not draw_boundary:
+        return
 
-    hue_points = [(i, h) for i, h in enumerate(colors["hue"])]
-    saturation_points = [(i, s) for i, s in enumerate(colors["saturation"])]
-    value_points = [(i, v) for i, v in enumerate(colors["value"])]
+    iter_counts = tea.point_iteration_counts
+    final_values = tea.point_last_values
 
-    # Draw only boundary, if required
-    if draw_boundary:
+    with profile_phase(args, "color"):
+        # Draw only the boundary (cells inside the set next to a cell outside it)
         h_px = len(iter_counts)
         w_px = len(iter_counts[0])
         inside = [
@@ -169,47 +697,152 @@ def draw_TEA(fractal: dict, args: dict, canvas: object) -> None:
                                 boundary_mask[y][x] = True
                                 break
 
-    for x in range(len(iter_counts[0])):
-        for y in range(len(iter_counts)):
-
-            if draw_boundary and not boundary_mask[y][x]:
-                continue
-
-            iterations = iter_counts[y][x]
-            if iterations < max_iterations:
-                z = final_values[y][x]
-                abs_z = abs(z)
-                if abs_z < 1e-10:
-                    abs_z = 1e-10
-
-                # Black-and-white coloring used
-                if not no_colors:
-                    hex_color = "#FFFFFF"
-                    continue
-                
-                smooth_iter = iterations + 1 - math.log(math.log(abs_z)) / math.log(2)
-                norm = smooth_iter / max_iterations
-
-                # LERP
-                hue = min(1, max(lagrange_interpolate(hue_points, norm), 0))
-                saturation = min(1, max(lagrange_interpolate(saturation_points, norm), 0))
-                value = min(1, max(lagrange_interpolate(value_points, norm), 0))
-                
-                hex_color = hsv_to_hex(hue, saturation, value)
-            else:
-                # Point lies inside the set
-                hex_color = "#000000"
-
-            # Draw circle
-            # x1 = step * x - point_size
-            # y1 = step * y - point_size
-            # x2 = step * x + point_size
-            # y2 = step * y + point_size
-            # canvas.create_oval(x1, y1, x2, y2, fill=hex_color, outline="")
-
-            # Draw rectangle
-            x1 = step * x - correction
-            y1 = step * y - correction
-            x2 = step * x + 2 * point_size + correction
-            y2 = step * y + 2 * point_size + correction
-            canvas.create_rectangle(x1, y1, x2, y2, fill=hex_color, outline="")
\ No newline at end of file
+        # Cells which are not drawn stay None
+        raster = [[None] * len(iter_counts[0]) for _ in range(len(iter_counts))]
+
+        for x in range(len(iter_counts[0])):
+            check_cancelled(args.get("cancel"))
+            for y in range(len(iter_counts)):
+                if boundary_mask[y][x]:
+                    raster[y][x] = cell_color(iter_counts[y][x], final_values[y][x])
+
+    # Draw all cells at once (each cell is a square of the step size)
+    renderer.draw_raster(raster, cell_size=step)
+
+
+def compute_TEA_tile(fractal: dict, args: dict, rectangle: tuple, width: int, height: int) -> tuple:
+    """
+    Computes the escape times of a tile of a poster (run in a worker process, see 'draw_TEA_poster').
+
+    Parameters:
+        fractal (dict): The fractal definition.
+        args (dict): Configuration for drawing (window size, step, iteration count and precision are used).
+        rectangle (tuple): The tile as (x_min, y_min, x_max, y_max) in window coordinates of the whole plot range.
+        width (int): The width of the tile in pixels.
+        height (int): The height of the tile in pixels.
+
+    Returns:
+        tuple: Arrays of the escape times and the magnitudes of the last members of the sequence of the cells.
+    """
+    tea = region_TEA(fractal, args, rectangle, width, height)
+    counts = np.array(tea.point_iteration_counts, dtype=np.uint32)
+    magnitudes = np.abs(np.array(tea.point_last_values, dtype=complex)).astype(np.float32)
+    return counts, magnitudes
+
+
+def TEA_color_table(palette: tuple, levels: int = 4096) -> np.ndarray:
+    """
+    Samples the palette at evenly spaced positions (the smooth coloring of many cells is looked up in the table).
+
+    Parameters:
+        palette (tuple): The palette (see 'load_palette').
+        levels (int): The number of sampled positions. Defaults to 4096.
+
+    Returns:
+        np.ndarray: An array of shape (levels, 3) of 8-bit RGB values.
+    """
+    return np.array([color_to_rgb(palette_color(palette, level / (levels - 1))) for level in range(levels)], dtype=np.uint8)
+
+
+def TEA_poster_rows(counts: np.ndarray, magnitudes: np.ndarray, max_iterations: int, table: np.ndarray, colors: bool = True) -> np.ndarray:
+    """
+    Colors rows of TEA grid cells (the smooth coloring of 'TEA_cell_color' with the palette quantized to a table).
+
+    Parameters:
+        counts (np.ndarray): The escape times of the cells.
+        magnitudes (np.ndarray): The magnitudes of the last members of the sequence of the cells.
+        max_iterations (int): The maximum number of iterations.
+        table (np.ndarray): The sampled palette (see 'TEA_color_table').
+        colors (bool): Whether escaping points are colored (otherwise they are white). Defaults to True.
+
+    Returns:
+        np.ndarray: An array of shape (rows, columns, 3) of 8-bit RGB values.
+    """
+    escaped = counts < max_iterations
+    if colors:
+        with np.errstate(all="ignore"):
+            smooth = counts + 1 - np.log(np.log(np.maximum(magnitudes, 1e-10))) / math.log(2)
+            norm = np.nan_to_num(smooth / max_iterations, nan=0.0, posinf=1.0, neginf=0.0)
+        image = table[np.clip(np.rint(norm * (len(table) - 1)), 0, len(table) - 1).astype(np.intp)]
+    else:
+        image = np.full(counts.shape + (3,), 255, dtype=np.uint8)
+
+    # Points inside the set are black
+    image[~escaped] = 0
+    return image
+
+
+def draw_TEA_poster(fractal: dict, args: dict, poster: Poster, path: str) -> None:
+    """
+    Draws a TEA fractal of any size into a PNG file. The grid is computed tile by tile into the files of the poster
+    (tiles completed by an interrupted run are not computed again), then it is colored and encoded in blocks of rows,
+    so the memory used does not depend on the size of the image.
+
+    Parameters:
+        fractal (dict): The fractal definition.
+        args (dict): Configuration for drawing.
+        poster (Poster): The storage of the grid (of the window size divided by the step).
+        path (str): The path of the PNG file.
+    """
+    width, height = args["window_width"], args["window_height"]
+    step = args["step"]
+    max_iterations = args["iteration_count"]
+    profiler = args.get("profiler")
+
+    # Worker processes get the configuration without the profiler and the cancellation event; all tiles use the
+    # precision of the whole image
+    tile_args = {name: value for name, value in args.items() if name not in ("profiler", "cancel")}
+    tile_args["precision"] = args.get("precision") or choose_precision(tuple(fractal["plot_range"]), width, height, step)
+
+    def tile_task(index: int) -> tuple:
+        column_min, row_min, column_max, row_max = poster.tile(index)
+        rectangle = (column_min * step, row_min * step, column_max * step, row_max * step)
+        return fractal, tile_args, rectangle, (column_max - column_min) * step, (row_max - row_min) * step
+
+    def store(index: int, result: tuple) -> None:
+        poster.store(index, *result)
+        if profiler is not None:
+            profiler.count("poster_tiles")
+        if args["prompt"]:
+            print(f"Computed tiles: {poster.completed_count}/{poster.tile_count}")
+
+    pending = poster.pending()
+    if len(pending) < poster.tile_count:
+        print(f"Poster: resuming with {poster.tile_count - len(pending)} of {poster.tile_count} tiles completed")
+
+    with profile_phase(args, "iterate"):
+        workers = args.get("workers", 1)
+        if workers > 1 and len(pending) > 1:
+            with worker_pool(workers) as executor:
+                # At most two tiles per worker are in flight, so finished tiles do not pile up in memory
+                tasks, running = iter(pending), {}
+                for index in tasks:
+                    running[executor.submit(compute_TEA_tile, *tile_task(index))] = index
+                    if len(running) >= 2 * workers:
+                        done, _ = wait(running, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            store(running.pop(future), future.result())
+                for future in list(running):
+                    store(running.pop(future), future.result())
+        else:
+            for index in pending:
+                store(index, compute_TEA_tile(*tile_task(index)))
+
+    table = TEA_color_table(load_palette(args["colors_file"]))
+    block = max(1, (1 << 18) // poster.columns)
+    with PngWriter(path, width, height) as writer:
+        for start in range(0, poster.rows, block):
+            with profile_phase(args, "color"):
+                counts, magnitudes = poster.read_rows(start, min(start + block, poster.rows))
+                cells = TEA_poster_rows(counts, magnitudes, max_iterations, table, args["no_colors"])
+
+                # Cells are squares of the step size, pixels right of the grid are white
+                rows = np.full((len(cells) * step, width, 3), 255, dtype=np.uint8)
+                rows[:, :poster.columns * step] = np.repeat(np.repeat(cells, step, axis=0), step, axis=1)
+            with profile_phase(args, "output"):
+                writer.write_rows(rows)
+
+        # Pixels below the grid are white
+        for start in range(poster.rows * step, height, block):
+            with profile_phase(args, "output"):
+                writer.write_rows(np.full((min(block, height - start), width, 3), 255, dtype=np.uint8))
@@ -1,38 +1,127 @@
-
 from components.fractals.i_iterable import IFractalIterable
 from components.fractals.i_transformable import IFractalTransformable
 
 from components.vector import Vector
-from copy import deepcopy
+from components.event import Event, ProgressEvent
+from components.cancellation import check_cancelled, pool_map, worker_pool
 import math
+import numpy as np
+
+from multiprocessing import resource_tracker, shared_memory
 
 class IFS(IFractalTransformable):
     """
     Iterated Function System (IFS) class for generating fractal transformations.
     """
-    def __init__(self, starting_figure: list, tr_coefs: list = []) -> None:
+    def __init__(self, starting_figure: list, tr_coefs: list = [], deduplicate: bool = True, tolerance: float = 1e-9) -> None:
         """
         Initializes an instance of the IFS class.
         
         Parameters:
             starting_figure (list): A list representing the initial set of points in the figure.
             tr_coefs (list): A list of transformation coefficients for generating new figures.
+            deduplicate (bool): Remove duplicate figures and figures with equal composed transformations during
+                iteration. Defaults to True.
+            tolerance (float): The size of the quantisation step used to compare figures and transformations
+                (relative to the size of the starting figure). Defaults to 1e-9.
         """
-        self._figures = [starting_figure]
+        # Starting figure and composed transformations (linear parts and offsets) of all figures, each figure
+        # being the image of the starting figure
+        self._start = np.array([(point.x, point.y) for point in starting_figure], dtype=float).reshape(-1, 2)
+        self._linear = np.eye(2)[np.newaxis]
+        self._offsets = np.zeros((1, 2))
+
+        # All (distinct) figures stored as a single (figures, points, 2) array
+        self._figures = self._start[np.newaxis]
         self._total_iterations = 0
 
+        self._deduplicate = deduplicate
+        extent = np.ptp(self._start, axis=0).max() if len(self._start) else 0
+        self._quantum = tolerance * (extent if extent > 0 else 1)
+
+        # View transform (3x3 affine matrix) accumulated by 'scale', 'rotate', 'translate' and 'center_to',
+        # applied to the figures only when they are read out
+        self._view = np.eye(3)
+        self._viewed_figures = None
+
+        self._iteration_performed = Event()
+        self._level_expanded = Event()
+        self._progress = ProgressEvent()
+
         # Min/max coords (used for centering)
         self._x_min, self._y_min, self._x_max, self._y_max = 0, 0, 0, 0
         self.__update_min_max_coords()
 
-        self._transformations = set()
-        for tpl in tr_coefs:
-            def transformation(point, tpl=deepcopy(tpl)):
-                return Vector(
-                    tpl[0]*point.x + tpl[1]*point.y + tpl[4],
-                    tpl[2]*point.x + tpl[3]*point.y + tpl[5]
-                )
-            self._transformations.add(transformation)
+        # Transformations (x, y) -> (a*x + b*y + e, c*x + d*y + f) as 2x2 matrices and offsets, in the given order
+        coefs = np.array(tr_coefs, dtype=float).reshape(-1, 6)
+        self._matrices = coefs[:, :4].reshape(-1, 2, 2)
+        self._matrix_offsets = coefs[:, 4:]
+
+    def add_iteration_performed_subscriber(self, method) -> None:
+        """
+        Adds a subscriber to be notified when an iteration is performed.
+        
+        Parameters:
+            method: A callback function called with the array of figures of the new level and the total iteration count.
+        """
+        self._iteration_performed += method
+
+    def remove_iteration_performed_subscriber(self, method) -> None:
+        """
+        Removes a previously added iteration subscriber.
+        
+        Parameters:
+            method: The callback function to be removed.
+        """
+        self._iteration_performed -= method
+
+    def add_level_expanded_subscriber(self, method) -> None:
+        """
+        Adds a subscriber to be notified when a level is expanded (unlike 'iteration_performed', the figures of
+        the level are not built).
+
+        Parameters:
+            method: A callback function called with the composed transformations of the new level (see
+                'transformations') and the total iteration count.
+        """
+        self._level_expanded += method
+
+    def remove_level_expanded_subscriber(self, method) -> None:
+        """
+        Removes a previously added level subscriber.
+
+        Parameters:
+            method: The callback function to be removed.
+        """
+        self._level_expanded -= method
+
+    def add_progress_subscriber(self, method) -> None:
+        """
+        Adds a subscriber to the (rate-limited) progress event.
+        
+        Parameters:
+            method: A callback function called with the number of performed and requested iterations.
+        """
+        self._progress += method
+
+    def remove_progress_subscriber(self, method) -> None:
+        """
+        Removes a previously added progress subscriber.
+        
+        Parameters:
+            method: The callback function to be removed.
+        """
+        self._progress -= method
+
+    @property
+    def total_iterations(self) -> int:
+        """
+        The total number of iterations performed.
+        
+        Returns:
+            int: The total number of iterations.
+        """
+        return self._total_iterations
 
     @property
     def figures(self) -> list:
@@ -42,27 +131,355 @@ class IFS(IFractalTransformable):
         Returns:
             list: A list of figures, each represented by a list of Vector points.
         """
-        return list(self._figures)
+        return [[Vector(x, y) for x, y in figure] for figure in self.figures_array.tolist()]
+
+    @property
+    def figures_array(self) -> np.ndarray:
+        """
+        All generated figures (with the view transform applied) as a single array. The array is shared
+        between calls, until the figures or the view change.
+        
+        Returns:
+            np.ndarray: An array of shape (figures, points, 2).
+        """
+        if self._viewed_figures is None:
+            if np.array_equal(self._view, np.eye(3)):
+                self._viewed_figures = self._figures
+            else:
+                self._viewed_figures = self._figures @ self._view[:2, :2].T + self._view[:2, 2]
+        return self._viewed_figures
 
-    def iterate(self, iterations: int) -> None:
+    @property
+    def transformations(self) -> np.ndarray:
+        """
+        The composed transformations of all figures (with the view transform applied), each figure being the image
+        of the starting figure.
+
+        Returns:
+            np.ndarray: An array of shape (figures, 6) of the coefficients (a, b, c, d, e, f) of the transformations
+                (x, y) -> (a*x + b*y + e, c*x + d*y + f).
+        """
+        self.__apply_view()
+        return np.hstack((self._linear.reshape(-1, 4), self._offsets))
+
+    def restore(self, transformations: np.ndarray, iterations: int) -> None:
+        """
+        Replaces the figures by the images of the starting figure under given transformations (e.g. stored
+        'transformations' of an earlier expansion), so that iterating continues from them. The view is reset.
+
+        Parameters:
+            transformations (np.ndarray): An array of shape (figures, 6) of the transformation coefficients.
+            iterations (int): The number of iterations the transformations correspond to.
+        """
+        transformations = np.asarray(transformations, dtype=float).reshape(-1, 6)
+        self._linear = transformations[:, :4].reshape(-1, 2, 2)
+        self._offsets = transformations[:, 4:]
+        self._total_iterations = iterations
+        self._view = np.eye(3)
+        self.__update_figures()
+
+    def iterate(self, iterations: int, workers: int = 1, cancel: object = None) -> None:
         """
         Performs a specified number of iterations.
+
+        With more than one worker, the top levels are expanded serially until there are enough subtrees, which are
+        then expanded by a pool of worker processes (the figure order is the same as in the serial expansion). In that
+        case, 'iteration_performed' and 'level_expanded' are raised only for the serial levels and the last one.
         
         Parameters:
             iterations (int): The number of iterations to perform.
+            workers (int): The number of worker processes. Defaults to 1 (serial expansion).
+            cancel (object): The cancellation event (a threading.Event) checked before every level and while waiting
+                for the workers. Defaults to None.
+
+        Raises:
+            RenderCancelled: If the cancellation event has been set.
         """
-        for _ in range(iterations):
-            figures_new = []
-            
-            # Apply all transformations on each figure
-            for figure in self._figures:
-                for tr in self._transformations:
-                    figure_new = []
-                    for point in figure: figure_new.append(tr(point))
+        self.__apply_view()
 
-                    figures_new.append(figure_new)
-        
-            self._figures = figures_new
+        for i in range(iterations):
+            check_cancelled(cancel)
+            if workers > 1 and len(self._linear) >= 4 * workers and i < iterations - 1:
+                self.__iterate_parallel(iterations - i, workers, cancel)
+                if self._progress:
+                    self._progress.report(iterations, iterations)
+                break
+
+            # Compose all transformations with all figure transformations at once (new figures ordered by figure,
+            # then by transformation)
+            linear, offsets = _compose_children(self._matrices, self._matrix_offsets, self._linear, self._offsets)
+            if self._deduplicate:
+                kept = _unique_transformations(linear, offsets, self._quantum)
+                linear, offsets = linear[kept], offsets[kept]
+            self._linear, self._offsets = linear, offsets
+            self._total_iterations += 1
+
+            if self._level_expanded:
+                self._level_expanded(np.hstack((self._linear.reshape(-1, 4), self._offsets)), self._total_iterations)
+            if self._iteration_performed:
+                self.__update_figures()
+                self._iteration_performed(self._figures, self._total_iterations)
+            if self._progress:
+                self._progress.report(i + 1, iterations)
+
+        self.__update_figures()
+
+    def __iterate_parallel(self, iterations: int, workers: int, cancel: object = None) -> None:
+        """
+        Expands the subtrees of all current figures by a pool of worker processes. Every worker returns
+        the composed transformations of its subtrees through a shared memory block.
+
+        Parameters:
+            iterations (int): The number of iterations to perform.
+            workers (int): The number of worker processes.
+            cancel (object): The cancellation event (a threading.Event). Defaults to None.
+        """
+        chunk_count = 4 * workers
+        bounds = np.linspace(0, len(self._linear), chunk_count + 1).astype(int)
+        chunks = [(self._linear[start:end], self._offsets[start:end]) for start, end in zip(bounds[:-1], bounds[1:])]
+
+        # Workers must share the resource tracker of this process, otherwise their trackers would destroy
+        # the returned blocks when the workers exit
+        resource_tracker.ensure_running()
+        with worker_pool(workers) as executor:
+            results = pool_map(
+                executor, _expand_subtrees,
+                [self._matrices] * chunk_count, [self._matrix_offsets] * chunk_count,
+                [linear for linear, _ in chunks], [offsets for _, offsets in chunks],
+                [iterations] * chunk_count, [self._quantum if self._deduplicate else None] * chunk_count,
+                cancel=cancel, discard=_release_block
+            )
+
+        transformations = []
+        for name, count in results:
+            block = shared_memory.SharedMemory(name=name)
+            try:
+                transformations.append(np.ndarray((count, 6), dtype=float, buffer=block.buf).copy())
+            finally:
+                block.close()
+                block.unlink()
+        transformations = np.concatenate(transformations)
+
+        linear, offsets = transformations[:, :4].reshape(-1, 2, 2), transformations[:, 4:]
+        if self._deduplicate:
+            # Equal subtrees may have been expanded by different workers
+            kept = _unique_transformations(linear, offsets, self._quantum)
+            linear, offsets = linear[kept], offsets[kept]
+        self._linear, self._offsets = linear, offsets
+        self._total_iterations += iterations
+
+        if self._level_expanded:
+            self._level_expanded(np.hstack((self._linear.reshape(-1, 4), self._offsets)), self._total_iterations)
+        if self._iteration_performed:
+            self.__update_figures()
+            self._iteration_performed(self._figures, self._total_iterations)
+
+    @property
+    def prunable(self) -> bool:
+        """
+        Whether 'iterate_pruned' can be used, i.e. every transformation is contractive or an isometry fixing the
+        center of the starting figure.
+
+        Returns:
+            bool: True if the figures can be pruned, False otherwise.
+        """
+        return self.__invariant_radius(self._start.mean(axis=0)) is not None
+
+    def __invariant_radius(self, center: np.ndarray) -> float:
+        # Radius of a disc around the center containing the starting figure and mapped into itself by all
+        # transformations (None if there is no such disc)
+        radius = np.linalg.norm(self._start - center, axis=1).max()
+        drifts = np.linalg.norm(np.einsum('kij,j->ki', self._matrices, center) + self._matrix_offsets - center, axis=1)
+        for norm, drift in zip(_spectral_norms(self._matrices), drifts):
+            if norm < 1:
+                radius = max(radius, drift / (1 - norm))
+            elif norm > 1 + 1e-12 or drift > 1e-12:
+                return None
+        return radius
+
+    def iterate_pruned(self, iterations: int, view: np.ndarray, window: tuple, min_size: float = 1, margin: float = 0, batch_size: int = 65536, cancel: object = None) -> None:
+        """
+        Performs a specified number of iterations, refining only the figures that are visible and large enough
+        in the final view.
+
+        The expansion tree is descended depth-first (in batches). Every subtree lies within the image of a disc which
+        contains the starting figure and is mapped into itself by all transformations. A subtree is dropped if
+        the projection of its disc misses the window and is emitted as a single figure if the projection is smaller
+        than 'min_size' pixels. The number of resulting figures is thus bounded by the window resolution rather than
+        by the number of transformations to the power of 'iterations'.
+
+        Parameters:
+            iterations (int): The maximum number of iterations to perform.
+            view (np.ndarray): The 2x3 affine matrix mapping figure coordinates to window coordinates.
+            window (tuple): The window size as (width, height).
+            min_size (float): The projected size (in pixels) below which subtrees are not refined. Defaults to 1.
+            margin (float): The margin (in pixels) added around the window. Defaults to 0.
+            batch_size (int): The maximum number of subtrees processed at once. Defaults to 65536.
+            cancel (object): The cancellation event (a threading.Event) checked before every batch. Defaults to None.
+
+        Raises:
+            ValueError: If some transformation is neither contractive nor an isometry fixing the disc center (see
+                'prunable').
+            RenderCancelled: If the cancellation event has been set.
+        """
+        self.__apply_view()
+
+        view = np.asarray(view, dtype=float)
+        view_linear, view_offset = view[:, :2], view[:, 2]
+        width, height = window
+
+        # Disc mapped into itself by all transformations
+        center = self._start.mean(axis=0)
+        radius = self.__invariant_radius(center)
+        if radius is None:
+            raise ValueError("IFS error: pruning requires contractive mappings (or isometries fixing the figure center).")
+
+        emitted_linear, emitted_offsets = [], []
+        stack = [(self._linear, self._offsets, 0)]
+        while stack:
+            check_cancelled(cancel)
+            linear, offsets, depth = stack.pop()
+
+            # Projected bounding discs of the subtrees
+            projected = view_linear @ linear
+            centers = projected @ center + offsets @ view_linear.T + view_offset
+            radii = _spectral_norms(projected) * radius
+
+            visible = (
+                (centers[:, 0] + radii >= -margin) & (centers[:, 0] - radii <= width + margin) &
+                (centers[:, 1] + radii >= -margin) & (centers[:, 1] - radii <= height + margin)
+            )
+            finished = visible & ((2 * radii < min_size) | (depth == iterations))
+            expanded = visible & ~finished
+
+            if finished.any():
+                emitted_linear.append(linear[finished])
+                emitted_offsets.append(offsets[finished])
+
+            if expanded.any():
+                children_linear, children_offsets = _compose_parents(self._matrices, self._matrix_offsets, linear[expanded], offsets[expanded])
+                if self._deduplicate:
+                    kept = _unique_transformations(children_linear, children_offsets, self._quantum)
+                    children_linear, children_offsets = children_linear[kept], children_offsets[kept]
+
+                # Push in reverse order, so that the first batch is processed first
+                for start in reversed(range(0, len(children_linear), batch_size)):
+                    end = start + batch_size
+                    stack.append((children_linear[start:end], children_offsets[start:end], depth + 1))
+
+        self._linear = np.concatenate(emitted_linear) if emitted_linear else np.empty((0, 2, 2))
+        self._offsets = np.concatenate(emitted_offsets) if emitted_offsets else np.empty((0, 2))
+        self._total_iterations += iterations
+        self.__update_figures()
+
+    def view_matrix(self, factor: float, angle: float, xc: float, yc: float) -> np.ndarray:
+        """
+        Determines the affine transform equivalent to calling 'scale', 'rotate' and 'center_to' (in this order)
+        on the current figures, without modifying them.
+
+        Parameters:
+            factor (float): The factor by which to scale the figures.
+            angle (float): The angle in degrees by which to rotate the figures.
+            xc (float): The x-coordinate of the new center position.
+            yc (float): The y-coordinate of the new center position.
+
+        Returns:
+            np.ndarray: The 2x3 affine matrix.
+        """
+        view, bounds = self._view, (self._x_min, self._y_min, self._x_max, self._y_max)
+
+        self.scale(factor)
+        self.rotate(angle)
+        self.center_to(xc, yc)
+        matrix = self._view @ np.linalg.inv(view)
+
+        self._view, self._viewed_figures = view, None
+        self._x_min, self._y_min, self._x_max, self._y_max = bounds
+
+        return matrix[:2]
+
+    def transform(self, matrix: np.ndarray) -> None:
+        """
+        Applies an affine transform to all figures (deferred until the figures are read out).
+
+        Parameters:
+            matrix (np.ndarray): The 2x3 affine matrix.
+        """
+        matrix = np.vstack((np.asarray(matrix, dtype=float), (0, 0, 1)))
+        self.__compose_view(matrix)
+        self.__update_min_max_coords()
+
+    def chaos_game(self, samples: int, width: int, height: int, probabilities: list = None, rotation: float = 0, walkers: int = 4096, burn_in: int = 20, seed: int = None, cancel: object = None) -> np.ndarray:
+        """
+        Renders the attractor of the IFS by random iteration (the chaos game) into a pixel density grid.
+
+        Many independent walkers are advanced at once, each applying a randomly chosen transformation in every step.
+        After a burn-in, the visited points are counted in a grid fitted to the attractor (rotated by a given angle).
+        The cost is linear in the number of samples and independent of the iteration depth.
+
+        Parameters:
+            samples (int): The total number of accumulated points.
+            width (int): The width of the density grid.
+            height (int): The height of the density grid.
+            probabilities (list): The probability of each transformation. Defaults to values proportional to the
+                absolute determinants of the transformations.
+            rotation (float): The angle in degrees by which the attractor is rotated. Defaults to 0.
+            walkers (int): The number of independent walkers. Defaults to 4096.
+            burn_in (int): The number of steps made before points are accumulated. Defaults to 20.
+            seed (int): The seed of the random number generator. Defaults to None.
+            cancel (object): The cancellation event (a threading.Event) checked before every step of the walkers.
+                Defaults to None.
+
+        Returns:
+            np.ndarray: An integer array of shape (height, width) holding the number of hits of each pixel.
+
+        Raises:
+            RenderCancelled: If the cancellation event has been set.
+        """
+        rng = np.random.default_rng(seed)
+        count = len(self._matrices)
+
+        if probabilities is None:
+            # Singular maps would never be chosen, give them a small share
+            determinants = np.abs(np.linalg.det(self._matrices))
+            probabilities = np.maximum(determinants, 0.01 * determinants.mean() if determinants.any() else 1)
+        probabilities = np.asarray(probabilities, dtype=float)
+        probabilities = probabilities / probabilities.sum()
+
+        angle_radians = rotation * math.pi / 180
+        view = np.array([
+            [math.cos(angle_radians), -math.sin(angle_radians)],
+            [math.sin(angle_radians), math.cos(angle_radians)]
+        ])
+
+        def advance(points):
+            chosen = rng.choice(count, size=len(points), p=probabilities)
+            return np.einsum('wij,wj->wi', self._matrices[chosen], points) + self._matrix_offsets[chosen]
+
+        points = rng.random((walkers, 2))
+        for _ in range(burn_in):
+            points = advance(points)
+
+        # Fit the grid to the bounding box of a calibration run
+        low, high = np.full(2, np.inf), np.full(2, -np.inf)
+        for _ in range(32):
+            points = advance(points)
+            projected = points @ view.T
+            low, high = np.minimum(low, projected.min(axis=0)), np.maximum(high, projected.max(axis=0))
+
+        extent = np.maximum(high - low, 1e-12)
+        factor = 0.95 * min(width / extent[0], height / extent[1])
+        offset = np.array((width, height)) / 2 - factor * (low + high) / 2
+
+        density = np.zeros(width * height, dtype=np.int64)
+        for _ in range(-(-samples // walkers)):
+            check_cancelled(cancel)
+            points = advance(points)
+            pixels = np.floor((points @ view.T) * factor + offset).astype(np.int64)
+            inside = (pixels[:, 0] >= 0) & (pixels[:, 0] < width) & (pixels[:, 1] >= 0) & (pixels[:, 1] < height)
+            density += np.bincount(pixels[inside, 1] * width + pixels[inside, 0], minlength=width * height)
+
+        return density.reshape(height, width)
 
     def scale(self, factor: float) -> None:
         """
@@ -71,11 +488,11 @@ class IFS(IFractalTransformable):
         Parameters:
             factor (float): The factor by which to scale the figure.
         """
-        for figure in self._figures:
-            for i in range(len(figure)):
-                figure[i] *= factor
-        
-        self.__update_min_max_coords()
+        self.__compose_view(np.diag((factor, factor, 1)))
+
+        x_values, y_values = (factor * self._x_min, factor * self._x_max), (factor * self._y_min, factor * self._y_max)
+        self._x_min, self._x_max = min(x_values), max(x_values)
+        self._y_min, self._y_max = min(y_values), max(y_values)
 
     def translate(self, translation_vector: Vector) -> None:
         """
@@ -84,9 +501,10 @@ class IFS(IFractalTransformable):
         Parameters:
             translation_vector (Vector): The vector by which to translate the figure.
         """
-        for figure in self._figures:
-            for i in range(len(figure)):
-                figure[i] += translation_vector
+        self.__compose_view(np.array([[1, 0, translation_vector.x], [0, 1, translation_vector.y], [0, 0, 1]]))
+
+        self._x_min, self._x_max = self._x_min + translation_vector.x, self._x_max + translation_vector.x
+        self._y_min, self._y_max = self._y_min + translation_vector.y, self._y_max + translation_vector.y
 
     def rotate(self, angle: float) -> None:
         """
@@ -100,17 +518,23 @@ class IFS(IFractalTransformable):
         figure_center = Vector((self._x_min + self._x_max) // 2, (self._y_min + self._y_max) // 2)
         self.translate((-1) * figure_center)
 
-        for figure in self._figures:
-            for i in range(len(figure)):
-                point = figure[i]
-                figure[i] = Vector(
-                    point.x * math.cos(angle_radians) - point.y * math.sin(angle_radians),
-                    point.x * math.sin(angle_radians) + point.y * math.cos(angle_radians)
-                )
-        
+        cos, sin = math.cos(angle_radians), math.sin(angle_radians)
+        self.__compose_view(np.array([[cos, -sin, 0], [sin, cos, 0], [0, 0, 1]]))
+
         self.translate(figure_center)
 
-        self.__update_min_max_coords()
+        # Bounding box of a rotation by a multiple of 90 degrees follows from the previous one
+        quarter_turns = angle / 90
+        if quarter_turns == round(quarter_turns):
+            corners = [(x, y) for x in (self._x_min, self._x_max) for y in (self._y_min, self._y_max)]
+            corners = [(
+                figure_center.x + (x - figure_center.x) * round(cos) - (y - figure_center.y) * round(sin),
+                figure_center.y + (x - figure_center.x) * round(sin) + (y - figure_center.y) * round(cos)
+            ) for x, y in corners]
+            self._x_min, self._y_min = min(x for x, _ in corners), min(y for _, y in corners)
+            self._x_max, self._y_max = max(x for x, _ in corners), max(y for _, y in corners)
+        else:
+            self.__update_min_max_coords()
 
     def center_to(self, xc: float, yc: float) -> None:
         """
@@ -122,13 +546,190 @@ class IFS(IFractalTransformable):
         """
         figure_center = Vector((self._x_min + self._x_max) // 2, (self._y_min + self._y_max) // 2)
         self.translate(Vector(xc, yc) - figure_center)
+
+    def __compose_view(self, matrix: np.ndarray) -> None:
+        """
+        Composes the view transform with another affine transform (applied after it).
+        
+        Parameters:
+            matrix (np.ndarray): The 3x3 affine matrix.
+        """
+        self._view = matrix @ self._view
+        self._viewed_figures = None
+
+    def __apply_view(self) -> None:
+        """
+        Applies the view transform to the stored figures (and their composed transformations) and resets it.
+        """
+        if np.array_equal(self._view, np.eye(3)):
+            return
+
+        self._figures = self.figures_array
+        self._linear = self._view[:2, :2] @ self._linear
+        self._offsets = self._offsets @ self._view[:2, :2].T + self._view[:2, 2]
+        self._view = np.eye(3)
+
+    def __update_figures(self) -> None:
+        """
+        Computes the figures as images of the starting figure under the composed transformations, removing
+        duplicate figures (equal after quantisation, regardless of the order of their points).
+        """
+        figures = np.einsum('fij,pj->fpi', self._linear, self._start) + self._offsets[:, np.newaxis, :]
+
+        if self._deduplicate and len(figures) > 1:
+            keys = np.round(figures / self._quantum)
+            keys = keys[np.arange(len(keys))[:, np.newaxis], np.lexsort((keys[..., 1], keys[..., 0]), axis=1)]
+            figures = figures[_first_unique_rows(keys.reshape(len(keys), -1))]
+
+        self._figures = figures
+        self._viewed_figures = None
         self.__update_min_max_coords()
 
     def __update_min_max_coords(self) -> None:
         """
-        Updates the minimum and maximum X and Y coordinates for the figures.
+        Updates the minimum and maximum X and Y coordinates for the figures (with the view transform applied),
+        projecting the stored points in a single pass.
         """
-        self._x_min = min(point.x for figure in self._figures for point in figure)
-        self._y_min = min(point.y for figure in self._figures for point in figure)
-        self._x_max = max(point.x for figure in self._figures for point in figure)
-        self._y_max = max(point.y for figure in self._figures for point in figure)
+        if self._figures.size == 0:
+            self._x_min, self._y_min, self._x_max, self._y_max = 0, 0, 0, 0
+            return
+
+        points = self._figures.reshape(-1, 2)
+        x_values = points @ self._view[0, :2] + self._view[0, 2]
+        y_values = points @ self._view[1, :2] + self._view[1, 2]
+        self._x_min, self._x_max = float(x_values.min()), float(x_values.max())
+        self._y_min, self._y_max = float(y_values.min()), float(y_values.max())
+
+
+def _spectral_norms(matrices: np.ndarray) -> np.ndarray:
+    """
+    Computes the spectral norms (largest singular values) of 2x2 matrices, i.e. their maximal stretching factors.
+
+    Parameters:
+        matrices (np.ndarray): An array of shape (n, 2, 2).
+
+    Returns:
+        np.ndarray: An array of shape (n,).
+    """
+    squares = (matrices ** 2).sum(axis=(1, 2))
+    determinants = matrices[:, 0, 0] * matrices[:, 1, 1] - matrices[:, 0, 1] * matrices[:, 1, 0]
+    return np.sqrt((squares + np.sqrt(np.maximum(squares ** 2 - 4 * determinants ** 2, 0))) / 2)
+
+
+def _first_unique_rows(keys: np.ndarray) -> np.ndarray:
+    """
+    Finds the first occurrence of each distinct row.
+
+    Parameters:
+        keys (np.ndarray): A two-dimensional array.
+
+    Returns:
+        np.ndarray: The ascending indexes of the first occurrences.
+    """
+    if len(keys) < 2:
+        return np.arange(len(keys))
+
+    # Stable sort of the rows, so that the first row of every group of equal rows is its first occurrence
+    order = np.lexsort(keys.T[::-1])
+    keys = keys[order]
+    first = np.ones(len(keys), dtype=bool)
+    first[1:] = (keys[1:] != keys[:-1]).any(axis=1)
+    return np.sort(order[first])
+
+
+def _compose_children(matrices: np.ndarray, matrix_offsets: np.ndarray, linear: np.ndarray, offsets: np.ndarray) -> tuple:
+    """
+    Applies all transformations after the given composed transformations (T o C for each C, then each T).
+
+    Parameters:
+        matrices (np.ndarray): The linear parts of the IFS transformations, an array of shape (k, 2, 2).
+        matrix_offsets (np.ndarray): The offsets of the IFS transformations, an array of shape (k, 2).
+        linear (np.ndarray): The linear parts of the composed transformations, an array of shape (n, 2, 2).
+        offsets (np.ndarray): The offsets of the composed transformations, an array of shape (n, 2).
+
+    Returns:
+        tuple: The linear parts and offsets of the new transformations.
+    """
+    children_linear = np.einsum('kij,fjl->fkil', matrices, linear).reshape(-1, 2, 2)
+    children_offsets = (np.einsum('kij,fj->fki', matrices, offsets) + matrix_offsets[np.newaxis]).reshape(-1, 2)
+    return children_linear, children_offsets
+
+
+def _compose_parents(matrices: np.ndarray, matrix_offsets: np.ndarray, linear: np.ndarray, offsets: np.ndarray) -> tuple:
+    """
+    Applies all transformations before the given composed transformations (C o T for each C, then each T),
+    i.e. descends one level in the expansion tree of each C.
+
+    Parameters:
+        matrices (np.ndarray): The linear parts of the IFS transformations, an array of shape (k, 2, 2).
+        matrix_offsets (np.ndarray): The offsets of the IFS transformations, an array of shape (k, 2).
+        linear (np.ndarray): The linear parts of the composed transformations, an array of shape (n, 2, 2).
+        offsets (np.ndarray): The offsets of the composed transformations, an array of shape (n, 2).
+
+    Returns:
+        tuple: The linear parts and offsets of the new transformations.
+    """
+    children_linear = np.einsum('nij,kjl->nkil', linear, matrices).reshape(-1, 2, 2)
+    children_offsets = (np.einsum('nij,kj->nki', linear, matrix_offsets) + offsets[:, np.newaxis, :]).reshape(-1, 2)
+    return children_linear, children_offsets
+
+
+def _unique_transformations(linear: np.ndarray, offsets: np.ndarray, quantum: float) -> np.ndarray:
+    """
+    Finds composed transformations which are equal (after quantisation) to an earlier one. Equal transformations
+    at the same depth generate equal subtrees, so only the first one is kept.
+
+    Parameters:
+        linear (np.ndarray): The linear parts of the composed transformations, an array of shape (n, 2, 2).
+        offsets (np.ndarray): The offsets of the composed transformations, an array of shape (n, 2).
+        quantum (float): The quantisation step of the offsets.
+
+    Returns:
+        np.ndarray: The (ascending) indexes of the transformations to keep.
+    """
+    keys = np.hstack((np.round(linear.reshape(-1, 4) / 1e-9), np.round(offsets / quantum)))
+    return _first_unique_rows(keys)
+
+
+def _release_block(result: tuple) -> None:
+    """
+    Releases the shared memory block of a result of '_expand_subtrees' which is not used.
+
+    Parameters:
+        result (tuple): The name of the block and the number of rows.
+    """
+    block = shared_memory.SharedMemory(name=result[0])
+    block.close()
+    block.unlink()
+
+
+def _expand_subtrees(matrices: np.ndarray, matrix_offsets: np.ndarray, linear: np.ndarray, offsets: np.ndarray, iterations: int, quantum: float) -> tuple:
+    """
+    Expands the subtrees of the given composed transformations (in a worker process).
+
+    Parameters:
+        matrices (np.ndarray): The linear parts of the IFS transformations, an array of shape (k, 2, 2).
+        matrix_offsets (np.ndarray): The offsets of the IFS transformations, an array of shape (k, 2).
+        linear (np.ndarray): The linear parts of the composed transformations, an array of shape (n, 2, 2).
+        offsets (np.ndarray): The offsets of the composed transformations, an array of shape (n, 2).
+        iterations (int): The number of iterations to perform.
+        quantum (float): The quantisation step used for deduplication, or None to keep all transformations.
+
+    Returns:
+        tuple: The name of the shared memory block holding the resulting transformations as rows
+            (a, b, c, d, e, f) and the number of rows. The caller is responsible for unlinking the block.
+    """
+    for _ in range(iterations):
+        linear, offsets = _compose_children(matrices, matrix_offsets, linear, offsets)
+        if quantum is not None:
+            kept = _unique_transformations(linear, offsets, quantum)
+            linear, offsets = linear[kept], offsets[kept]
+
+    count = len(linear)
+    block = shared_memory.SharedMemory(create=True, size=max(1, count * 6 * 8))
+    transformations = np.ndarray((count, 6), dtype=float, buffer=block.buf)
+    transformations[:, :4] = linear.reshape(-1, 4)
+    transformations[:, 4:] = offsets
+    del transformations
+    block.close()
+    return block.name, count
@@ -1,6 +1,11 @@
 
 from components.fractals.i_iterable import IFractalIterable
-from ..event import Event
+from ..event import Event, ProgressEvent
+from ..cancellation import check_cancelled
+
+# Number of symbols rewritten at once when the iteration can be cancelled (rewriting a long word at once would hold
+# the interpreter lock for seconds)
+REWRITE_CHUNK = 65536
 
 class LSystem(IFractalIterable):
     """
@@ -19,6 +24,7 @@ class LSystem(IFractalIterable):
         self._total_iterations = 0
 
         self._iteration_performed = Event()
+        self._progress = ProgressEvent()
 
     def add_iteration_performed_subscriber(self, method) -> None:
         """
@@ -38,6 +44,24 @@ class LSystem(IFractalIterable):
         """
         self._iteration_performed -= method
 
+    def add_progress_subscriber(self, method) -> None:
+        """
+        Adds a subscriber to the (rate-limited) progress event.
+        
+        Parameters:
+            method: A callback function called with the number of performed and requested iterations.
+        """
+        self._progress += method
+
+    def remove_progress_subscriber(self, method) -> None:
+        """
+        Removes a previously added progress subscriber.
+        
+        Parameters:
+            method: The callback function to be removed.
+        """
+        self._progress -= method
+
     @property
     def word(self) -> str:
         """
@@ -68,14 +92,30 @@ class LSystem(IFractalIterable):
         """
         return self._total_iterations
     
-    def iterate(self, iteration_count: int) -> None:
+    def iterate(self, iteration_count: int, cancel: object = None) -> None:
         """
         Performs the specified number of iterations on the L-System.
         
         Parameters:
             iteration_count (int): The number of iterations to perform.
+            cancel (object): The cancellation event (a threading.Event) checked every REWRITE_CHUNK symbols.
+                Defaults to None.
+
+        Raises:
+            RenderCancelled: If the cancellation event has been set.
         """
-        for _ in range(iteration_count):
-            self._word = self._word.translate(str.maketrans(self._rules))
+        table = str.maketrans(self._rules)
+        for i in range(iteration_count):
+            if cancel is None:
+                self._word = self._word.translate(table)
+            else:
+                pieces = []
+                for start in range(0, len(self._word), REWRITE_CHUNK):
+                    check_cancelled(cancel)
+                    pieces.append(self._word[start:start + REWRITE_CHUNK].translate(table))
+                self._word = "".join(pieces)
             self._total_iterations += 1
-            self._iteration_performed(self._word, self._total_iterations)
+            if self._iteration_performed:
+                self._iteration_performed(self._word, self._total_iterations)
+            if self._progress:
+                self._progress.report(i + 1, iteration_count)
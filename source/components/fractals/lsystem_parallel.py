@@ -0,0 +1,204 @@
+import math
+import os
+
+from array import array
+
+from components.vector import Vector
+from components.cancellation import pool_map, worker_pool
+
+
+def _direction(directions: dict, heading: int, angle: float, start_angle: float) -> tuple:
+    """
+    Looks up the unit step vector of a given heading, computing it on first use.
+
+    Parameters:
+        directions (dict): The cache of already computed directions.
+        heading (int): The heading (in multiples of the rotation angle).
+        angle (float): The rotation angle in degrees.
+        start_angle (float): The direction of heading 0 in degrees.
+
+    Returns:
+        tuple: The unit step vector as a pair of floats.
+    """
+    direction = directions.get(heading)
+    if direction is None:
+        radians = (start_angle + heading * angle) * math.pi / 180
+        direction = (math.cos(radians), math.sin(radians))
+        directions[heading] = direction
+    return direction
+
+
+def _trace_structure(chunk: str, angle: float) -> tuple:
+    """
+    Traces a chunk of the word from the identity state (origin, heading 0) and records how it depends on the state
+    before the chunk. Every unmatched ']' restores a state pushed by an earlier chunk, after which the chunk continues
+    relative to that state.
+
+    Parameters:
+        chunk (str): The chunk of the L-System word.
+        angle (float): The rotation angle in degrees.
+
+    Returns:
+        tuple: The number of unmatched pops, the final state (relative to the last restored state) and the list of
+            states left pushed by unmatched '[' (each as a pair of the index of the state it is relative to and the state).
+    """
+    directions = {}
+    x, y, heading = 0.0, 0.0, 0
+    pops = 0
+    stack = []
+
+    for char in chunk:
+        if char == '+':
+            heading += 1
+        elif char == '-':
+            heading -= 1
+        elif char == '[':
+            stack.append((pops, (x, y, heading)))
+        elif char == ']':
+            if stack:
+                _, (x, y, heading) = stack.pop()
+            else:
+                pops += 1
+                x, y, heading = 0.0, 0.0, 0
+        else:
+            dx, dy = _direction(directions, heading, angle, 0)
+            x += dx
+            y += dy
+
+    return pops, (x, y, heading), stack
+
+
+def _trace_segments(chunk: str, angle: float, start_angle: float, step: float, state: tuple, outer_states: list) -> tuple:
+    """
+    Traces a chunk of the word from a known absolute state and collects its lines.
+
+    Parameters:
+        chunk (str): The chunk of the L-System word.
+        angle (float): The rotation angle in degrees.
+        start_angle (float): The direction of heading 0 in degrees.
+        step (float): The step length of the turtle.
+        state (tuple): The absolute state (x, y, heading) before the chunk.
+        outer_states (list): The states restored by unmatched ']' (in the order they are popped).
+
+    Returns:
+        tuple: The lines as a flat array of coordinates (x0, y0, x1, y1, ...) and the bounding box of all visited
+            positions as (x_min, y_min, x_max, y_max).
+    """
+    directions = {}
+    x, y, heading = state
+    x_min, y_min, x_max, y_max = x, y, x, y
+    segments = array('d')
+    outer_states = iter(outer_states)
+    stack = []
+
+    for char in chunk:
+        if char == '+':
+            heading += 1
+        elif char == '-':
+            heading -= 1
+        elif char == '[':
+            stack.append((x, y, heading))
+        elif char == ']':
+            x, y, heading = stack.pop() if stack else next(outer_states)
+        else:
+            dx, dy = _direction(directions, heading, angle, start_angle)
+            x_new, y_new = x + step * dx, y + step * dy
+            if char != 'f':
+                segments.extend((x, y, x_new, y_new))
+            x, y = x_new, y_new
+
+            if x < x_min: x_min = x
+            if y < y_min: y_min = y
+            if x > x_max: x_max = x
+            if y > y_max: y_max = y
+
+    return segments, (x_min, y_min, x_max, y_max)
+
+
+def _compose(base: tuple, local: tuple, angle: float, start_angle: float, step: float) -> tuple:
+    """
+    Composes an absolute state with a state relative to it.
+
+    Parameters:
+        base (tuple): The absolute state (x, y, heading).
+        local (tuple): The state (x, y, heading) relative to the base state, traced with a unit step.
+        angle (float): The rotation angle in degrees.
+        start_angle (float): The direction of heading 0 in degrees.
+        step (float): The step length of the turtle.
+
+    Returns:
+        tuple: The absolute state.
+    """
+    radians = (start_angle + base[2] * angle) * math.pi / 180
+    cos, sin = math.cos(radians), math.sin(radians)
+    return (
+        base[0] + step * (local[0] * cos - local[1] * sin),
+        base[1] + step * (local[0] * sin + local[1] * cos),
+        base[2] + local[2]
+    )
+
+
+def interpret_parallel(word: str, angle: float, step: float, start_angle: float = 0, position: Vector = Vector(0, 0), workers: int = None, chunk_count: int = None, cancel: object = None) -> tuple:
+    """
+    Interprets an L-System word with the turtle using a pool of worker processes.
+
+    The word is split into chunks. First, every chunk is traced from the identity state, which yields its state change
+    as a rigid transform (together with its dependence on states pushed by earlier chunks). These transforms are
+    combined by a prefix scan into the absolute state before each chunk. Finally, every chunk is traced again from its
+    absolute state to produce the lines. Both passes run in parallel.
+
+    Parameters:
+        word (str): The L-System word.
+        angle (float): The rotation angle (in degrees) used for symbols '+' and '-'.
+        step (float): The step length of the turtle.
+        start_angle (float): The initial direction of the turtle in degrees. Defaults to 0.
+        position (Vector): The starting position of the turtle. Defaults to Vector(0, 0).
+        workers (int): The number of worker processes. Defaults to the number of CPUs.
+        chunk_count (int): The number of chunks the word is split into. Defaults to four chunks per worker.
+        cancel (object): The cancellation event (a threading.Event) checked while waiting for the workers.
+            Defaults to None.
+
+    Returns:
+        tuple: The lines as a flat array of coordinates (x0, y0, x1, y1, ...) and the bounding box of all visited
+            positions as (x_min, y_min, x_max, y_max).
+
+    Raises:
+        RenderCancelled: If the cancellation event has been set.
+    """
+    workers = workers or os.cpu_count() or 1
+    chunk_count = max(1, min(chunk_count or 4 * workers, len(word)))
+    chunk_length = -(-len(word) // chunk_count)
+    chunks = [word[i:i + chunk_length] for i in range(0, len(word), chunk_length)] or [""]
+
+    with worker_pool(workers) as executor:
+        structures = pool_map(executor, _trace_structure, chunks, [angle] * len(chunks), cancel=cancel)
+
+        # Prefix scan of the chunk transforms
+        states, outer_states = [], []
+        state = (position.x, position.y, 0)
+        stack = []
+        for pops, final, pushes in structures:
+            states.append(state)
+            bases = [state]
+            for _ in range(pops):
+                bases.append(stack.pop())
+            outer_states.append(bases[1:])
+
+            for base_index, pushed in pushes:
+                stack.append(_compose(bases[base_index], pushed, angle, start_angle, step))
+            state = _compose(bases[-1], final, angle, start_angle, step)
+
+        results = pool_map(
+            executor, _trace_segments, chunks, [angle] * len(chunks), [start_angle] * len(chunks), [step] * len(chunks),
+            states, outer_states, cancel=cancel
+        )
+
+    segments = array('d')
+    x_min, y_min = position.x, position.y
+    x_max, y_max = position.x, position.y
+    for chunk_segments, bounds in results:
+        segments.extend(chunk_segments)
+        x_min, y_min = min(x_min, bounds[0]), min(y_min, bounds[1])
+        x_max, y_max = max(x_max, bounds[2]), max(y_max, bounds[3])
+
+    return segments, (x_min, y_min, x_max, y_max)
@@ -0,0 +1,291 @@
+import math
+
+from components.vector import Vector
+
+
+class GeometrySummary:
+    """
+    Net geometric effect of interpreting a part of an L-system word with the turtle, relative to the turtle state
+    at its beginning (a rigid transform together with the visited area).
+
+    Attributes:
+        displacement (Vector): The net displacement of the turtle (in units of the turtle step).
+        rotation (int): The net rotation of the turtle (in multiples of the rotation angle).
+        bounds (tuple): The bounding box (x_min, y_min, x_max, y_max) of all visited positions (in units of the turtle step).
+        segment_count (int): The number of drawn lines.
+    """
+
+    def __init__(self, displacement: Vector, rotation: int, bounds: tuple, segment_count: int) -> None:
+        """
+        Initializes a new instance of the GeometrySummary class.
+
+        Parameters:
+            displacement (Vector): The net displacement of the turtle.
+            rotation (int): The net rotation of the turtle (in multiples of the rotation angle).
+            bounds (tuple): The bounding box (x_min, y_min, x_max, y_max) of all visited positions.
+            segment_count (int): The number of drawn lines.
+        """
+        self.displacement = displacement
+        self.rotation = rotation
+        self.bounds = bounds
+        self.segment_count = segment_count
+
+    @property
+    def width(self) -> float:
+        """
+        Gets the width of the bounding box.
+
+        Returns:
+            float: The width of the bounding box.
+        """
+        return self.bounds[2] - self.bounds[0]
+
+    @property
+    def height(self) -> float:
+        """
+        Gets the height of the bounding box.
+
+        Returns:
+            float: The height of the bounding box.
+        """
+        return self.bounds[3] - self.bounds[1]
+
+
+class LSystemSummary:
+    """
+    Memoised per-symbol, per-depth geometry summaries of an L-system.
+
+    Summaries are built bottom-up from the production rules, so the bounding box, final turtle state and number of drawn
+    lines of the word after 'n' iterations are known in O(n * rule length) time, without expanding the word. Brackets
+    are supported as long as they are balanced within the axiom and within every rule.
+    """
+
+    def __init__(self, axiom: str, rules: dict, angle: float, start_angle: float = 0) -> None:
+        """
+        Initializes an instance of the LSystemSummary class.
+
+        Parameters:
+            axiom (str): The axiom of the L-System.
+            rules (dict): The production rules of the L-System.
+            angle (float): The rotation angle (in degrees) used for symbols '+' and '-'.
+            start_angle (float): The initial direction of the turtle (in degrees). Defaults to 0.
+
+        Raises:
+            ValueError: If the L-system cannot be summarised (see 'supports').
+        """
+        if not LSystemSummary.supports(axiom, rules):
+            raise ValueError("L-System error: summaries require brackets balanced within the axiom and every rule.")
+
+        self._axiom = axiom
+        self._rules = rules
+        self._angle = angle
+        self._start_angle = start_angle
+
+        # Headings repeat after 'heading_count' rotations, if the angle divides 360 degrees
+        heading_count = 360 / abs(angle) if angle else 1
+        self._heading_count = round(heading_count) if abs(heading_count - round(heading_count)) < 1e-9 else None
+
+        self._directions = {}
+        self._summaries = {}
+
+    @staticmethod
+    def supports(axiom: str, rules: dict) -> bool:
+        """
+        Checks whether the L-system can be summarised, i.e. brackets are not rewritten and are balanced within
+        the axiom and within the right-hand side of every rule.
+
+        Parameters:
+            axiom (str): The axiom of the L-System.
+            rules (dict): The production rules of the L-System.
+
+        Returns:
+            bool: True if the L-system can be summarised, False otherwise.
+        """
+        if '[' in rules or ']' in rules:
+            return False
+
+        for word in [axiom, *rules.values()]:
+            depth = 0
+            for char in word:
+                if char == '[':
+                    depth += 1
+                elif char == ']':
+                    depth -= 1
+                    if depth < 0:
+                        return False
+            if depth != 0:
+                return False
+        return True
+
+    def summarize(self, depth: int) -> GeometrySummary:
+        """
+        Summarises the word obtained after a given number of iterations.
+
+        Parameters:
+            depth (int): The number of iterations.
+
+        Returns:
+            GeometrySummary: The summary of the whole word.
+        """
+        return self._summarize_word(self._axiom, depth, 0)
+
+    def summarize_symbol(self, symbol: str, depth: int, heading: int = 0) -> GeometrySummary:
+        """
+        Summarises the expansion of a single symbol.
+
+        Parameters:
+            symbol (str): The symbol to be expanded.
+            depth (int): The number of iterations applied to the symbol.
+            heading (int): The turtle heading (in multiples of the rotation angle) at the start. Defaults to 0.
+
+        Returns:
+            GeometrySummary: The summary of the expanded symbol.
+        """
+        if self._heading_count is not None:
+            heading %= self._heading_count
+        if symbol not in self._rules:
+            depth = 0
+
+        key = (symbol, depth, heading)
+        summary = self._summaries.get(key)
+        if summary is not None:
+            return summary
+
+        if depth > 0 and symbol in self._rules:
+            summary = self._summarize_word(self._rules[symbol], depth - 1, heading)
+        elif symbol == '+':
+            summary = GeometrySummary(Vector(), 1, (0, 0, 0, 0), 0)
+        elif symbol == '-':
+            summary = GeometrySummary(Vector(), -1, (0, 0, 0, 0), 0)
+        else:
+            # Step forward (drawing a line for all symbols except 'f')
+            step = self.direction(heading)
+            bounds = (min(0, step.x), min(0, step.y), max(0, step.x), max(0, step.y))
+            summary = GeometrySummary(step, 0, bounds, 0 if symbol == 'f' else 1)
+
+        self._summaries[key] = summary
+        return summary
+
+    def visible_segments(self, depth: int, position: Vector, step: float, viewport: tuple, pixel_size: float = 1) -> list:
+        """
+        Collects the lines of the word after a given number of iterations which are visible in a viewport.
+
+        The rule tree is descended using the bounding boxes of the summaries. Subtrees whose bounding box misses
+        the viewport are skipped entirely and subtrees smaller than 'pixel_size' are drawn as a single line
+        from their start to their end position (level of detail).
+
+        Parameters:
+            depth (int): The number of iterations.
+            position (Vector): The starting position of the turtle.
+            step (float): The step length of the turtle.
+            viewport (tuple): The visible rectangle as (x_min, y_min, x_max, y_max).
+            pixel_size (float): The size below which subtrees are not descended anymore. Defaults to 1.
+
+        Returns:
+            list: A list of lines, each represented as a pair of Vector objects.
+        """
+        lines = []
+        self._collect_segments(self._axiom, depth, 0, position.x, position.y, step, viewport, pixel_size, lines)
+        return lines
+
+    def direction(self, heading: int) -> Vector:
+        """
+        Gets the unit step vector of a given heading.
+
+        Parameters:
+            heading (int): The turtle heading (in multiples of the rotation angle).
+
+        Returns:
+            Vector: The unit vector pointing in the direction of the heading.
+        """
+        direction = self._directions.get(heading)
+        if direction is None:
+            angle = (self._start_angle + heading * self._angle) * math.pi / 180
+            direction = Vector(math.cos(angle), math.sin(angle))
+            self._directions[heading] = direction
+        return direction
+
+    def _summarize_word(self, word: str, depth: int, heading: int) -> GeometrySummary:
+        """
+        Summarises a word by composing the summaries of its symbols.
+
+        Parameters:
+            word (str): The word (with balanced brackets).
+            depth (int): The number of iterations applied to each symbol of the word.
+            heading (int): The turtle heading (in multiples of the rotation angle) at the start.
+
+        Returns:
+            GeometrySummary: The summary of the word.
+        """
+        x, y, rotation = 0, 0, 0
+        x_min, y_min, x_max, y_max = 0, 0, 0, 0
+        segment_count = 0
+        stack = []
+
+        for char in word:
+            if char == '[':
+                stack.append((x, y, rotation))
+                continue
+            if char == ']':
+                x, y, rotation = stack.pop()
+                continue
+
+            summary = self.summarize_symbol(char, depth, heading + rotation)
+            bounds = summary.bounds
+            if x + bounds[0] < x_min: x_min = x + bounds[0]
+            if y + bounds[1] < y_min: y_min = y + bounds[1]
+            if x + bounds[2] > x_max: x_max = x + bounds[2]
+            if y + bounds[3] > y_max: y_max = y + bounds[3]
+
+            x += summary.displacement.x
+            y += summary.displacement.y
+            rotation += summary.rotation
+            segment_count += summary.segment_count
+
+        return GeometrySummary(Vector(x, y), rotation, (x_min, y_min, x_max, y_max), segment_count)
+
+    def _collect_segments(self, word: str, depth: int, heading: int, x: float, y: float, step: float, viewport: tuple, pixel_size: float, lines: list) -> None:
+        """
+        Collects the visible lines of a word (see 'visible_segments').
+
+        Parameters:
+            word (str): The word (with balanced brackets).
+            depth (int): The number of iterations applied to each symbol of the word.
+            heading (int): The turtle heading (in multiples of the rotation angle) at the start.
+            x (float): The x-coordinate of the turtle at the start.
+            y (float): The y-coordinate of the turtle at the start.
+            step (float): The step length of the turtle.
+            viewport (tuple): The visible rectangle as (x_min, y_min, x_max, y_max).
+            pixel_size (float): The size below which subtrees are not descended anymore.
+            lines (list): The list the visible lines are appended to.
+        """
+        v_x_min, v_y_min, v_x_max, v_y_max = viewport
+        rotation = 0
+        stack = []
+
+        for char in word:
+            if char == '[':
+                stack.append((x, y, rotation))
+                continue
+            if char == ']':
+                x, y, rotation = stack.pop()
+                continue
+
+            summary = self.summarize_symbol(char, depth, heading + rotation)
+            x_new = x + step * summary.displacement.x
+            y_new = y + step * summary.displacement.y
+
+            bounds = summary.bounds
+            visible = summary.segment_count > 0 and not (
+                x + step * bounds[2] < v_x_min or x + step * bounds[0] > v_x_max or
+                y + step * bounds[3] < v_y_min or y + step * bounds[1] > v_y_max
+            )
+
+            if visible:
+                if depth == 0 or char not in self._rules or max(summary.width, summary.height) * step < pixel_size:
+                    lines.append([Vector(x, y), Vector(x_new, y_new)])
+                else:
+                    self._collect_segments(self._rules[char], depth - 1, heading + rotation, x, y, step, viewport, pixel_size, lines)
+
+            x, y = x_new, y_new
+            rotation += summary.rotation
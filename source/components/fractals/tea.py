@@ -1,18 +1,52 @@
 
-import math
+import decimal
+import numpy as np
+from decimal import Decimal
 
 from components.fractals.i_iterable import IFractalIterable
 from components.fractals.i_transformable import IFractalTransformable
 from components.vector import Vector
+from components.expression import compile_expression
+from components.precision import PRECISIONS, DoubleDoubleComplex, DecimalComplex, choose_precision, decimal_digits
+from components.event import BatchedEvent, ProgressEvent
+from components.cancellation import check_cancelled, pool_results, worker_pool
+
+# Resolution of the coarse escape-time map used for importance sampling of orbits
+IMPORTANCE_RESOLUTION = 128
+# Number of steps between the lookups of cells of known fate (a lookup costs more than a step)
+SHARING_INTERVAL = 8
 
 class TEA(IFractalIterable, IFractalTransformable):
     
-    def __init__(self, width: int, height: int, sequence: str, step: int = 1, escape_radius: int = 2, bounds: tuple = (-2, 2, -2, 2), var: str = 'z', explore_var: str = 'c'):
+    def __init__(self, width: int, height: int, sequence: str, step: int = 1, escape_radius: int = 2, bounds: tuple = (-2, 2, -2, 2), var: str = 'z', explore_var: str = 'c', precision: str = None, share_tolerance: int = None):
+        """
+        Initializes an instance of the TEA class.
+
+        Parameters:
+            width (int): The width of the plot in pixels.
+            height (int): The height of the plot in pixels.
+            sequence (str): The expression of the next member of the sequence.
+            step (int): The size of a grid cell in pixels. Defaults to 1.
+            escape_radius (int): The escape radius. Defaults to 2.
+            bounds (tuple): The plotted range as (x_min, x_max, y_min, y_max). Defaults to (-2, 2, -2, 2).
+            var (str): The name of the sequence variable. Defaults to 'z'.
+            explore_var (str): The name of the variable set to the grid points. Defaults to 'c'.
+            precision (str): The precision tier ("single" - vectorized complex64, "double" - Python complex,
+                "double-double" or "decimal"). Chosen from the pixel spacing if None.
+            share_tolerance (int): Orbits of Julia-type sequences (the explored variable is the iterated one) stop
+                when they enter a cell whose escape time differs by at most this value from the escape times of all
+                its neighbours, and inherit its escape time (an approximation; None to iterate every orbit to the
+                end). Defaults to None.
+
+        Raises:
+            ValueError: If the precision tier is unknown.
+        """
         self._x_count, self._y_count = width // step, height // step
         
         self._iter_counts = [[0 for _ in range(self._x_count)] for _ in range(self._y_count)]
         self._width, self._height = width, height
         self._sequence = sequence
+        self._expression = compile_expression(sequence, (var, explore_var))
         self._var = var
         self._explore_var = explore_var
         self._total_iterations = 0
@@ -25,8 +59,65 @@ class TEA(IFractalIterable, IFractalTransformable):
         y_vals = [y_min + step * (y_max - y_min) * i / height for i in range(self._y_count + 1)]
         self._complex_grid = [[x + 1j * y for x in x_vals] for y in y_vals]
 
+        if precision is None:
+            precision = choose_precision(bounds, width, height, step)
+        if precision not in PRECISIONS:
+            raise ValueError(f"TEA error: unknown precision '{precision}' (expected one of {', '.join(PRECISIONS)}).")
+        self._precision = precision
+        self._digits = decimal_digits(bounds, width, height, step) if precision == "decimal" else None
+        self._bounds = bounds
+
+        if share_tolerance is not None and share_tolerance < 0:
+            raise ValueError("TEA error: the share tolerance must not be negative.")
+        self._share_tolerance = share_tolerance
+        self._evaluated_iterations = 0
+        self._saved_iterations = 0
+
         self.point_last_values = [[0 for _ in range(self._x_count)] for _ in range(self._y_count)]
 
+        self._rows_computed = BatchedEvent(batch_size=16)
+        self._progress = ProgressEvent()
+
+    def add_rows_computed_subscriber(self, method, batch_size: int = None) -> None:
+        """
+        Adds a subscriber notified with chunks of computed grid rows. Each row is delivered as a tuple
+        (row index, list of iteration counts, list of last sequence values).
+        
+        Parameters:
+            method: A callback function called with a list of computed rows.
+            batch_size (int): The number of rows delivered in a single chunk. Keeps the current size if None.
+        """
+        if batch_size is not None:
+            self._rows_computed.batch_size = batch_size
+        self._rows_computed += method
+
+    def remove_rows_computed_subscriber(self, method) -> None:
+        """
+        Removes a previously added rows subscriber.
+        
+        Parameters:
+            method: The callback function to be removed.
+        """
+        self._rows_computed -= method
+
+    def add_progress_subscriber(self, method) -> None:
+        """
+        Adds a subscriber to the (rate-limited) progress event.
+        
+        Parameters:
+            method: A callback function called with the number of computed rows and the total row count.
+        """
+        self._progress += method
+
+    def remove_progress_subscriber(self, method) -> None:
+        """
+        Removes a previously added progress subscriber.
+        
+        Parameters:
+            method: The callback function to be removed.
+        """
+        self._progress -= method
+
     @property
     def total_iterations(self):
         """
@@ -37,6 +128,66 @@ class TEA(IFractalIterable, IFractalTransformable):
         """
         return self._total_iterations
     
+    @property
+    def precision(self) -> str:
+        """
+        Gets the precision tier used for iterating (after a fallback, if the sequence is not supported by the tier).
+
+        Returns:
+            str: The precision tier.
+        """
+        return self._precision
+
+    @property
+    def precision_description(self) -> str:
+        """
+        Gets a description of the precision tier for logs.
+
+        Returns:
+            str: The description.
+        """
+        descriptions = {
+            "single": "single (complex64, vectorized)",
+            "double": "double (float64)",
+            "double-double": "double-double (about 32 digits)",
+            "decimal": f"decimal ({self._digits} digits)"
+        }
+        return descriptions[self._precision]
+
+    @property
+    def evaluated_iterations(self) -> int:
+        """
+        Gets the number of members of the sequence computed by the last 'iterate' (over all grid points).
+
+        Returns:
+            int: The number of computed members.
+        """
+        return self._evaluated_iterations
+
+    @property
+    def saved_iterations(self) -> int:
+        """
+        Gets the number of members of the sequence the last 'iterate' did not compute thanks to orbit sharing.
+
+        Returns:
+            int: The number of skipped members.
+        """
+        return self._saved_iterations
+
+    @property
+    def orbit_sharing(self) -> bool:
+        """
+        Gets whether orbits stop in cells of known escape time. Applies to Julia-type sequences in the single and
+        double precision (finer grids cannot be indexed by float64 values).
+
+        Returns:
+            bool: True if orbits are shared, False otherwise.
+        """
+        return (
+            self._share_tolerance is not None and self._var == self._explore_var and
+            self._precision in ("single", "double")
+        )
+
     @property
     def point_iteration_counts(self):
         """
@@ -74,55 +225,533 @@ class TEA(IFractalIterable, IFractalTransformable):
         """
         pass
     
-    def iterate(self, iterations: int) -> None:
+    def iterate(self, iterations: int, cancel: object = None) -> None:
         """
         Performs a specified number of iterations.
         
         Parameters:
             iterations (int): The number of iterations to perform.
+            cancel (object): The cancellation event (a threading.Event) checked before every row (every step of
+                a strip of rows in the vectorized tiers). Defaults to None.
+
+        Raises:
+            RenderCancelled: If the cancellation event has been set.
         """
         
         self._iter_counts = [[0 for _ in range(self._x_count)] for _ in range(self._y_count)]
         self._total_iterations += iterations
+        self._evaluated_iterations = 0
+        self._saved_iterations = 0
 
-        x_min = self._complex_grid[0][0].real
-        y_min = self._complex_grid[0][0].imag
+        # Escape times and last values of the cells whose fate is known (-1 elsewhere), filled as rows are computed
+        self._shared_counts = np.full(self._y_count * self._x_count, -1)
+        self._shared_values = np.zeros(self._y_count * self._x_count, dtype=complex)
+        self._grid_counts = np.zeros((self._y_count, self._x_count), dtype=int)
+        self._grid_values = np.zeros((self._y_count, self._x_count), dtype=complex)
+        self._shared_rows = 0
 
-        for i in range(self._y_count):
-            for j in range(self._x_count):
+        # Sequences the tier cannot evaluate fall back to Python complex
+        if self._precision in ("single", "double-double"):
+            points = self.__vector_grid()
+            if self.__supports(points[:2]):
+                self.__iterate_vectorized(iterations, points, cancel)
+                return
+            self._precision = "double"
+
+        start_grid = self._complex_grid
+        if self._precision == "decimal":
+            start_grid = self.__decimal_grid()
+            if not self.__supports(start_grid[0][0]):
+                start_grid = self._complex_grid
+                self._precision = "double"
+
+        with decimal.localcontext() as context:
+            if self._precision == "decimal":
+                context.prec = self._digits
+            self.__iterate_points(iterations, start_grid, cancel)
+
+    def orbit_density(self, samples: int, iterations: int, bands: tuple = None, workers: int = 1, sample_bounds: tuple = None, importance: bool = True, batch_size: int = 65536, seed: int = None, cancel: object = None) -> np.ndarray:
+        """
+        Renders the orbit density of the sequence (the Buddhabrot of the Mandelbrot set): values of the explored
+        variable are sampled, the orbits of those which escape are traced and every visited member of the sequence
+        is accumulated in the grid.
+
+        Every channel (red, green, blue) accumulates the orbits which escape within its iteration limit, so short
+        and long orbits can be told apart. Samples are processed in vectorized batches (with 'workers' processes
+        accumulating the histograms of shares of the samples, which are summed). With importance sampling, the samples are drawn from
+        the cells of a coarse escape-time map with probabilities growing towards the boundary of the set (cells
+        deep inside the set are skipped, as their orbits do not escape) and weighted so that the density equals the
+        one of uniform sampling.
 
-                if self._iter_counts[i][j] != 0:
-                    continue
+        Parameters:
+            samples (int): The total number of sampled values.
+            iterations (int): The maximum number of iterations of an orbit.
+            bands (tuple): The iteration limits of the red, green and blue channels. Defaults to
+                (iterations, iterations / 5, iterations / 25).
+            workers (int): The number of worker processes. Defaults to 1.
+            sample_bounds (tuple): The sampled range as (x_min, x_max, y_min, y_max). Defaults to the square
+                circumscribing the escape circle.
+            importance (bool): Sample the cells near the boundary more often. Defaults to True.
+            batch_size (int): The number of samples iterated at once. Defaults to 65536.
+            seed (int): The seed of the random number generator. Defaults to None.
+            cancel (object): The cancellation event (a threading.Event) checked before every batch (and while
+                waiting for the workers). Defaults to None.
+
+        Returns:
+            np.ndarray: A float array of shape (3, rows, columns) of the (weighted) number of visits of each cell.
+
+        Raises:
+            ValueError: If the parameters are invalid or the sequence cannot be evaluated for arrays of numbers.
+            RenderCancelled: If the cancellation event has been set.
+        """
+        if samples <= 0 or iterations <= 0:
+            raise ValueError("TEA error: the number of samples and the iteration count must be positive.")
+        if bands is None:
+            bands = (iterations, max(iterations // 5, 1), max(iterations // 25, 1))
+        if len(bands) != 3 or any(limit <= 0 for limit in bands):
+            raise ValueError("TEA error: the orbit bands must be three positive iteration limits.")
+        if sample_bounds is None:
+            radius = abs(self._escape_radius)
+            sample_bounds = (-radius, radius, -radius, radius)
+
+        probe = np.array(self._complex_grid[0][:2], dtype=complex)
+        if not self.__supports(probe):
+            raise ValueError("TEA error: the sequence cannot be evaluated for arrays of numbers (required for the orbit density).")
+
+        weights = self.__importance_map(min(iterations, max(bands)), sample_bounds) if importance else None
+
+        # Every task gets its share of samples and an independent random stream (four tasks per worker, so that
+        # cancelled computations do not wait for whole shares of the workers)
+        workers = max(1, min(workers, samples))
+        tasks = 1 if workers == 1 else min(4 * workers, samples)
+        seeds = np.random.SeedSequence(seed).spawn(tasks)
+        shares = [samples // tasks + (task < samples % tasks) for task in range(tasks)]
+        arguments = (
+            self._sequence, self._var, self._explore_var, self._escape_radius, min(iterations, max(bands)), tuple(bands),
+            tuple(self._bounds), (self._width, self._height, self._step), tuple(sample_bounds), weights, batch_size
+        )
+
+        if workers == 1:
+            return _orbit_histogram(*arguments, shares[0], seeds[0], cancel)
+
+        # Histograms are summed as they arrive
+        density = None
+        with worker_pool(workers) as executor:
+            for _, histogram in pool_results(executor, _orbit_histogram, *([argument] * tasks for argument in arguments), shares, seeds, cancel=cancel):
+                density = histogram if density is None else density + histogram
+        return density
+
+    def __importance_map(self, iterations: int, sample_bounds: tuple) -> np.ndarray:
+        """
+        Computes the sampling probabilities of the cells of a coarse grid over the sampled range: escaping cells get
+        a probability growing with their escape time, cells inside the set only if they neighbour an escaping cell.
+
+        Parameters:
+            iterations (int): The maximum number of iterations.
+            sample_bounds (tuple): The sampled range as (x_min, x_max, y_min, y_max).
+
+        Returns:
+            np.ndarray: The probabilities of the cells (a flat array of IMPORTANCE_RESOLUTION^2 values).
+        """
+        x_min, x_max, y_min, y_max = sample_bounds
+        size = IMPORTANCE_RESOLUTION
+        x = x_min + (np.arange(size) + 0.5) * (x_max - x_min) / size
+        y = y_min + (np.arange(size) + 0.5) * (y_max - y_min) / size
+        centers = (x[np.newaxis, :] + 1j * y[:, np.newaxis]).ravel()
 
-                # List of iterated points
-                iterated_points_indexes = []
+        counts = _escape_counts(self._expression, self._var, self._explore_var, centers, iterations, self._escape_radius)
+        counts = counts.reshape(size, size)
+        escaped = counts < iterations
 
+        # Cells inside the set next to an escaping cell (the boundary runs through them)
+        near = np.zeros_like(escaped)
+        near[1:, :] |= escaped[:-1, :]
+        near[:-1, :] |= escaped[1:, :]
+        near[:, 1:] |= escaped[:, :-1]
+        near[:, :-1] |= escaped[:, 1:]
+
+        weights = np.where(escaped, 0.05 + counts / iterations, np.where(near, 1.0, 0.0)).ravel()
+        if weights.sum() == 0:
+            weights[:] = 1
+        return weights / weights.sum()
+
+    def __iterate_points(self, iterations: int, start_grid: list, cancel: object = None) -> None:
+        """
+        Iterates the sequence point by point.
+
+        Parameters:
+            iterations (int): The number of iterations to perform.
+            start_grid (list): The grid points (numbers of the precision tier).
+            cancel (object): The cancellation event (a threading.Event). Defaults to None.
+        """
+        sharing = self.orbit_sharing
+        x_min, dx, y_min, dy = self.__cell_geometry()
+        shared_counts, shared_values = self._shared_counts.tolist(), self._shared_values.tolist()
+        strip = self._rows_computed.batch_size
+
+        for i in range(self._y_count):
+            check_cancelled(cancel)
+            for j in range(self._x_count):
                 # Initialize variables
-                vars_dict = {self._var: 0, self._explore_var: self._complex_grid[i][j]}
+                vars_dict = {self._var: 0, self._explore_var: start_grid[i][j]}
+                count, last_value = iterations, None
+                # Step of the next lookup of a cell of known fate (never reached without sharing)
+                lookup = SHARING_INTERVAL if sharing else 0
 
                 # Iterate
                 for k in range(1, iterations + 1):
                     try:
                         # Evaluate the next value in the sequence
-                        vars_dict[self._var] = eval(self._sequence, {"math": math}, vars_dict)
-
-                        j0 = math.floor((self._complex_grid[i][j].real - x_min) / self._step)
-                        i0 = math.floor((self._complex_grid[i][j].imag - y_min) / self._step)
-
-                        iterated_points_indexes.append((i0, j0))
+                        value = vars_dict[self._var] = self._expression.evaluate(vars_dict)
 
                         # Check for escape condition
-                        self._iter_counts[i][j] = k
-                        if abs(vars_dict[self._var]) > self._escape_radius:
+                        if abs(value) > self._escape_radius:
+                            count = k
                             break
                     except OverflowError:
-                        self._iter_counts[i][j] = k
+                        count = k
+                        break
+
+                    if k == lookup:
+                        # The orbit entered a cell of known fate, whose escape time it inherits
+                        lookup += SHARING_INTERVAL
+                        column, row = round((value.real - x_min) / dx), round((value.imag - y_min) / dy)
+                        if k < iterations and 0 <= column < self._x_count and 0 <= row < self._y_count:
+                            index = row * self._x_count + column
+                            if shared_counts[index] >= 0:
+                                count = min(k + shared_counts[index], iterations)
+                                last_value = shared_values[index]
+                                self._saved_iterations += count - k
+                                break
+
+                self._evaluated_iterations += k
+                self._iter_counts[i][j] = count
+                if last_value is None:
+                    last_value = vars_dict[self._var]
+                    last_value = last_value.to_complex() if isinstance(last_value, DecimalComplex) else last_value
+                self.point_last_values[i][j] = last_value
+
+            if sharing:
+                self._grid_counts[i], self._grid_values[i] = self._iter_counts[i], self.point_last_values[i]
+            if sharing and ((i + 1) % strip == 0 or i + 1 == self._y_count):
+                # Cells are marked once per strip of rows (as in the vectorized iteration)
+                indexes = self.__share_rows(i + 1)
+                for index, shared_count, shared_value in zip(
+                    indexes.tolist(), self._shared_counts[indexes].tolist(), self._shared_values[indexes].tolist()
+                ):
+                    shared_counts[index], shared_values[index] = shared_count, shared_value
+
+            if self._rows_computed:
+                self._rows_computed.push((i, self._iter_counts[i], self.point_last_values[i]))
+            if self._progress:
+                self._progress.report(i + 1, self._y_count)
+
+        self._rows_computed.flush()
+
+    def __iterate_vectorized(self, iterations: int, points: object, cancel: object = None) -> None:
+        """
+        Iterates the sequence for whole strips of rows at once.
+
+        Parameters:
+            iterations (int): The number of iterations to perform.
+            points (object): The grid points in row-major order (a complex64 array or a DoubleDoubleComplex array).
+            cancel (object): The cancellation event (a threading.Event). Defaults to None.
+        """
+        strip = self._rows_computed.batch_size * self._x_count
+        sharing = self.orbit_sharing
+        x_min, dx, y_min, dy = self.__cell_geometry()
+
+        def to_complex(values: object) -> np.ndarray:
+            return values.to_complex() if isinstance(values, DoubleDoubleComplex) else values
+
+        with np.errstate(all="ignore"):
+            for start in range(0, self._y_count * self._x_count, strip):
+                strip_points = points[start:start + strip]
+                count = min(strip, self._y_count * self._x_count - start)
+                counts = np.full(count, iterations)
+                last_values = np.zeros(count, dtype=complex)
+
+                # Indexes and variables of the points which have not escaped yet
+                active = np.arange(count)
+                variables = {self._var: strip_points * 0, self._explore_var: strip_points}
+                for k in range(1, iterations + 1):
+                    check_cancelled(cancel)
+                    values = self._expression.evaluate(variables)
+                    if isinstance(values, np.ndarray):
+                        values = values.astype(np.complex64, copy=False)
+                    variables[self._var] = values
+                    self._evaluated_iterations += len(active)
+
+                    # Overflowed values (infinite or not a number) escape as well
+                    escaped = ~(abs(values) <= self._escape_radius)
+                    if k == iterations:
+                        last_values[active] = to_complex(values)
                         break
-                
-                self.point_last_values[i][j] = vars_dict[self._var]
-                
-                for index, (i0, j0) in enumerate(iterated_points_indexes):
-                    if self._iter_counts[i][j] == iterations:
-                        self._iter_counts[i0][j0] = iterations
-                    else:
-                        self._iter_counts[i0][j0] = self._iter_counts[i][j] - index + 1
\ No newline at end of file
+
+                    # Orbits entering a cell of known fate stop there and inherit its escape time
+                    stopped = escaped
+                    if sharing and k % SHARING_INTERVAL == 0:
+                        cells = self.__nearest_cells(values, x_min, dx, y_min, dy)
+                        shared = (cells >= 0) & ~escaped
+                        shared[shared] = self._shared_counts[cells[shared]] >= 0
+                        if shared.any():
+                            inherited = self._shared_counts[cells[shared]]
+                            counts[active[shared]] = np.minimum(k + inherited, iterations)
+                            last_values[active[shared]] = self._shared_values[cells[shared]]
+                            self._saved_iterations += int(np.minimum(inherited, iterations - k).sum())
+                            stopped = escaped | shared
+
+                    if escaped.any():
+                        counts[active[escaped]] = k
+                        last_values[active[escaped]] = to_complex(values[escaped])
+                    if stopped.any():
+                        kept = np.nonzero(~stopped)[0]
+                        active = active[kept]
+                        variables = {name: value[kept] for name, value in variables.items()}
+                        if len(active) == 0:
+                            break
+
+                rows = count // self._x_count
+                if sharing:
+                    first = start // self._x_count
+                    self._grid_counts[first:first + rows] = counts.reshape(rows, self._x_count)
+                    self._grid_values[first:first + rows] = last_values.reshape(rows, self._x_count)
+                    self.__share_rows(first + rows)
+
+                counts = counts.reshape(rows, self._x_count).tolist()
+                last_values = last_values.reshape(rows, self._x_count).tolist()
+                for offset in range(rows):
+                    i = start // self._x_count + offset
+                    self._iter_counts[i] = counts[offset]
+                    self.point_last_values[i] = last_values[offset]
+                    if self._rows_computed:
+                        self._rows_computed.push((i, self._iter_counts[i], self.point_last_values[i]))
+                    if self._progress:
+                        self._progress.report(i + 1, self._y_count)
+
+        self._rows_computed.flush()
+
+    def __cell_geometry(self) -> tuple:
+        """
+        Gets the position of the first grid point and the spacing of the grid points.
+
+        Returns:
+            tuple: The values (x_min, dx, y_min, dy).
+        """
+        x_min, x_max, y_min, y_max = self._bounds
+        return x_min, self._step * (x_max - x_min) / self._width, y_min, self._step * (y_max - y_min) / self._height
+
+    def __nearest_cells(self, values: object, x_min: float, dx: float, y_min: float, dy: float) -> np.ndarray:
+        """
+        Finds the grid points nearest to an array of values.
+
+        Returns:
+            np.ndarray: The flat indexes of the grid points (-1 for values outside the grid).
+        """
+        values = values.to_complex() if isinstance(values, DoubleDoubleComplex) else values
+        columns = np.rint((values.real - x_min) / dx)
+        rows = np.rint((values.imag - y_min) / dy)
+        inside = (columns >= 0) & (columns < self._x_count) & (rows >= 0) & (rows < self._y_count)
+        return np.where(inside, rows * self._x_count + columns, -1).astype(np.int64)
+
+    def __share_rows(self, computed_rows: int) -> np.ndarray:
+        """
+        Marks the cells of known fate among the rows whose neighbourhood has been computed: cells whose escape time
+        differs by at most the tolerance from the escape times of all their (up to eight) neighbours.
+
+        Parameters:
+            computed_rows (int): The number of computed rows (from the top).
+
+        Returns:
+            np.ndarray: The flat indexes of the newly marked cells.
+        """
+        last = computed_rows if computed_rows == self._y_count else computed_rows - 1
+        first = self._shared_rows
+        if last <= first:
+            return np.zeros(0, dtype=np.int64)
+        self._shared_rows = last
+
+        # Computed rows around the marked ones (edge cells are compared with their existing neighbours only)
+        low, high = max(first - 1, 0), min(last + 1, self._y_count)
+        padded = np.pad(self._grid_counts[low:high], 1, mode="edge")
+        maximum, minimum = padded[1:-1, 1:-1].copy(), padded[1:-1, 1:-1].copy()
+        for di in (0, 1, 2):
+            for dj in (0, 1, 2):
+                shifted = padded[di:di + high - low, dj:dj + self._x_count]
+                np.maximum(maximum, shifted, out=maximum)
+                np.minimum(minimum, shifted, out=minimum)
+
+        known = (maximum - minimum <= self._share_tolerance)[first - low:last - low]
+        indexes = np.flatnonzero(known) + first * self._x_count
+        self._shared_counts[indexes] = self._grid_counts[first:last][known]
+        self._shared_values[indexes] = self._grid_values[first:last][known]
+        return indexes
+
+    def __decimal_values(self) -> tuple:
+        """
+        Computes the coordinates of the grid points from the exact values of the bounds, so that neighbouring points
+        stay distinct even below the float64 resolution.
+
+        Returns:
+            tuple: The lists of decimal x-coordinates and y-coordinates.
+        """
+        x_min, x_max, y_min, y_max = (Decimal(value) for value in self._bounds)
+        with decimal.localcontext() as context:
+            context.prec = max(self._digits or 0, 40)
+            x_vals = [x_min + self._step * (x_max - x_min) * j / self._width for j in range(self._x_count)]
+            y_vals = [y_min + self._step * (y_max - y_min) * i / self._height for i in range(self._y_count)]
+        return x_vals, y_vals
+
+    def __decimal_grid(self) -> list:
+        """
+        Computes the grid points of the decimal tier.
+
+        Returns:
+            list: Rows of DecimalComplex grid points.
+        """
+        x_vals, y_vals = self.__decimal_values()
+        return [[DecimalComplex(x, y) for x in x_vals] for y in y_vals]
+
+    def __vector_grid(self) -> object:
+        """
+        Computes the grid points of the vectorized tiers in row-major order.
+
+        Returns:
+            object: A complex64 array (single) or a DoubleDoubleComplex array (double-double) of the points.
+        """
+        if self._precision == "single":
+            return np.array(self._complex_grid)[:self._y_count, :self._x_count].astype(np.complex64).ravel()
+
+        x_vals, y_vals = self.__decimal_values()
+        x_parts = np.array([DoubleDoubleComplex.split(x) for x in x_vals]).reshape(-1, 2)
+        y_parts = np.array([DoubleDoubleComplex.split(y) for y in y_vals]).reshape(-1, 2)
+        shape = (self._y_count, self._x_count)
+        return DoubleDoubleComplex(
+            tuple(np.broadcast_to(x_parts[np.newaxis, :, part], shape).ravel() for part in range(2)),
+            tuple(np.broadcast_to(y_parts[:, np.newaxis, part], shape).ravel() for part in range(2))
+        )
+
+    def __supports(self, points: object) -> bool:
+        """
+        Checks whether the sequence can be evaluated with numbers (or arrays of numbers) of a precision tier.
+
+        Parameters:
+            points (object): A sample of grid points of the tier.
+
+        Returns:
+            bool: True if a member of the sequence can be computed for every point, False otherwise.
+        """
+        try:
+            with np.errstate(all="ignore"):
+                values = self._expression.evaluate({self._var: points * 0, self._explore_var: points})
+        except (ValueError, TypeError, OverflowError, ZeroDivisionError):
+            return False
+        if isinstance(points, (np.ndarray, DoubleDoubleComplex)):
+            return isinstance(values, type(points)) and np.shape(abs(values)) == np.shape(abs(points))
+        return isinstance(values, type(points))
+
+
+def _escape_counts(expression: object, var: str, explore_var: str, points: np.ndarray, iterations: int, escape_radius: float) -> np.ndarray:
+    """
+    Computes the escape times of an array of points (the iteration count for points which do not escape).
+
+    Parameters:
+        expression (Expression): The compiled sequence.
+        var (str): The name of the sequence variable.
+        explore_var (str): The name of the variable set to the points.
+        points (np.ndarray): A complex array of the points.
+        iterations (int): The maximum number of iterations.
+        escape_radius (float): The escape radius.
+
+    Returns:
+        np.ndarray: An integer array of the escape times.
+    """
+    counts = np.full(len(points), iterations)
+    active = np.arange(len(points))
+    variables = {var: points * 0, explore_var: points}
+    with np.errstate(all="ignore"):
+        for k in range(1, iterations + 1):
+            values = np.asarray(expression.evaluate(variables), dtype=complex)
+            escaped = ~(abs(values) <= escape_radius)
+            if escaped.any():
+                counts[active[escaped]] = k
+                kept = np.nonzero(~escaped)[0]
+                active = active[kept]
+                # The sequence variable is assigned last (it is the explored variable of Julia-type sequences)
+                variables = {explore_var: variables[explore_var][kept], var: values[kept]}
+                if len(active) == 0:
+                    break
+            else:
+                variables[var] = values
+    return counts
+
+
+def _orbit_histogram(sequence: str, var: str, explore_var: str, escape_radius: float, iterations: int, bands: tuple, bounds: tuple, size: tuple, sample_bounds: tuple, weights: np.ndarray, batch_size: int, samples: int, seed: object, cancel: object = None) -> np.ndarray:
+    """
+    Accumulates the orbits of a share of samples (a task of 'TEA.orbit_density'; the cancellation event is checked
+    before every batch when run in the calling process).
+
+    Every batch is iterated twice: first to find the escape times of the samples, then only the escaping ones are
+    iterated again and their members are counted in the channels whose iteration limit they escape within.
+
+    Returns:
+        np.ndarray: A float array of shape (3, rows, columns) of the weighted number of visits of each cell.
+    """
+    expression = compile_expression(sequence, (var, explore_var))
+    rng = np.random.default_rng(seed)
+
+    width, height, step = size
+    columns, rows = width // step, height // step
+    x_min, x_max, y_min, y_max = bounds
+    cell_width, cell_height = step * (x_max - x_min) / width, step * (y_max - y_min) / height
+    s_x_min, s_x_max, s_y_min, s_y_max = sample_bounds
+    limits = np.array(bands)
+
+    histogram = np.zeros((3, rows * columns))
+    for start in range(0, samples, batch_size):
+        check_cancelled(cancel)
+        count = min(batch_size, samples - start)
+
+        # Samples (uniform, or from the cells of the importance map weighted by the inverse of their probability)
+        if weights is None:
+            cells, weight = None, np.ones(count)
+            u, v = rng.random(count), rng.random(count)
+        else:
+            cells = rng.choice(len(weights), size=count, p=weights)
+            weight = 1 / (len(weights) * weights[cells])
+            u = (cells % IMPORTANCE_RESOLUTION + rng.random(count)) / IMPORTANCE_RESOLUTION
+            v = (cells // IMPORTANCE_RESOLUTION + rng.random(count)) / IMPORTANCE_RESOLUTION
+        points = (s_x_min + u * (s_x_max - s_x_min)) + 1j * (s_y_min + v * (s_y_max - s_y_min))
+
+        escape = _escape_counts(expression, var, explore_var, points, iterations, escape_radius)
+        kept = np.nonzero((escape < iterations) & (escape <= limits.max()))[0]
+        if len(kept) == 0:
+            continue
+        points, escape, weight = points[kept], escape[kept], weight[kept]
+        channels = escape[np.newaxis, :] <= limits[:, np.newaxis]
+
+        # Trace the escaping orbits (every orbit is active until its escape time)
+        active = np.arange(len(points))
+        variables = {var: points * 0, explore_var: points}
+        with np.errstate(all="ignore"):
+            for k in range(1, int(escape.max()) + 1):
+                values = np.asarray(expression.evaluate(variables), dtype=complex)
+
+                column = np.floor((values.real - x_min) / cell_width)
+                row = np.floor((values.imag - y_min) / cell_height)
+                visible = (column >= 0) & (column < columns) & (row >= 0) & (row < rows)
+                if visible.any():
+                    cells = (row[visible] * columns + column[visible]).astype(np.int64)
+                    orbits = active[visible]
+                    for channel in range(3):
+                        mask = channels[channel, orbits]
+                        if mask.any():
+                            histogram[channel] += np.bincount(cells[mask], weights=weight[orbits[mask]], minlength=rows * columns)
+
+                kept = np.nonzero(escape[active] > k)[0]
+                active = active[kept]
+                if len(active) == 0:
+                    break
+                variables = {explore_var: variables[explore_var][kept], var: values[kept]}
+
+    return histogram.reshape(3, rows, columns)
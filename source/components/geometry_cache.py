@@ -0,0 +1,196 @@
+import hashlib
+import json
+import os
+import sys
+import numpy as np
+
+
+class GeometryCache:
+    """
+    Disk cache of expanded fractal geometry (NumPy arrays), keyed by a hash of the normalised fractal definition.
+
+    Every iteration level is stored in its own flat binary file ('<key>-<level>.npy'), which is memory-mapped when it
+    is read, so a stored level can be reused without loading it whole (and a deeper level can be expanded from the
+    nearest stored one). Files are evicted in the order of their last use when the total size exceeds the limit.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = 512 << 20) -> None:
+        """
+        Initializes an instance of the GeometryCache class.
+
+        Parameters:
+            directory (str): The directory of the cache files (created if it does not exist).
+            max_bytes (int): The maximum total size of the cache files. Defaults to 512 MiB.
+        """
+        if max_bytes < 0:
+            raise ValueError("Cache error: the cache size must not be negative.")
+
+        os.makedirs(directory, exist_ok=True)
+        self._directory = directory
+        self._max_bytes = max_bytes
+
+    @property
+    def size(self) -> int:
+        """
+        Gets the total size of the cache files.
+
+        Returns:
+            int: The size in bytes.
+        """
+        return sum(size for _, size, _ in self.__files())
+
+    @staticmethod
+    def default_directory() -> str:
+        """
+        Gets the default directory of the cache, in the cache directory of the user ('%LOCALAPPDATA%' on Windows,
+        '~/Library/Caches' on macOS, '$XDG_CACHE_HOME' or '~/.cache' elsewhere).
+
+        Returns:
+            str: The path of the directory.
+        """
+        if sys.platform == "win32":
+            base = os.environ.get("LOCALAPPDATA") or os.path.expanduser(os.path.join("~", "AppData", "Local"))
+        elif sys.platform == "darwin":
+            base = os.path.expanduser(os.path.join("~", "Library", "Caches"))
+        else:
+            base = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser(os.path.join("~", ".cache"))
+        return os.path.join(base, "fractal-generator", "geometry")
+
+    @staticmethod
+    def key(kind: str, definition: dict) -> str:
+        """
+        Computes the key of a fractal definition.
+
+        Parameters:
+            kind (str): The kind of the stored geometry (different geometry of one definition has different kinds).
+            definition (dict): The normalised definition (everything the geometry depends on, JSON serialisable).
+
+        Returns:
+            str: The key.
+        """
+        text = json.dumps([kind, definition], sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(text.encode()).hexdigest()[:24]
+
+    def load(self, key: str, level: int) -> np.ndarray:
+        """
+        Reads a stored level (memory-mapped, read-only) and marks it as recently used.
+
+        Parameters:
+            key (str): The key of the definition.
+            level (int): The iteration level.
+
+        Returns:
+            np.ndarray: The stored array, or None if the level is not stored (or the file is damaged).
+        """
+        path = self.__path(key, level)
+        try:
+            array = np.load(path, mmap_mode="r")
+        except (OSError, ValueError):
+            return None
+
+        os.utime(path)
+        return array
+
+    def nearest(self, key: str, level: int) -> tuple:
+        """
+        Finds the deepest stored level not deeper than the given one.
+
+        Parameters:
+            key (str): The key of the definition.
+            level (int): The iteration level.
+
+        Returns:
+            tuple: The stored level and its array, or (0, None) if no level is stored.
+        """
+        prefix = f"{key}-"
+        levels = []
+        for name in os.listdir(self._directory):
+            if name.startswith(prefix) and name.endswith(".npy") and name[len(prefix):-4].isdigit():
+                levels.append(int(name[len(prefix):-4]))
+
+        for stored in sorted((stored for stored in levels if stored <= level), reverse=True):
+            array = self.load(key, stored)
+            if array is not None:
+                return stored, array
+        return 0, None
+
+    def store(self, key: str, level: int, array: np.ndarray) -> None:
+        """
+        Stores a level and evicts the least recently used files over the size limit. Arrays larger than the limit
+        are not stored.
+
+        Parameters:
+            key (str): The key of the definition.
+            level (int): The iteration level.
+            array (np.ndarray): The array.
+        """
+        array = np.ascontiguousarray(array)
+        if array.nbytes > self._max_bytes:
+            return
+
+        # Written under a temporary name first, so that a damaged file is never mapped
+        path = self.__path(key, level)
+        temporary = f"{path}.{os.getpid()}.tmp"
+        with open(temporary, "wb") as f:
+            np.save(f, array)
+        os.replace(temporary, path)
+
+        self.__evict(keep=path)
+
+    def clear(self) -> None:
+        """
+        Removes all cache files.
+        """
+        for path, _, _ in self.__files():
+            os.remove(path)
+
+    def __path(self, key: str, level: int) -> str:
+        """
+        Gets the path of the file of a level.
+
+        Parameters:
+            key (str): The key of the definition.
+            level (int): The iteration level.
+
+        Returns:
+            str: The path.
+        """
+        return os.path.join(self._directory, f"{key}-{level}.npy")
+
+    def __files(self) -> list:
+        """
+        Lists the cache files.
+
+        Returns:
+            list: Triples (path, size, last use time) of the files.
+        """
+        files = []
+        for name in os.listdir(self._directory):
+            if name.endswith(".npy"):
+                path = os.path.join(self._directory, name)
+                try:
+                    status = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                files.append((path, status.st_size, status.st_mtime))
+        return files
+
+    def __evict(self, keep: str) -> None:
+        """
+        Removes the least recently used files until the total size is within the limit.
+
+        Parameters:
+            keep (str): The path of a file which is not removed (the one just stored).
+        """
+        files = sorted(self.__files(), key=lambda file: file[2])
+        total = sum(size for _, size, _ in files)
+        for path, size, _ in files:
+            if total <= self._max_bytes:
+                break
+            if path == keep:
+                continue
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
@@ -0,0 +1,62 @@
+import threading
+import time
+from contextlib import contextmanager
+
+
+class PhaseTimer:
+    """
+    Accumulates the wall-clock and CPU time spent in named phases of a computation.
+
+    Phases may be nested (also in different threads); the time of a nested phase is not counted in the enclosing
+    phase, so the times of all phases add up to the measured total.
+    """
+
+    def __init__(self) -> None:
+        """
+        Initializes an instance of the PhaseTimer class.
+        """
+        self._phases = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    @property
+    def results(self) -> dict:
+        """
+        Gets the measured phases (in the order they were first entered).
+
+        Returns:
+            dict: A dictionary mapping phase names to dictionaries with the wall time ("wall") and CPU time ("cpu")
+                in seconds and the number of times the phase was entered ("calls").
+        """
+        with self._lock:
+            return {
+                name: {"wall": wall, "cpu": cpu, "calls": calls}
+                for name, (wall, cpu, calls) in self._phases.items()
+            }
+
+    @contextmanager
+    def phase(self, name: str):
+        """
+        Measures a phase (a context manager; repeated phases of the same name are summed).
+
+        Parameters:
+            name (str): The name of the phase.
+        """
+        # Time of the phases nested in this one (per thread)
+        stack = self._local.__dict__.setdefault("stack", [])
+        nested = [0.0, 0.0]
+        stack.append(nested)
+
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+            stack.pop()
+            if stack:
+                stack[-1][0] += wall
+                stack[-1][1] += cpu
+
+            with self._lock:
+                total_wall, total_cpu, calls = self._phases.get(name, (0.0, 0.0, 0))
+                self._phases[name] = (total_wall + wall - nested[0], total_cpu + cpu - nested[1], calls + 1)
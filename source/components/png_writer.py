@@ -0,0 +1,113 @@
+import struct
+import zlib
+
+
+class PngWriter:
+    """
+    Streaming PNG writer. Rows of an RGB image are compressed and written as they are supplied, so the whole image
+    never has to be held in memory.
+    """
+
+    def __init__(self, path: str, width: int, height: int, chunk_size: int = 1 << 16) -> None:
+        """
+        Initializes an instance of the PngWriter class and writes the PNG header.
+
+        Parameters:
+            path (str): The path of the output file.
+            width (int): The width of the image.
+            height (int): The height of the image.
+            chunk_size (int): The size of the compressed data chunks in bytes. Defaults to 65536.
+        """
+        if width <= 0 or height <= 0:
+            raise ValueError("PNG error: image dimensions must be positive.")
+
+        self._file = open(path, "wb")
+        self._width, self._height = width, height
+        self._chunk_size = chunk_size
+        self._rows_written = 0
+        self._compressor = zlib.compressobj()
+        self._pending = bytearray()
+
+        self._file.write(b"\x89PNG\r\n\x1a\n")
+        # 8 bits per channel, RGB, no interlacing
+        self.__write_chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+
+    @property
+    def rows_written(self) -> int:
+        """
+        Gets the number of rows written so far.
+
+        Returns:
+            int: The number of rows.
+        """
+        return self._rows_written
+
+    def write_rows(self, rows: object) -> None:
+        """
+        Appends rows to the image.
+
+        Parameters:
+            rows (object): An array of shape (n, width, 3) of 8-bit RGB values (anything supporting 'tobytes'
+                or a sequence of rows in the 'bytes' format).
+
+        Raises:
+            ValueError: If more rows than the image height are written or a row has a wrong length.
+        """
+        data = rows.tobytes() if hasattr(rows, "tobytes") else b"".join(bytes(row) for row in rows)
+        stride = 3 * self._width
+        if len(data) % stride:
+            raise ValueError("PNG error: row length does not match the image width.")
+
+        count = len(data) // stride
+        if self._rows_written + count > self._height:
+            raise ValueError("PNG error: too many rows.")
+
+        # Every row is preceded by its filter type (0 - none)
+        filtered = bytearray()
+        for i in range(count):
+            filtered += b"\x00"
+            filtered += data[i * stride:(i + 1) * stride]
+        self._pending += self._compressor.compress(bytes(filtered))
+        self._rows_written += count
+
+        while len(self._pending) >= self._chunk_size:
+            self.__write_chunk(b"IDAT", bytes(self._pending[:self._chunk_size]))
+            del self._pending[:self._chunk_size]
+
+    def close(self) -> None:
+        """
+        Writes the remaining data and closes the file.
+
+        Raises:
+            ValueError: If fewer rows than the image height were written.
+        """
+        if self._file.closed:
+            return
+
+        try:
+            if self._rows_written != self._height:
+                raise ValueError(f"PNG error: {self._rows_written} of {self._height} rows written.")
+            self._pending += self._compressor.flush()
+            self.__write_chunk(b"IDAT", bytes(self._pending))
+            self.__write_chunk(b"IEND", b"")
+        finally:
+            self._file.close()
+
+    def __enter__(self) -> "PngWriter":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self._file.close()
+
+    def __write_chunk(self, tag: bytes, data: bytes) -> None:
+        """
+        Writes a PNG chunk.
+
+        Parameters:
+            tag (bytes): The chunk type.
+            data (bytes): The chunk data.
+        """
+        self._file.write(struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data) & 0xFFFFFFFF))
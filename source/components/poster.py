@@ -0,0 +1,184 @@
+import json
+import os
+import numpy as np
+
+
+class Poster:
+    """
+    Out-of-core storage of a large TEA image computed tile by tile. The escape times and the magnitudes of the last
+    members of the sequence of all grid cells are kept in flat binary files (row-major arrays), which are written
+    tile by tile and read in blocks of rows, so the memory used does not depend on the size of the image.
+
+    Completed tiles are recorded in a file of flags after their data is flushed to disk, so an interrupted
+    computation resumes with the missing tiles. The files are recreated when the identity of the image (everything
+    the computed values depend on) changes.
+    """
+
+    def __init__(self, directory: str, columns: int, rows: int, identity: str, tile_size: int = 512) -> None:
+        """
+        Initializes an instance of the Poster class (opens the files of a previous computation of the same image
+        or creates new ones).
+
+        Parameters:
+            directory (str): The directory of the files (created if it does not exist).
+            columns (int): The number of grid columns.
+            rows (int): The number of grid rows.
+            identity (str): The identity of the image (e.g. a hash of the definition and the drawing configuration).
+            tile_size (int): The size of a tile in grid cells. Defaults to 512.
+        """
+        if columns <= 0 or rows <= 0 or tile_size <= 0:
+            raise ValueError("Poster error: the grid and tile dimensions must be positive.")
+
+        os.makedirs(directory, exist_ok=True)
+        self._directory = directory
+        self._columns, self._rows = columns, rows
+        self._tile_size = tile_size
+        self._tile_columns = -(-columns // tile_size)
+        self._tile_rows = -(-rows // tile_size)
+
+        manifest = {"identity": identity, "columns": columns, "rows": rows, "tile_size": tile_size}
+        manifest_path = os.path.join(directory, "poster.json")
+        try:
+            with open(manifest_path) as f:
+                resumed = json.load(f) == manifest
+        except (OSError, ValueError):
+            resumed = False
+
+        if not resumed:
+            # Data files are created before the manifest, so a manifest always describes complete files
+            for name in ("tiles.u8", "counts.u32", "magnitudes.f32", "poster.json"):
+                if os.path.exists(os.path.join(directory, name)):
+                    os.remove(os.path.join(directory, name))
+            self.__create("tiles.u8", np.uint8, (self.tile_count,))
+            self.__create("counts.u32", np.uint32, (rows, columns))
+            self.__create("magnitudes.f32", np.float32, (rows, columns))
+            with open(manifest_path, "w") as f:
+                json.dump(manifest, f)
+
+        self._completed_file = open(os.path.join(directory, "tiles.u8"), "r+b")
+        self._completed = bytearray(self._completed_file.read())
+        self._counts = open(os.path.join(directory, "counts.u32"), "r+b")
+        self._magnitudes = open(os.path.join(directory, "magnitudes.f32"), "r+b")
+
+    @property
+    def columns(self) -> int:
+        """
+        Gets the number of grid columns.
+
+        Returns:
+            int: The number of columns.
+        """
+        return self._columns
+
+    @property
+    def rows(self) -> int:
+        """
+        Gets the number of grid rows.
+
+        Returns:
+            int: The number of rows.
+        """
+        return self._rows
+
+    @property
+    def tile_count(self) -> int:
+        """
+        Gets the number of tiles.
+
+        Returns:
+            int: The number of tiles.
+        """
+        return self._tile_columns * self._tile_rows
+
+    @property
+    def completed_count(self) -> int:
+        """
+        Gets the number of completed tiles.
+
+        Returns:
+            int: The number of tiles.
+        """
+        return self.tile_count - self._completed.count(0)
+
+    def tile(self, index: int) -> tuple:
+        """
+        Gets the cells of a tile (tiles are numbered row by row).
+
+        Parameters:
+            index (int): The index of the tile.
+
+        Returns:
+            tuple: The tile as (column_min, row_min, column_max, row_max), maxima exclusive.
+        """
+        column, row = (index % self._tile_columns) * self._tile_size, (index // self._tile_columns) * self._tile_size
+        return column, row, min(column + self._tile_size, self._columns), min(row + self._tile_size, self._rows)
+
+    def pending(self) -> list:
+        """
+        Lists the tiles which have not been completed.
+
+        Returns:
+            list: The indexes of the tiles.
+        """
+        return [index for index, completed in enumerate(self._completed) if not completed]
+
+    def store(self, index: int, counts: np.ndarray, magnitudes: np.ndarray) -> None:
+        """
+        Stores the values of a tile and marks it as completed.
+
+        Parameters:
+            index (int): The index of the tile.
+            counts (np.ndarray): The escape times of the cells of the tile (an array of shape (rows, columns)).
+            magnitudes (np.ndarray): The magnitudes of the last members of the sequence of the cells.
+        """
+        column_min, row_min, column_max, row_max = self.tile(index)
+        for f, values, dtype in ((self._counts, counts, np.uint32), (self._magnitudes, magnitudes, np.float32)):
+            values = np.asarray(values, dtype=dtype)
+            for row in range(row_min, row_max):
+                f.seek((row * self._columns + column_min) * values.itemsize)
+                f.write(values[row - row_min].tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+
+        # The tile is marked only after its values are on disk
+        self._completed[index] = 1
+        self._completed_file.seek(index)
+        self._completed_file.write(b"\x01")
+        self._completed_file.flush()
+        os.fsync(self._completed_file.fileno())
+
+    def read_rows(self, start: int, stop: int) -> tuple:
+        """
+        Reads rows of all tiles (which should be completed).
+
+        Parameters:
+            start (int): The first row.
+            stop (int): The row after the last one.
+
+        Returns:
+            tuple: Arrays of the escape times and the magnitudes of the last members of the rows.
+        """
+        arrays = []
+        for f, dtype in ((self._counts, np.uint32), (self._magnitudes, np.float32)):
+            f.seek(start * self._columns * np.dtype(dtype).itemsize)
+            arrays.append(np.fromfile(f, dtype, (stop - start) * self._columns).reshape(stop - start, self._columns))
+        return tuple(arrays)
+
+    def close(self) -> None:
+        """
+        Closes the files.
+        """
+        for f in (self._completed_file, self._counts, self._magnitudes):
+            f.close()
+
+    def __create(self, name: str, dtype: type, shape: tuple) -> None:
+        """
+        Creates a zero-filled data file (sparse where the file system allows it).
+
+        Parameters:
+            name (str): The name of the file.
+            dtype (type): The type of the values.
+            shape (tuple): The shape of the array.
+        """
+        with open(os.path.join(self._directory, name), "wb") as f:
+            f.truncate(int(np.prod(shape)) * np.dtype(dtype).itemsize)
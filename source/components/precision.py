@@ -0,0 +1,498 @@
+import math
+import numpy as np
+from decimal import Decimal
+
+
+# Precision tiers (from the cheapest) and the relative precision of their arithmetic
+PRECISIONS = ("single", "double", "double-double", "decimal")
+EPSILONS = {"single": 2.0 ** -24, "double": 2.0 ** -53, "double-double": 2.0 ** -104}
+
+# Bits of precision kept for the error accumulated over the iterations
+MARGIN = 2.0 ** 16
+
+# Largest grid (in cells) chosen to be computed in single precision (thumbnails only, larger grids differ visibly from
+# double precision in some cells)
+THUMBNAIL_CELLS = 64 * 64
+
+# Splitter of Dekker's exact product (2^27 + 1)
+SPLITTER = 134217729.0
+
+
+def relative_spacing(bounds: tuple, width: int, height: int, step: int = 1) -> float:
+    """
+    Computes the spacing of grid points relative to the magnitude of their coordinates.
+
+    Parameters:
+        bounds (tuple): The plotted range as (x_min, x_max, y_min, y_max).
+        width (int): The width of the plot in pixels.
+        height (int): The height of the plot in pixels.
+        step (int): The size of a grid cell in pixels. Defaults to 1.
+
+    Returns:
+        float: The relative spacing.
+    """
+    x_min, x_max, y_min, y_max = bounds
+    spacing = step * min(abs(x_max - x_min) / width, abs(y_max - y_min) / height)
+    magnitude = max(abs(value) for value in bounds)
+    return spacing / magnitude if magnitude > 0 else 1.0
+
+
+def choose_precision(bounds: tuple, width: int, height: int, step: int = 1) -> str:
+    """
+    Chooses the cheapest precision tier which resolves neighbouring grid points (with a margin for the error
+    accumulated over the iterations). Single precision is chosen only for thumbnails (see THUMBNAIL_CELLS), so
+    double precision is the default.
+
+    Parameters:
+        bounds (tuple): The plotted range as (x_min, x_max, y_min, y_max).
+        width (int): The width of the plot in pixels.
+        height (int): The height of the plot in pixels.
+        step (int): The size of a grid cell in pixels. Defaults to 1.
+
+    Returns:
+        str: The precision tier (see PRECISIONS).
+    """
+    spacing = relative_spacing(bounds, width, height, step)
+    thumbnail = (width // step) * (height // step) <= THUMBNAIL_CELLS
+    for precision in PRECISIONS[:-1]:
+        if precision == "single" and not thumbnail:
+            continue
+        if spacing >= EPSILONS[precision] * MARGIN:
+            return precision
+    return "decimal"
+
+
+def decimal_digits(bounds: tuple, width: int, height: int, step: int = 1) -> int:
+    """
+    Determines the number of significant digits of the decimal tier.
+
+    Parameters:
+        bounds (tuple): The plotted range as (x_min, x_max, y_min, y_max).
+        width (int): The width of the plot in pixels.
+        height (int): The height of the plot in pixels.
+        step (int): The size of a grid cell in pixels. Defaults to 1.
+
+    Returns:
+        int: The number of digits.
+    """
+    spacing = max(relative_spacing(bounds, width, height, step), 1e-300)
+    return max(34, math.ceil(-math.log10(spacing / MARGIN)) + 4)
+
+
+def _two_sum(a: float, b: float) -> tuple:
+    """
+    Adds two floats exactly (Knuth's two-sum): the rounded sum and its rounding error, whose sum equals a + b
+    exactly.
+
+    Parameters:
+        a (float): The first addend.
+        b (float): The second addend.
+
+    Returns:
+        tuple: The (high, low) parts, high being the rounded sum.
+    """
+    s = a + b
+    v = s - a
+    return s, (a - (s - v)) + (b - v)
+
+
+def _two_product(a: float, b: float) -> tuple:
+    """
+    Multiplies two floats exactly (Dekker's product, the operands are split by SPLITTER): the rounded product and
+    its rounding error, whose sum equals a * b exactly (barring overflow).
+
+    Parameters:
+        a (float): The first factor.
+        b (float): The second factor.
+
+    Returns:
+        tuple: The (high, low) parts, high being the rounded product.
+    """
+    p = a * b
+    t = SPLITTER * a
+    a_high = t - (t - a)
+    a_low = a - a_high
+    t = SPLITTER * b
+    b_high = t - (t - b)
+    b_low = b - b_high
+    return p, ((a_high * b_high - p) + a_high * b_low + a_low * b_high) + a_low * b_low
+
+
+def _add(a: tuple, b: tuple) -> tuple:
+    """
+    Adds two double-double values. The result is normalized (the low part is at most half an ulp of the high part).
+
+    Parameters:
+        a (tuple): The first addend as (high, low).
+        b (tuple): The second addend as (high, low).
+
+    Returns:
+        tuple: The sum as (high, low).
+    """
+    s, e = _two_sum(a[0], b[0])
+    e += a[1] + b[1]
+    high = s + e
+    return high, e - (high - s)
+
+
+def _multiply(a: tuple, b: tuple) -> tuple:
+    """
+    Multiplies two double-double values (the product of the low parts is dropped). The result is normalized.
+
+    Parameters:
+        a (tuple): The first factor as (high, low).
+        b (tuple): The second factor as (high, low).
+
+    Returns:
+        tuple: The product as (high, low).
+    """
+    p, e = _two_product(a[0], b[0])
+    e += a[0] * b[1] + a[1] * b[0]
+    high = p + e
+    return high, e - (high - p)
+
+
+def _negate(a: tuple) -> tuple:
+    """
+    Negates a double-double value (exact).
+
+    Parameters:
+        a (tuple): The value as (high, low).
+
+    Returns:
+        tuple: The negated value as (high, low).
+    """
+    return -a[0], -a[1]
+
+
+def _divide(a: tuple, b: tuple) -> tuple:
+    """
+    Divides two double-double values (a float quotient corrected by one step using the exact remainder). The
+    result is normalized.
+
+    Parameters:
+        a (tuple): The dividend as (high, low).
+        b (tuple): The divisor as (high, low).
+
+    Returns:
+        tuple: The quotient as (high, low).
+    """
+    q = a[0] / b[0]
+    r = _add(a, _negate(_multiply(b, (q, 0.0))))
+    correction = r[0] / b[0]
+    high = q + correction
+    return high, correction - (high - q)
+
+
+class DoubleDoubleComplex:
+    """
+    Complex number whose parts are double-double values (an unevaluated sum of two floats, about 106 bits of
+    precision). Supports the arithmetic operators (powers with integer exponents only) mixed with Python numbers.
+
+    The floats may be NumPy arrays of the same shape, in which case the instance is an array of numbers and all
+    operations are vectorized.
+    """
+
+    __slots__ = ("_real", "_imag")
+
+    def __init__(self, real: tuple = (0.0, 0.0), imag: tuple = (0.0, 0.0)) -> None:
+        """
+        Initializes an instance of the DoubleDoubleComplex class.
+
+        Parameters:
+            real (tuple): The real part as (high, low) floats or arrays. Defaults to zero.
+            imag (tuple): The imaginary part as (high, low) floats or arrays. Defaults to zero.
+        """
+        self._real, self._imag = real, imag
+
+    @staticmethod
+    def split(value: Decimal) -> tuple:
+        """
+        Rounds a decimal number to a double-double value.
+
+        Parameters:
+            value (Decimal): The number.
+
+        Returns:
+            tuple: The value as (high, low).
+        """
+        high = float(value)
+        return high, float(value - Decimal(high))
+
+    @staticmethod
+    def convert(value: object) -> "DoubleDoubleComplex":
+        """
+        Converts a Python number.
+
+        Parameters:
+            value (object): The number (int, float, complex or DoubleDoubleComplex).
+
+        Returns:
+            DoubleDoubleComplex: The converted number.
+        """
+        if isinstance(value, DoubleDoubleComplex):
+            return value
+        if isinstance(value, (int, float)):
+            return DoubleDoubleComplex((float(value), 0.0))
+        if isinstance(value, complex):
+            return DoubleDoubleComplex((value.real, 0.0), (value.imag, 0.0))
+        return NotImplemented
+
+    def __add__(self, other: object) -> "DoubleDoubleComplex":
+        other = DoubleDoubleComplex.convert(other)
+        if other is NotImplemented:
+            return other
+        return DoubleDoubleComplex(_add(self._real, other._real), _add(self._imag, other._imag))
+
+    __radd__ = __add__
+
+    def __neg__(self) -> "DoubleDoubleComplex":
+        return DoubleDoubleComplex(_negate(self._real), _negate(self._imag))
+
+    def __pos__(self) -> "DoubleDoubleComplex":
+        return self
+
+    def __sub__(self, other: object) -> "DoubleDoubleComplex":
+        other = DoubleDoubleComplex.convert(other)
+        if other is NotImplemented:
+            return other
+        return self + (-other)
+
+    def __rsub__(self, other: object) -> "DoubleDoubleComplex":
+        return (-self) + other
+
+    def __mul__(self, other: object) -> "DoubleDoubleComplex":
+        other = DoubleDoubleComplex.convert(other)
+        if other is NotImplemented:
+            return other
+        a, b, c, d = self._real, self._imag, other._real, other._imag
+        return DoubleDoubleComplex(
+            _add(_multiply(a, c), _negate(_multiply(b, d))),
+            _add(_multiply(a, d), _multiply(b, c))
+        )
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, other: object) -> "DoubleDoubleComplex":
+        other = DoubleDoubleComplex.convert(other)
+        if other is NotImplemented:
+            return other
+        c, d = other._real, other._imag
+        norm = _add(_multiply(c, c), _multiply(d, d))
+        numerator = self * DoubleDoubleComplex(c, _negate(d))
+        return DoubleDoubleComplex(_divide(numerator._real, norm), _divide(numerator._imag, norm))
+
+    def __rtruediv__(self, other: object) -> "DoubleDoubleComplex":
+        return DoubleDoubleComplex.convert(other) / self
+
+    def __pow__(self, exponent: object) -> "DoubleDoubleComplex":
+        if isinstance(exponent, float) and exponent.is_integer():
+            exponent = int(exponent)
+        if not isinstance(exponent, int):
+            raise TypeError("double-double numbers only support integer exponents")
+        if exponent < 0:
+            return 1 / (self ** -exponent)
+
+        # Exponentiation by squaring
+        result, base = DoubleDoubleComplex((1.0, 0.0)), self
+        while exponent:
+            if exponent & 1:
+                result = result * base
+            exponent >>= 1
+            if exponent:
+                base = base * base
+        return result
+
+    @property
+    def real(self) -> "DoubleDoubleComplex":
+        """
+        Gets the real part (as a number of the same type, so that the precision is kept).
+
+        Returns:
+            DoubleDoubleComplex: The real part.
+        """
+        return DoubleDoubleComplex(self._real, (self._imag[0] * 0, self._imag[1] * 0))
+
+    @property
+    def imag(self) -> "DoubleDoubleComplex":
+        """
+        Gets the imaginary part (as a number of the same type, so that the precision is kept).
+
+        Returns:
+            DoubleDoubleComplex: The imaginary part.
+        """
+        return DoubleDoubleComplex(self._imag, (self._real[0] * 0, self._real[1] * 0))
+
+    def conjugate(self) -> "DoubleDoubleComplex":
+        """
+        Gets the complex conjugate.
+
+        Returns:
+            DoubleDoubleComplex: The conjugate.
+        """
+        return DoubleDoubleComplex(self._real, _negate(self._imag))
+
+    def __getitem__(self, index: object) -> "DoubleDoubleComplex":
+        return DoubleDoubleComplex(
+            (self._real[0][index], self._real[1][index]), (self._imag[0][index], self._imag[1][index])
+        )
+
+    def __abs__(self) -> float:
+        return np.hypot(self._real[0] + self._real[1], self._imag[0] + self._imag[1])
+
+    def to_complex(self) -> complex:
+        """
+        Rounds the number to a Python complex number (or the array to a complex array).
+
+        Returns:
+            complex: The rounded number.
+        """
+        return (self._real[0] + self._real[1]) + 1j * (self._imag[0] + self._imag[1])
+
+    def __repr__(self) -> str:
+        return f"DoubleDoubleComplex({self._real}, {self._imag})"
+
+
+class DecimalComplex:
+    """
+    Complex number with decimal parts (arbitrary precision, given by the current decimal context). Supports the
+    arithmetic operators (powers with integer exponents only) mixed with Python numbers.
+    """
+
+    __slots__ = ("_real", "_imag")
+
+    def __init__(self, real: Decimal = Decimal(0), imag: Decimal = Decimal(0)) -> None:
+        """
+        Initializes an instance of the DecimalComplex class.
+
+        Parameters:
+            real (Decimal): The real part. Defaults to zero.
+            imag (Decimal): The imaginary part. Defaults to zero.
+        """
+        self._real, self._imag = real, imag
+
+    @staticmethod
+    def convert(value: object) -> "DecimalComplex":
+        """
+        Converts a Python number.
+
+        Parameters:
+            value (object): The number (int, float, complex or DecimalComplex).
+
+        Returns:
+            DecimalComplex: The converted number.
+        """
+        if isinstance(value, DecimalComplex):
+            return value
+        if isinstance(value, (int, float)):
+            return DecimalComplex(Decimal(value))
+        if isinstance(value, complex):
+            return DecimalComplex(Decimal(value.real), Decimal(value.imag))
+        return NotImplemented
+
+    def __add__(self, other: object) -> "DecimalComplex":
+        other = DecimalComplex.convert(other)
+        if other is NotImplemented:
+            return other
+        return DecimalComplex(self._real + other._real, self._imag + other._imag)
+
+    __radd__ = __add__
+
+    def __neg__(self) -> "DecimalComplex":
+        return DecimalComplex(-self._real, -self._imag)
+
+    def __pos__(self) -> "DecimalComplex":
+        return self
+
+    def __sub__(self, other: object) -> "DecimalComplex":
+        other = DecimalComplex.convert(other)
+        if other is NotImplemented:
+            return other
+        return DecimalComplex(self._real - other._real, self._imag - other._imag)
+
+    def __rsub__(self, other: object) -> "DecimalComplex":
+        return (-self) + other
+
+    def __mul__(self, other: object) -> "DecimalComplex":
+        other = DecimalComplex.convert(other)
+        if other is NotImplemented:
+            return other
+        a, b, c, d = self._real, self._imag, other._real, other._imag
+        return DecimalComplex(a * c - b * d, a * d + b * c)
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, other: object) -> "DecimalComplex":
+        other = DecimalComplex.convert(other)
+        if other is NotImplemented:
+            return other
+        a, b, c, d = self._real, self._imag, other._real, other._imag
+        norm = c * c + d * d
+        if norm == 0:
+            raise ZeroDivisionError("complex division by zero")
+        return DecimalComplex((a * c + b * d) / norm, (b * c - a * d) / norm)
+
+    def __rtruediv__(self, other: object) -> "DecimalComplex":
+        return DecimalComplex.convert(other) / self
+
+    def __pow__(self, exponent: object) -> "DecimalComplex":
+        if isinstance(exponent, float) and exponent.is_integer():
+            exponent = int(exponent)
+        if not isinstance(exponent, int):
+            raise TypeError("decimal complex numbers only support integer exponents")
+        if exponent < 0:
+            return 1 / (self ** -exponent)
+
+        # Exponentiation by squaring
+        result, base = DecimalComplex(Decimal(1)), self
+        while exponent:
+            if exponent & 1:
+                result = result * base
+            exponent >>= 1
+            if exponent:
+                base = base * base
+        return result
+
+    @property
+    def real(self) -> "DecimalComplex":
+        """
+        Gets the real part (as a number of the same type, so that the precision is kept).
+
+        Returns:
+            DecimalComplex: The real part.
+        """
+        return DecimalComplex(self._real)
+
+    @property
+    def imag(self) -> "DecimalComplex":
+        """
+        Gets the imaginary part (as a number of the same type, so that the precision is kept).
+
+        Returns:
+            DecimalComplex: The imaginary part.
+        """
+        return DecimalComplex(self._imag)
+
+    def conjugate(self) -> "DecimalComplex":
+        """
+        Gets the complex conjugate.
+
+        Returns:
+            DecimalComplex: The conjugate.
+        """
+        return DecimalComplex(self._real, -self._imag)
+
+    def __abs__(self) -> float:
+        return math.hypot(float(self._real), float(self._imag))
+
+    def to_complex(self) -> complex:
+        """
+        Rounds the number to a Python complex number.
+
+        Returns:
+            complex: The rounded number.
+        """
+        return complex(float(self._real), float(self._imag))
+
+    def __repr__(self) -> str:
+        return f"DecimalComplex({self._real!r}, {self._imag!r})"
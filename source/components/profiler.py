@@ -0,0 +1,175 @@
+import cProfile
+import json
+import pstats
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+
+from .phase_timer import PhaseTimer
+from .vector import Vector
+
+
+class Profiler:
+    """
+    Collects a profile of one run: the time of its phases, hot-path counters, the peak memory (traced by
+    'tracemalloc') and optionally 'cProfile' statistics.
+
+    Counters are fed by event subscribers added only when profiling, and 'Vector' allocations are counted by
+    replacing 'Vector.__init__' between 'start' and 'stop', so an unprofiled run is not slowed down. Work done in
+    other processes (the '-workers' option) is timed, but not counted.
+    """
+
+    def __init__(self, stats_path: str = None) -> None:
+        """
+        Initializes an instance of the Profiler class.
+
+        Parameters:
+            stats_path (str): The path of the 'cProfile' statistics file (None for no statistics). Defaults to None.
+        """
+        self._timer = PhaseTimer()
+        self._counters = {}
+        self._levels = {}
+        self._stats_path = stats_path
+        self._cprofiles = []
+        self._init = None
+        self._wall, self._cpu = None, None
+        self._peak_memory = None
+
+    @property
+    def counters(self) -> dict:
+        """
+        Gets the counters.
+
+        Returns:
+            dict: A dictionary mapping counter names to their values.
+        """
+        return dict(self._counters)
+
+    def phase(self, name: str):
+        """
+        Measures a phase of the run (a context manager, see 'PhaseTimer.phase').
+
+        Parameters:
+            name (str): The name of the phase.
+        """
+        return self._timer.phase(name)
+
+    def count(self, name: str, amount: int = 1) -> None:
+        """
+        Increases a counter.
+
+        Parameters:
+            name (str): The name of the counter.
+            amount (int): The increment. Defaults to 1.
+        """
+        self._counters[name] = self._counters.get(name, 0) + amount
+
+    def record(self, name: str, level: int, value: int) -> None:
+        """
+        Records a per-level value (e.g. the number of figures of an iteration level).
+
+        Parameters:
+            name (str): The name of the counter.
+            level (int): The level.
+            value (int): The value.
+        """
+        self._levels.setdefault(name, {})[str(level)] = value
+
+    def start(self) -> None:
+        """
+        Starts measuring (memory tracing, 'Vector' counting and 'cProfile' in the calling thread).
+        """
+        self._wall, self._cpu = time.perf_counter(), time.process_time()
+        tracemalloc.start()
+
+        init = self._init = Vector.__init__
+        counters = self._counters
+        counters.setdefault("vector_allocations", 0)
+
+        def counting_init(vector, *args, **kwargs):
+            counters["vector_allocations"] += 1
+            init(vector, *args, **kwargs)
+
+        Vector.__init__ = counting_init
+
+        if self._stats_path is not None:
+            self._cprofiles.append(cProfile.Profile())
+            self._cprofiles[-1].enable()
+
+    @contextmanager
+    def thread(self):
+        """
+        Profiles the calling thread by 'cProfile' as well (a context manager used by threads other than the one which
+        called 'start'; their statistics are merged).
+        """
+        if self._stats_path is None:
+            yield
+            return
+
+        profile = cProfile.Profile()
+        self._cprofiles.append(profile)
+        profile.enable()
+        try:
+            yield
+        finally:
+            profile.disable()
+
+    def stop(self) -> None:
+        """
+        Stops measuring (must be called from the thread which called 'start') and writes the 'cProfile' statistics.
+        """
+        if self._cprofiles:
+            self._cprofiles[0].disable()
+            stats = pstats.Stats(*self._cprofiles)
+            stats.dump_stats(self._stats_path)
+            self._cprofiles = []
+
+        if self._init is not None:
+            Vector.__init__ = self._init
+            self._init = None
+
+        if tracemalloc.is_tracing():
+            self._peak_memory = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+        self._wall, self._cpu = time.perf_counter() - self._wall, time.process_time() - self._cpu
+
+    def report(self) -> dict:
+        """
+        Creates the report of a stopped run.
+
+        Returns:
+            dict: The total and per-phase times (seconds), the counters, the per-level values and the peak memory
+                (bytes).
+        """
+        return {
+            "wall": self._wall,
+            "cpu": self._cpu,
+            "phases": self._timer.results,
+            "counters": self.counters,
+            "levels": {name: dict(values) for name, values in self._levels.items()},
+            "peak_memory": self._peak_memory,
+            "stats": self._stats_path,
+        }
+
+    def write(self, path: str) -> None:
+        """
+        Writes the report as JSON.
+
+        Parameters:
+            path (str): The path of the report.
+        """
+        with open(path, "w") as f:
+            json.dump(self.report(), f, indent=2)
+
+
+def profile_phase(args: dict, name: str):
+    """
+    Measures a phase if the run is profiled ('profiler' in the drawing configuration), otherwise does nothing.
+
+    Parameters:
+        args (dict): Configuration for drawing.
+        name (str): The name of the phase.
+    """
+    profiler = args.get("profiler")
+    return profiler.phase(name) if profiler is not None else nullcontext()
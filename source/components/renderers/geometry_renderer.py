@@ -0,0 +1,162 @@
+import numpy as np
+
+from .i_renderer import IRenderer
+from ..color import color_to_rgb
+
+class GeometryRenderer(IRenderer):
+    """
+    Renderer which keeps all submitted geometry in NumPy arrays instead of drawing it, so that it can be
+    redrawn later under any view (see Viewer).
+    """
+
+    def __init__(self) -> None:
+        """
+        Initializes an instance of the GeometryRenderer class.
+        """
+        self._styles = []
+        self._segment_batches = []
+        self._polygon_batches = []
+        self._rasters = []
+
+    @property
+    def styles(self) -> list:
+        """
+        Gets the list of distinct styles. A segment style is a pair (color, width), a polygon style is a triple
+        (fill, outline, width).
+
+        Returns:
+            list: The styles (indexed by the style ids of the items).
+        """
+        return self._styles
+
+    @property
+    def segments(self) -> tuple:
+        """
+        Gets all submitted segments.
+
+        Returns:
+            tuple: An array of shape (n, 4) of the segments and an array of shape (n,) of their style ids.
+        """
+        if not self._segment_batches:
+            return np.empty((0, 4)), np.empty(0, dtype=int)
+        return (
+            np.concatenate([segments for segments, _ in self._segment_batches]),
+            np.concatenate([np.full(len(segments), style) for segments, style in self._segment_batches])
+        )
+
+    @property
+    def polygon_batches(self) -> list:
+        """
+        Gets all submitted polygons (batches may differ in the number of vertices).
+
+        Returns:
+            list: A list of pairs of an array of shape (n, points, 2) of the polygons and their style id.
+        """
+        return self._polygon_batches
+
+    @property
+    def rasters(self) -> list:
+        """
+        Gets all submitted rasters.
+
+        Returns:
+            list: A list of tuples (image, mask, x, y, cell_size), the image being an array of shape (rows, columns, 3)
+                of 8-bit RGB values and the mask marking the drawn cells.
+        """
+        return self._rasters
+
+    def draw_segments(self, segments: object, color: str, width: float) -> None:
+        """
+        Stores a batch of line segments.
+
+        Parameters:
+            segments (object): A sequence (or an array of shape (n, 4)) of segments as (x0, y0, x1, y1).
+            color (str): The stroke color.
+            width (float): The stroke width.
+        """
+        segments = np.asarray(segments, dtype=float).reshape(-1, 4)
+        if len(segments):
+            self._segment_batches.append((segments, self.__style((color, width))))
+
+    def draw_polygons(self, polygons: object, fill: str, outline: str, width: float) -> None:
+        """
+        Stores a batch of closed polygons.
+
+        Parameters:
+            polygons (object): An array of shape (n, points, 2) (or a sequence of point sequences) of the polygons.
+            fill (str): The fill color (empty for no fill).
+            outline (str): The outline color (empty for no outline).
+            width (float): The outline width.
+        """
+        style = self.__style((fill, outline, width))
+        if isinstance(polygons, np.ndarray):
+            if len(polygons):
+                self._polygon_batches.append((polygons.astype(float), style))
+            return
+
+        # Polygons of a sequence grouped by the number of vertices
+        groups = {}
+        for polygon in polygons:
+            points = np.asarray(polygon, dtype=float).reshape(-1, 2)
+            groups.setdefault(len(points), []).append(points)
+        for group in groups.values():
+            self._polygon_batches.append((np.stack(group), style))
+
+    def draw_raster(self, raster: list, x: int = 0, y: int = 0, cell_size: int = 1) -> None:
+        """
+        Stores a raster (converted to RGB values).
+
+        Parameters:
+            raster (list): A list of rows, each a list of colors (None for cells which are not drawn).
+            x (int): The x-coordinate of the top left corner of the raster. Defaults to 0.
+            y (int): The y-coordinate of the top left corner of the raster. Defaults to 0.
+            cell_size (int): The size of a cell in pixels. Defaults to 1.
+        """
+        if not raster or not raster[0]:
+            return
+
+        colors = {None: (0, 0, 0)}
+        for row in raster:
+            for color in row:
+                if color not in colors:
+                    colors[color] = color_to_rgb(color)
+        image = np.array([[colors[color] for color in row] for row in raster], dtype=np.uint8)
+        mask = np.array([[color is not None for color in row] for row in raster], dtype=bool)
+        self._rasters.append((image, mask, x, y, cell_size))
+
+    def bounds(self) -> tuple:
+        """
+        Gets the bounding box of all stored geometry.
+
+        Returns:
+            tuple: The bounding box as (x_min, y_min, x_max, y_max), or None if nothing is stored.
+        """
+        boxes = []
+        segments, _ = self.segments
+        if len(segments):
+            points = segments.reshape(-1, 2)
+            boxes.append((*points.min(axis=0), *points.max(axis=0)))
+        for polygons, _ in self._polygon_batches:
+            points = polygons.reshape(-1, 2)
+            boxes.append((*points.min(axis=0), *points.max(axis=0)))
+        for image, _, x, y, cell_size in self._rasters:
+            boxes.append((x, y, x + image.shape[1] * cell_size, y + image.shape[0] * cell_size))
+
+        if not boxes:
+            return None
+        boxes = np.array(boxes, dtype=float)
+        return (*boxes[:, :2].min(axis=0), *boxes[:, 2:].max(axis=0))
+
+    def __style(self, style: tuple) -> int:
+        """
+        Gets the id of a style, registering it on first use.
+
+        Parameters:
+            style (tuple): The style.
+
+        Returns:
+            int: The style id.
+        """
+        if style not in self._styles:
+            self._styles.append(style)
+        return self._styles.index(style)
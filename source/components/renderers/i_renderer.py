@@ -0,0 +1,48 @@
+from abc import ABC
+
+class IRenderer(ABC):
+    """
+    An abstract base class representing an output backend of the fractal drawing functions. All drawing methods
+    accept whole batches of items, so that every backend can use its fastest way of drawing them.
+    """
+
+    def draw_segments(self, segments: object, color: str, width: float) -> None:
+        """
+        Draws a batch of line segments.
+
+        Parameters:
+            segments (object): A sequence (or an array of shape (n, 4)) of segments as (x0, y0, x1, y1).
+            color (str): The stroke color.
+            width (float): The stroke width.
+        """
+        pass
+
+    def draw_polygons(self, polygons: object, fill: str, outline: str, width: float) -> None:
+        """
+        Draws a batch of closed polygons.
+
+        Parameters:
+            polygons (object): An array of shape (n, points, 2) (or a sequence of point sequences) of the polygons.
+            fill (str): The fill color (empty for no fill).
+            outline (str): The outline color (empty for no outline).
+            width (float): The outline width.
+        """
+        pass
+
+    def draw_raster(self, raster: list, x: int = 0, y: int = 0, cell_size: int = 1) -> None:
+        """
+        Draws a raster of colored square cells.
+
+        Parameters:
+            raster (list): A list of rows, each a list of colors (None for cells which are not drawn).
+            x (int): The x-coordinate of the top left corner of the raster. Defaults to 0.
+            y (int): The y-coordinate of the top left corner of the raster. Defaults to 0.
+            cell_size (int): The size of a cell in pixels. Defaults to 1.
+        """
+        pass
+
+    def close(self) -> None:
+        """
+        Finishes the output (writes pending data and releases resources).
+        """
+        pass
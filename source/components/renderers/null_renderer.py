@@ -0,0 +1,80 @@
+from .i_renderer import IRenderer
+
+class NullRenderer(IRenderer):
+    """
+    Renderer which draws nothing and only counts the submitted items, so that the cost of computing a fractal
+    can be measured separately from the cost of drawing it.
+    """
+
+    def __init__(self) -> None:
+        """
+        Initializes an instance of the NullRenderer class.
+        """
+        self._segment_count = 0
+        self._polygon_count = 0
+        self._cell_count = 0
+
+    @property
+    def segment_count(self) -> int:
+        """
+        Gets the number of submitted segments.
+
+        Returns:
+            int: The number of segments.
+        """
+        return self._segment_count
+
+    @property
+    def polygon_count(self) -> int:
+        """
+        Gets the number of submitted polygons.
+
+        Returns:
+            int: The number of polygons.
+        """
+        return self._polygon_count
+
+    @property
+    def cell_count(self) -> int:
+        """
+        Gets the number of submitted (drawn) raster cells.
+
+        Returns:
+            int: The number of cells.
+        """
+        return self._cell_count
+
+    def draw_segments(self, segments: object, color: str, width: float) -> None:
+        """
+        Counts a batch of line segments.
+
+        Parameters:
+            segments (object): A sequence (or an array of shape (n, 4)) of segments as (x0, y0, x1, y1).
+            color (str): The stroke color.
+            width (float): The stroke width.
+        """
+        self._segment_count += len(segments)
+
+    def draw_polygons(self, polygons: object, fill: str, outline: str, width: float) -> None:
+        """
+        Counts a batch of closed polygons.
+
+        Parameters:
+            polygons (object): An array of shape (n, points, 2) (or a sequence of point sequences) of the polygons.
+            fill (str): The fill color (empty for no fill).
+            outline (str): The outline color (empty for no outline).
+            width (float): The outline width.
+        """
+        self._polygon_count += len(polygons)
+
+    def draw_raster(self, raster: list, x: int = 0, y: int = 0, cell_size: int = 1) -> None:
+        """
+        Counts the drawn cells of a raster.
+
+        Parameters:
+            raster (list): A list of rows, each a list of colors (None for cells which are not drawn).
+            x (int): The x-coordinate of the top left corner of the raster. Defaults to 0.
+            y (int): The y-coordinate of the top left corner of the raster. Defaults to 0.
+            cell_size (int): The size of a cell in pixels. Defaults to 1.
+        """
+        self._cell_count += sum(len(row) - row.count(None) for row in raster)
@@ -0,0 +1,66 @@
+from .i_renderer import IRenderer
+
+class ProfilingRenderer(IRenderer):
+    """
+    Renderer forwarding all items to another renderer while counting them (the canvas items created) and timing
+    the drawing as the 'render' phase of a profiler.
+    """
+
+    def __init__(self, target: IRenderer, profiler: object) -> None:
+        """
+        Initializes an instance of the ProfilingRenderer class.
+
+        Parameters:
+            target (IRenderer): The renderer which draws the items.
+            profiler (Profiler): The profiler of the run.
+        """
+        self._target = target
+        self._profiler = profiler
+
+    def draw_segments(self, segments: object, color: str, width: float) -> None:
+        """
+        Draws a batch of line segments.
+
+        Parameters:
+            segments (object): A sequence (or an array of shape (n, 4)) of segments as (x0, y0, x1, y1).
+            color (str): The stroke color.
+            width (float): The stroke width.
+        """
+        with self._profiler.phase("render"):
+            self._target.draw_segments(segments, color, width)
+        self._profiler.count("canvas_segments", len(segments))
+
+    def draw_polygons(self, polygons: object, fill: str, outline: str, width: float) -> None:
+        """
+        Draws a batch of closed polygons.
+
+        Parameters:
+            polygons (object): An array of shape (n, points, 2) (or a sequence of point sequences) of the polygons.
+            fill (str): The fill color (empty for no fill).
+            outline (str): The outline color (empty for no outline).
+            width (float): The outline width.
+        """
+        with self._profiler.phase("render"):
+            self._target.draw_polygons(polygons, fill, outline, width)
+        self._profiler.count("canvas_polygons", len(polygons))
+
+    def draw_raster(self, raster: list, x: int = 0, y: int = 0, cell_size: int = 1) -> None:
+        """
+        Draws a raster of colored square cells.
+
+        Parameters:
+            raster (list): A list of rows, each a list of colors (None for cells which are not drawn).
+            x (int): The x-coordinate of the top left corner of the raster. Defaults to 0.
+            y (int): The y-coordinate of the top left corner of the raster. Defaults to 0.
+            cell_size (int): The size of a cell in pixels. Defaults to 1.
+        """
+        with self._profiler.phase("render"):
+            self._target.draw_raster(raster, x, y, cell_size)
+        self._profiler.count("canvas_cells", sum(color is not None for row in raster for color in row))
+
+    def close(self) -> None:
+        """
+        Finishes the output of the target renderer (timed as the 'output' phase).
+        """
+        with self._profiler.phase("output"):
+            self._target.close()
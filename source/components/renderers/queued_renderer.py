@@ -0,0 +1,186 @@
+import queue
+import threading
+import time
+
+from .i_renderer import IRenderer
+from ..cancellation import RenderCancelled
+
+
+class QueuedRenderer(IRenderer):
+    """
+    Renderer connecting a computing thread with a drawing thread (typically the Tkinter main loop).
+
+    The computing thread submits batches as usual; they are split into chunks and put into a bounded queue (so the
+    computation waits when drawing falls behind). The drawing thread periodically calls 'drain', which forwards
+    the queued chunks to the target renderer within a time budget. After 'cancel', every further submission raises
+    RenderCancelled, which stops the computation.
+    """
+
+    def __init__(self, max_chunks: int = 64, chunk_size: int = 4096) -> None:
+        """
+        Initializes an instance of the QueuedRenderer class.
+
+        Parameters:
+            max_chunks (int): The capacity of the queue (in chunks). Defaults to 64.
+            chunk_size (int): The maximum number of items (segments, polygons or raster cells) in a chunk. Defaults to 4096.
+        """
+        self._queue = queue.Queue(maxsize=max_chunks)
+        self._chunk_size = chunk_size
+        self._cancelled = threading.Event()
+        self._closed = False
+        self._finished = False
+
+    @property
+    def cancelled(self) -> bool:
+        """
+        Gets whether drawing has been cancelled.
+
+        Returns:
+            bool: True if cancelled, False otherwise.
+        """
+        return self._cancelled.is_set()
+
+    @property
+    def cancel_event(self) -> threading.Event:
+        """
+        Gets the event set by 'cancel' (passed to the computation, so that it stops without waiting for a submission).
+
+        Returns:
+            threading.Event: The event.
+        """
+        return self._cancelled
+
+    @property
+    def finished(self) -> bool:
+        """
+        Gets whether all submitted chunks have been drawn (or drawing has been cancelled).
+
+        Returns:
+            bool: True if finished, False otherwise.
+        """
+        return self._finished
+
+    def draw_segments(self, segments: object, color: str, width: float) -> None:
+        """
+        Queues a batch of line segments.
+
+        Parameters:
+            segments (object): A sequence (or an array of shape (n, 4)) of segments as (x0, y0, x1, y1).
+            color (str): The stroke color.
+            width (float): The stroke width.
+
+        Raises:
+            RenderCancelled: If drawing has been cancelled.
+        """
+        for start in range(0, len(segments), self._chunk_size):
+            self.__put(("segments", segments[start:start + self._chunk_size], color, width))
+
+    def draw_polygons(self, polygons: object, fill: str, outline: str, width: float) -> None:
+        """
+        Queues a batch of closed polygons.
+
+        Parameters:
+            polygons (object): An array of shape (n, points, 2) (or a sequence of point sequences) of the polygons.
+            fill (str): The fill color (empty for no fill).
+            outline (str): The outline color (empty for no outline).
+            width (float): The outline width.
+
+        Raises:
+            RenderCancelled: If drawing has been cancelled.
+        """
+        for start in range(0, len(polygons), self._chunk_size):
+            self.__put(("polygons", polygons[start:start + self._chunk_size], fill, outline, width))
+
+    def draw_raster(self, raster: list, x: int = 0, y: int = 0, cell_size: int = 1) -> None:
+        """
+        Queues a raster (split into strips of rows).
+
+        Parameters:
+            raster (list): A list of rows, each a list of colors (None for cells which are not drawn).
+            x (int): The x-coordinate of the top left corner of the raster. Defaults to 0.
+            y (int): The y-coordinate of the top left corner of the raster. Defaults to 0.
+            cell_size (int): The size of a cell in pixels. Defaults to 1.
+
+        Raises:
+            RenderCancelled: If drawing has been cancelled.
+        """
+        if not raster:
+            return
+
+        rows = max(1, self._chunk_size // max(1, len(raster[0])))
+        for start in range(0, len(raster), rows):
+            self.__put(("raster", raster[start:start + rows], x, y + start * cell_size, cell_size))
+
+    def close(self) -> None:
+        """
+        Marks the end of the submitted batches.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            self.__put(None)
+        except RenderCancelled:
+            pass
+
+    def cancel(self) -> None:
+        """
+        Cancels drawing. Queued chunks are discarded and the computing thread is stopped at its next submission.
+        """
+        self._cancelled.set()
+        self._finished = True
+        while True:
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                break
+
+    def drain(self, target: IRenderer, time_budget: float = 0.01) -> bool:
+        """
+        Draws queued chunks with a target renderer until the queue is empty or the time budget is spent.
+        Must be called from the drawing thread.
+
+        Parameters:
+            target (IRenderer): The renderer the chunks are drawn with.
+            time_budget (float): The maximum time spent drawing (in seconds). Defaults to 0.01.
+
+        Returns:
+            bool: True if more chunks are expected, False if drawing has finished.
+        """
+        deadline = time.perf_counter() + time_budget
+        while not self._finished and time.perf_counter() < deadline:
+            try:
+                chunk = self._queue.get_nowait()
+            except queue.Empty:
+                break
+
+            if chunk is None:
+                self._finished = True
+                target.close()
+            elif chunk[0] == "segments":
+                target.draw_segments(*chunk[1:])
+            elif chunk[0] == "polygons":
+                target.draw_polygons(*chunk[1:])
+            else:
+                target.draw_raster(*chunk[1:])
+
+        return not self._finished
+
+    def __put(self, chunk: tuple) -> None:
+        """
+        Puts a chunk into the queue, waiting while it is full.
+
+        Parameters:
+            chunk (tuple): The chunk (None marks the end).
+
+        Raises:
+            RenderCancelled: If drawing has been cancelled.
+        """
+        while True:
+            if self._cancelled.is_set():
+                raise RenderCancelled()
+            try:
+                self._queue.put(chunk, timeout=0.05)
+                return
+            except queue.Full:
+                pass
@@ -0,0 +1,214 @@
+import math
+import numpy as np
+
+from .i_renderer import IRenderer
+from ..color import color_to_rgb
+from ..png_writer import PngWriter
+
+class RasterRenderer(IRenderer):
+    """
+    Renderer drawing into an RGB pixel buffer (a NumPy array), which is written as a PNG file when closed.
+    Segments are rasterised in batches (sampled at pixel spacing and stamped with a disc of the stroke width),
+    polygons are filled by an even-odd test of the pixel centers within their bounding box.
+    """
+
+    def __init__(self, path: str, width: int, height: int, background: str = "white", batch_size: int = 65536) -> None:
+        """
+        Initializes an instance of the RasterRenderer class.
+
+        Parameters:
+            path (str): The path of the output PNG file (None to keep the image in memory only).
+            width (int): The width of the image.
+            height (int): The height of the image.
+            background (str): The background color. Defaults to "white".
+            batch_size (int): The maximum number of segments rasterised at once. Defaults to 65536.
+        """
+        self._path = path
+        self._image = np.empty((height, width, 3), dtype=np.uint8)
+        self._image[:] = color_to_rgb(background)
+        self._batch_size = batch_size
+
+    @property
+    def image(self) -> np.ndarray:
+        """
+        Gets the pixel buffer.
+
+        Returns:
+            np.ndarray: An array of shape (height, width, 3) of 8-bit RGB values.
+        """
+        return self._image
+
+    def draw_segments(self, segments: object, color: str, width: float) -> None:
+        """
+        Draws a batch of line segments.
+
+        Parameters:
+            segments (object): A sequence (or an array of shape (n, 4)) of segments as (x0, y0, x1, y1).
+            color (str): The stroke color.
+            width (float): The stroke width.
+        """
+        segments = np.asarray(segments, dtype=float).reshape(-1, 4)
+        rgb = color_to_rgb(color)
+        for start in range(0, len(segments), self._batch_size):
+            self.__stroke(segments[start:start + self._batch_size], rgb, width)
+
+    def draw_polygons(self, polygons: object, fill: str, outline: str, width: float) -> None:
+        """
+        Draws a batch of closed polygons.
+
+        Parameters:
+            polygons (object): An array of shape (n, points, 2) (or a sequence of point sequences) of the polygons.
+            fill (str): The fill color (empty for no fill).
+            outline (str): The outline color (empty for no outline).
+            width (float): The outline width.
+        """
+        if fill:
+            rgb = color_to_rgb(fill)
+            for polygon in polygons:
+                self.__fill(np.asarray(polygon, dtype=float).reshape(-1, 2), rgb)
+
+        if outline:
+            edges = []
+            for polygon in polygons:
+                points = np.asarray(polygon, dtype=float).reshape(-1, 2)
+                edges.append(np.hstack((points, np.roll(points, -1, axis=0))))
+            if edges:
+                self.draw_segments(np.concatenate(edges), outline, width)
+
+    def draw_raster(self, raster: list, x: int = 0, y: int = 0, cell_size: int = 1) -> None:
+        """
+        Draws a raster of colored square cells.
+
+        Parameters:
+            raster (list): A list of rows, each a list of colors (None for cells which are not drawn).
+            x (int): The x-coordinate of the top left corner of the raster. Defaults to 0.
+            y (int): The y-coordinate of the top left corner of the raster. Defaults to 0.
+            cell_size (int): The size of a cell in pixels. Defaults to 1.
+        """
+        if not raster or not raster[0]:
+            return
+
+        # Colors converted once per distinct value (index 0 stands for undrawn cells)
+        palette, indexes = {None: 0}, []
+        for row in raster:
+            indexes.append([palette.setdefault(color, len(palette)) for color in row])
+        colors = np.zeros((len(palette), 3), dtype=np.uint8)
+        for color, index in palette.items():
+            if color is not None:
+                colors[index] = color_to_rgb(color)
+
+        cell_size = int(cell_size)
+        indexes = np.asarray(indexes).repeat(cell_size, axis=0).repeat(cell_size, axis=1)
+
+        # Clip to the image
+        height, width = self._image.shape[:2]
+        top, left = max(0, -y), max(0, -x)
+        bottom, right = min(len(indexes), height - y), min(indexes.shape[1], width - x)
+        if top >= bottom or left >= right:
+            return
+
+        indexes = indexes[top:bottom, left:right]
+        target = self._image[y + top:y + bottom, x + left:x + right]
+        drawn = indexes > 0
+        target[drawn] = colors[indexes[drawn]]
+
+    def close(self) -> None:
+        """
+        Writes the image as a PNG file (row by row).
+        """
+        if self._path is None:
+            return
+
+        height, width = self._image.shape[:2]
+        with PngWriter(self._path, width, height) as writer:
+            for start in range(0, height, 64):
+                writer.write_rows(self._image[start:start + 64])
+
+    def __stroke(self, segments: np.ndarray, rgb: tuple, width: float) -> None:
+        """
+        Rasterises a batch of segments.
+
+        Parameters:
+            segments (np.ndarray): An array of shape (n, 4) of the segments.
+            rgb (tuple): The stroke color.
+            width (float): The stroke width.
+        """
+        if len(segments) == 0:
+            return
+
+        # Sample every segment at (at most) pixel spacing
+        deltas = segments[:, 2:] - segments[:, :2]
+        counts = np.ceil(np.abs(deltas).max(axis=1)).astype(int) + 1
+        owners = np.repeat(np.arange(len(segments)), counts)
+        offsets = np.arange(len(owners)) - np.repeat(np.cumsum(counts) - counts, counts)
+        t = offsets / np.maximum(counts - 1, 1)[owners]
+        points = np.rint(segments[owners, :2] + deltas[owners] * t[:, np.newaxis]).astype(int)
+
+        # Stamp a disc of the stroke width
+        radius = max(width, 1) / 2
+        reach = int(math.ceil(radius - 0.5))
+        grid = np.arange(-reach, reach + 1)
+        dx, dy = np.meshgrid(grid, grid)
+        disc = (dx ** 2 + dy ** 2 <= radius ** 2) | ((dx == 0) & (dy == 0))
+        stamp = np.stack((dx[disc], dy[disc]), axis=1)
+
+        # Points deduplicated through a mask of the image (extended by the stamp reach)
+        height, width = self._image.shape[:2]
+        inside = (
+            (points[:, 0] >= -reach) & (points[:, 0] < width + reach) &
+            (points[:, 1] >= -reach) & (points[:, 1] < height + reach)
+        )
+        points = points[inside] + reach
+        mask = np.zeros((height + 2 * reach, width + 2 * reach), dtype=bool)
+        mask[points[:, 1], points[:, 0]] = True
+        points = np.argwhere(mask)[:, ::-1] - reach
+
+        self.__plot(points, stamp, rgb)
+
+    def __plot(self, points: np.ndarray, stamp: np.ndarray, rgb: tuple) -> None:
+        """
+        Colors the pixels of a stamp placed at every given point.
+
+        Parameters:
+            points (np.ndarray): An array of shape (n, 2) of integer points.
+            stamp (np.ndarray): An array of shape (m, 2) of integer offsets.
+            rgb (tuple): The color.
+        """
+        pixels = (points[:, np.newaxis, :] + stamp[np.newaxis]).reshape(-1, 2)
+        height, width = self._image.shape[:2]
+        inside = (pixels[:, 0] >= 0) & (pixels[:, 0] < width) & (pixels[:, 1] >= 0) & (pixels[:, 1] < height)
+        pixels = pixels[inside]
+        self._image[pixels[:, 1], pixels[:, 0]] = rgb
+
+    def __fill(self, polygon: np.ndarray, rgb: tuple) -> None:
+        """
+        Fills a polygon (even-odd rule, pixel centers).
+
+        Parameters:
+            polygon (np.ndarray): An array of shape (points, 2) of the vertices.
+            rgb (tuple): The fill color.
+        """
+        height, width = self._image.shape[:2]
+        x_min, y_min = np.floor(polygon.min(axis=0)).astype(int)
+        x_max, y_max = np.ceil(polygon.max(axis=0)).astype(int)
+        x_min, y_min = max(x_min, 0), max(y_min, 0)
+        x_max, y_max = min(x_max, width - 1), min(y_max, height - 1)
+        if x_min > x_max or y_min > y_max:
+            return
+
+        xs, ys = np.meshgrid(np.arange(x_min, x_max + 1) + 0.5, np.arange(y_min, y_max + 1) + 0.5)
+        inside = np.zeros(xs.shape, dtype=bool)
+        for (x0, y0), (x1, y1) in zip(polygon, np.roll(polygon, -1, axis=0)):
+            if y0 == y1:
+                continue
+            crosses = (y0 > ys) != (y1 > ys)
+            inside ^= crosses & (xs < x0 + (ys - y0) * (x1 - x0) / (y1 - y0))
+
+        if not inside.any():
+            # Polygon smaller than a pixel, the pixel containing its centroid is colored
+            cx, cy = polygon.mean(axis=0).astype(int)
+            if 0 <= cx < width and 0 <= cy < height:
+                self._image[cy, cx] = rgb
+            return
+
+        self._image[y_min:y_max + 1, x_min:x_max + 1][inside] = rgb
@@ -0,0 +1,87 @@
+from .i_renderer import IRenderer
+from ..svg_writer import SvgWriter
+
+class SvgRenderer(IRenderer):
+    """
+    Renderer streaming the output straight into an SVG file (see SvgWriter).
+    """
+
+    def __init__(self, path: str, width: int, height: int, precision: int = 2) -> None:
+        """
+        Initializes an instance of the SvgRenderer class.
+
+        Parameters:
+            path (str): The path of the output file.
+            width (int): The width of the picture.
+            height (int): The height of the picture.
+            precision (int): The number of decimal places of the coordinates. Defaults to 2.
+        """
+        self._writer = SvgWriter(path, width, height, precision)
+
+    @property
+    def writer(self) -> SvgWriter:
+        """
+        Gets the underlying SVG writer.
+
+        Returns:
+            SvgWriter: The writer.
+        """
+        return self._writer
+
+    def draw_segments(self, segments: object, color: str, width: float) -> None:
+        """
+        Draws a batch of line segments (connected segments are merged into paths by the writer).
+
+        Parameters:
+            segments (object): A sequence (or an array of shape (n, 4)) of segments as (x0, y0, x1, y1).
+            color (str): The stroke color.
+            width (float): The stroke width.
+        """
+        if hasattr(segments, "tolist"):
+            segments = segments.tolist()
+        for x0, y0, x1, y1 in segments:
+            self._writer.create_line(x0, y0, x1, y1, fill=color, width=width)
+
+    def draw_polygons(self, polygons: object, fill: str, outline: str, width: float) -> None:
+        """
+        Draws a batch of closed polygons.
+
+        Parameters:
+            polygons (object): An array of shape (n, points, 2) (or a sequence of point sequences) of the polygons.
+            fill (str): The fill color (empty for no fill).
+            outline (str): The outline color (empty for no outline).
+            width (float): The outline width.
+        """
+        if hasattr(polygons, "tolist"):
+            polygons = polygons.tolist()
+        for polygon in polygons:
+            coords = [coordinate for point in polygon for coordinate in point]
+            self._writer.create_polygon(*coords, fill=fill, outline=outline, width=width)
+
+    def draw_raster(self, raster: list, x: int = 0, y: int = 0, cell_size: int = 1) -> None:
+        """
+        Draws a raster of colored square cells as rectangles (runs of equal colors within a row as one rectangle).
+
+        Parameters:
+            raster (list): A list of rows, each a list of colors (None for cells which are not drawn).
+            x (int): The x-coordinate of the top left corner of the raster. Defaults to 0.
+            y (int): The y-coordinate of the top left corner of the raster. Defaults to 0.
+            cell_size (int): The size of a cell in pixels. Defaults to 1.
+        """
+        for row_index, row in enumerate(raster):
+            top = y + row_index * cell_size
+            column = 0
+            while column < len(row):
+                color = row[column]
+                end = column + 1
+                while end < len(row) and row[end] == color:
+                    end += 1
+                if color is not None:
+                    self._writer.create_rectangle(x + column * cell_size, top, x + end * cell_size, top + cell_size, fill=color)
+                column = end
+
+    def close(self) -> None:
+        """
+        Writes all pending items and closes the file.
+        """
+        self._writer.close()
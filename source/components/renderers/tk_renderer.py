@@ -0,0 +1,101 @@
+import tkinter as tk
+
+from .i_renderer import IRenderer
+
+class TkRenderer(IRenderer):
+    """
+    Renderer drawing onto a Tkinter canvas. Connected segments are drawn as a single polyline item and rasters
+    as images, which keeps the number of canvas items low.
+    """
+
+    def __init__(self, canvas: tk.Canvas) -> None:
+        """
+        Initializes an instance of the TkRenderer class.
+
+        Parameters:
+            canvas (tk.Canvas): The canvas to draw onto.
+        """
+        self._canvas = canvas
+        self._images = []
+
+    @property
+    def canvas(self) -> tk.Canvas:
+        """
+        Gets the canvas the renderer draws onto.
+
+        Returns:
+            tk.Canvas: The canvas.
+        """
+        return self._canvas
+
+    def draw_segments(self, segments: object, color: str, width: float) -> None:
+        """
+        Draws a batch of line segments (runs of connected segments as polylines).
+
+        Parameters:
+            segments (object): A sequence (or an array of shape (n, 4)) of segments as (x0, y0, x1, y1).
+            color (str): The stroke color.
+            width (float): The stroke width.
+        """
+        if hasattr(segments, "tolist"):
+            segments = segments.tolist()
+        polyline = []
+        for x0, y0, x1, y1 in segments:
+            if polyline and (x0, y0) != (polyline[-2], polyline[-1]):
+                self._canvas.create_line(*polyline, fill=color, width=width)
+                polyline = []
+            if not polyline:
+                polyline = [x0, y0]
+            polyline += [x1, y1]
+
+        if polyline:
+            self._canvas.create_line(*polyline, fill=color, width=width)
+
+    def draw_polygons(self, polygons: object, fill: str, outline: str, width: float) -> None:
+        """
+        Draws a batch of closed polygons.
+
+        Parameters:
+            polygons (object): An array of shape (n, points, 2) (or a sequence of point sequences) of the polygons.
+            fill (str): The fill color (empty for no fill).
+            outline (str): The outline color (empty for no outline).
+            width (float): The outline width.
+        """
+        if hasattr(polygons, "tolist"):
+            polygons = polygons.tolist()
+        for polygon in polygons:
+            coords = [coordinate for point in polygon for coordinate in point]
+            self._canvas.create_polygon(*coords, fill=fill, outline=outline, width=width)
+
+    def draw_raster(self, raster: list, x: int = 0, y: int = 0, cell_size: int = 1) -> None:
+        """
+        Draws a raster of colored square cells as an image (runs of undrawn cells stay transparent).
+
+        Parameters:
+            raster (list): A list of rows, each a list of colors (None for cells which are not drawn).
+            x (int): The x-coordinate of the top left corner of the raster. Defaults to 0.
+            y (int): The y-coordinate of the top left corner of the raster. Defaults to 0.
+            cell_size (int): The size of a cell in pixels. Defaults to 1.
+        """
+        if not raster or not raster[0]:
+            return
+
+        image = tk.PhotoImage(width=len(raster[0]), height=len(raster))
+        for row_index, row in enumerate(raster):
+            column = 0
+            while column < len(row):
+                if row[column] is None:
+                    column += 1
+                    continue
+                end = column
+                while end < len(row) and row[end] is not None:
+                    end += 1
+                image.put("{" + " ".join(row[column:end]) + "}", to=(column, row_index))
+                column = end
+
+        if cell_size != 1:
+            image = image.zoom(int(cell_size))
+
+        self._canvas.create_image(x, y, image=image, anchor="nw")
+        # Tkinter does not keep a reference to the image
+        self._images.append(image)
@@ -0,0 +1,110 @@
+import numpy as np
+
+
+class GridIndex:
+    """
+    Uniform grid spatial index over axis-aligned bounding boxes.
+
+    Every box is registered in all grid cells it overlaps. The registrations are stored sorted by cell, so the items of
+    a whole row of cells form a single contiguous slice and a query costs one slice per row of the queried range.
+    Boxes overlapping too many cells are kept aside and tested directly on every query.
+    """
+
+    def __init__(self, boxes: np.ndarray, cell_size: float = None, max_cells: int = 64) -> None:
+        """
+        Initializes an instance of the GridIndex class.
+
+        Parameters:
+            boxes (np.ndarray): An array of shape (n, 4) of the boxes as (x_min, y_min, x_max, y_max).
+            cell_size (float): The size of a grid cell. Defaults to twice the average box size (at least 1/256
+                of the extent).
+            max_cells (int): The maximum number of cells a box is registered in. Defaults to 64.
+        """
+        self._boxes = np.asarray(boxes, dtype=float).reshape(-1, 4)
+        count = len(self._boxes)
+
+        if count == 0:
+            self._origin, self._cell_size, self._shape = np.zeros(2), 1.0, (1, 1)
+            self._starts = np.zeros(2, dtype=int)
+            self._items = np.empty(0, dtype=int)
+            self._large = np.empty(0, dtype=int)
+            return
+
+        self._origin = self._boxes[:, :2].min(axis=0)
+        extent = max(float((self._boxes[:, 2:].max(axis=0) - self._origin).max()), 1e-12)
+        if cell_size is None:
+            average = float(np.mean(np.maximum(self._boxes[:, 2] - self._boxes[:, 0], self._boxes[:, 3] - self._boxes[:, 1])))
+            cell_size = max(2 * average, extent / 256)
+        self._cell_size = cell_size
+
+        columns = int(extent // cell_size) + 1
+        self._shape = (columns, columns)
+
+        # Cell ranges of all boxes
+        low = self.__cells(self._boxes[:, :2])
+        high = self.__cells(self._boxes[:, 2:])
+        widths = high[:, 0] - low[:, 0] + 1
+        counts = widths * (high[:, 1] - low[:, 1] + 1)
+
+        large = counts > max_cells
+        self._large = np.nonzero(large)[0]
+        counts = np.where(large, 0, counts)
+
+        # Registrations (cell, item), sorted by cell
+        owners = np.repeat(np.arange(count), counts)
+        local = np.arange(len(owners)) - np.repeat(np.cumsum(counts) - counts, counts)
+        cells_x = low[owners, 0] + local % widths[owners]
+        cells_y = low[owners, 1] + local // widths[owners]
+        keys = cells_y * columns + cells_x
+
+        order = np.argsort(keys, kind="stable")
+        self._items = owners[order]
+        self._starts = np.searchsorted(keys[order], np.arange(columns * columns + 1))
+
+    def __len__(self) -> int:
+        return len(self._boxes)
+
+    def query(self, rectangle: tuple) -> np.ndarray:
+        """
+        Finds the boxes intersecting a rectangle.
+
+        Parameters:
+            rectangle (tuple): The rectangle as (x_min, y_min, x_max, y_max).
+
+        Returns:
+            np.ndarray: The ascending indexes of the intersecting boxes.
+        """
+        if len(self._boxes) == 0:
+            return np.empty(0, dtype=int)
+
+        x_min, y_min, x_max, y_max = rectangle
+        low = self.__cells(np.array([[x_min, y_min]]))[0]
+        high = self.__cells(np.array([[x_max, y_max]]))[0]
+        columns = self._shape[0]
+
+        if (high[0] - low[0] + 1) * (high[1] - low[1] + 1) * 4 > columns * columns:
+            # Most of the grid is queried, the boxes are tested directly
+            candidates = np.arange(len(self._boxes))
+        else:
+            slices = [
+                self._items[self._starts[row * columns + low[0]]:self._starts[row * columns + high[0] + 1]]
+                for row in range(low[1], high[1] + 1)
+            ]
+            candidates = np.unique(np.concatenate(slices + [self._large]))
+
+        boxes = self._boxes[candidates]
+        hit = (boxes[:, 2] >= x_min) & (boxes[:, 0] <= x_max) & (boxes[:, 3] >= y_min) & (boxes[:, 1] <= y_max)
+        return candidates[hit]
+
+    def __cells(self, points: np.ndarray) -> np.ndarray:
+        """
+        Finds the grid cells of points (clamped to the grid).
+
+        Parameters:
+            points (np.ndarray): An array of shape (n, 2) of the points.
+
+        Returns:
+            np.ndarray: An array of shape (n, 2) of the cell coordinates.
+        """
+        cells = np.floor((points - self._origin) / self._cell_size).astype(int)
+        return np.clip(cells, 0, self._shape[0] - 1)
@@ -0,0 +1,284 @@
+from xml.sax.saxutils import quoteattr
+
+
+class SvgWriter:
+    """
+    Streaming SVG writer with a subset of the drawing interface of a Tkinter canvas ('create_line', 'create_polygon'
+    and 'create_rectangle'), so that fractals can be written straight to a file without a display.
+
+    Items are written as soon as possible, so the memory use does not depend on the number of items. Consecutive items
+    of the same style share a single group, connected lines are merged into paths with relative coordinates and runs
+    of adjacent rectangles of the same color are merged into a single rectangle.
+    """
+
+    def __init__(self, path: str, width: int, height: int, precision: int = 2, buffer_size: int = 1 << 16) -> None:
+        """
+        Initializes an instance of the SvgWriter class and writes the SVG header.
+
+        Parameters:
+            path (str): The path of the output file.
+            width (int): The width of the picture.
+            height (int): The height of the picture.
+            precision (int): The number of decimal places of the coordinates. Defaults to 2.
+            buffer_size (int): The size of the file buffer in bytes. Defaults to 65536.
+        """
+        if precision < 0:
+            raise ValueError("SVG error: precision must be non-negative.")
+
+        self._file = open(path, "w", buffering=buffer_size)
+        self._precision = precision
+        self._scale = 10 ** precision
+        self._item_count = 0
+
+        # Currently open group, path and pending rectangle
+        self._style = None
+        self._pen = None
+        self._command = None
+        self._rectangle = None
+
+        self._file.write(
+            '<?xml version="1.0" encoding="UTF-8"?>\n'
+            f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" viewBox="0 0 {width} {height}">\n'
+        )
+
+    @property
+    def item_count(self) -> int:
+        """
+        Gets the number of items drawn so far.
+
+        Returns:
+            int: The number of items.
+        """
+        return self._item_count
+
+    @property
+    def precision(self) -> int:
+        """
+        Gets the number of decimal places of the coordinates.
+
+        Returns:
+            int: The number of decimal places.
+        """
+        return self._precision
+
+    def create_line(self, *coords: float, fill: str = "black", width: float = 1) -> int:
+        """
+        Draws a polyline. Lines starting where the previous line ended continue the same path.
+
+        Parameters:
+            *coords (float): The coordinates of the points (x0, y0, x1, y1, ...).
+            fill (str): The stroke color. Defaults to "black".
+            width (float): The stroke width. Defaults to 1.
+
+        Returns:
+            int: The identifier of the item.
+        """
+        points = self.__quantize(coords)
+        self.__set_style(("line", fill, width), f'fill="none" stroke={quoteattr(fill)} stroke-width="{width}" stroke-linecap="round" stroke-linejoin="round"')
+
+        if self._pen is None:
+            self._file.write(f'<path d="M{self.__pair(points[0])}')
+        elif points[0] != self._pen:
+            self.__command("m", points[0][0] - self._pen[0], points[0][1] - self._pen[1])
+        self._pen = points[0]
+
+        for point in points[1:]:
+            self.__command("l", point[0] - self._pen[0], point[1] - self._pen[1])
+            self._pen = point
+
+        return self.__next_id()
+
+    def create_polygon(self, *coords: float, fill: str = "black", outline: str = "", width: float = 1) -> int:
+        """
+        Draws a closed polygon.
+
+        Parameters:
+            *coords (float): The coordinates of the vertices (x0, y0, x1, y1, ...).
+            fill (str): The fill color (empty for no fill). Defaults to "black".
+            outline (str): The outline color (empty for no outline). Defaults to "".
+            width (float): The outline width. Defaults to 1.
+
+        Returns:
+            int: The identifier of the item.
+        """
+        points = self.__quantize(coords)
+        attributes = f'fill={quoteattr(fill or "none")}'
+        if outline:
+            attributes += f' stroke={quoteattr(outline)} stroke-width="{width}" stroke-linejoin="round"'
+        self.__set_style(("polygon", fill, outline, width), attributes)
+
+        self._file.write(f'<path d="M{self.__pair(points[0])}')
+        self._command = None
+        pen = points[0]
+        for point in points[1:]:
+            self.__command("l", point[0] - pen[0], point[1] - pen[1])
+            pen = point
+        self._file.write('z"/>\n')
+
+        return self.__next_id()
+
+    def create_rectangle(self, x1: float, y1: float, x2: float, y2: float, fill: str = "", outline: str = "") -> int:
+        """
+        Draws an axis-aligned rectangle. A rectangle of the same color adjacent to (or overlapping) the previous one
+        along a whole side extends it.
+
+        Parameters:
+            x1 (float): The x-coordinate of the first corner.
+            y1 (float): The y-coordinate of the first corner.
+            x2 (float): The x-coordinate of the opposite corner.
+            y2 (float): The y-coordinate of the opposite corner.
+            fill (str): The fill color (empty for no fill). Defaults to "".
+            outline (str): The outline color (empty for no outline). Defaults to "".
+
+        Returns:
+            int: The identifier of the item.
+        """
+        (x1, y1), (x2, y2) = self.__quantize((min(x1, x2), min(y1, y2), max(x1, x2), max(y1, y2)))
+        self.__set_style(("rectangle",), 'shape-rendering="crispEdges"')
+
+        pending = self._rectangle
+        if pending is not None and pending[4:] == (fill, outline):
+            px1, py1, px2, py2 = pending[:4]
+            if (py1, py2) == (y1, y2) and px1 <= x1 <= px2:
+                self._rectangle = (px1, py1, max(px2, x2), py2, fill, outline)
+                return self.__next_id()
+            if (px1, px2) == (x1, x2) and py1 <= y1 <= py2:
+                self._rectangle = (px1, py1, px2, max(py2, y2), fill, outline)
+                return self.__next_id()
+
+        self.__flush_rectangle()
+        self._rectangle = (x1, y1, x2, y2, fill, outline)
+        return self.__next_id()
+
+    def close(self) -> None:
+        """
+        Writes all pending items and the SVG footer and closes the file.
+        """
+        if self._file.closed:
+            return
+        self.__set_style(None, None)
+        self._file.write("</svg>\n")
+        self._file.close()
+
+    def __enter__(self) -> "SvgWriter":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def __set_style(self, style: tuple, attributes: str) -> None:
+        """
+        Closes the open path and group if the style changes and opens a new group.
+
+        Parameters:
+            style (tuple): The key of the new style (None to close the group only).
+            attributes (str): The attributes of the new group.
+        """
+        if style == self._style:
+            return
+
+        self.__end_path()
+        self.__flush_rectangle()
+        if self._style is not None:
+            self._file.write("</g>\n")
+        if style is not None:
+            self._file.write(f"<g {attributes}>\n")
+        self._style = style
+
+    def __end_path(self) -> None:
+        """
+        Closes the open path of lines.
+        """
+        if self._pen is not None:
+            self._file.write('"/>\n')
+            self._pen = None
+            self._command = None
+
+    def __flush_rectangle(self) -> None:
+        """
+        Writes the pending rectangle.
+        """
+        if self._rectangle is None:
+            return
+
+        x1, y1, x2, y2, fill, outline = self._rectangle
+        self._file.write(
+            f'<rect x="{self.__format(x1)}" y="{self.__format(y1)}" width="{self.__format(x2 - x1)}" height="{self.__format(y2 - y1)}" '
+            f'fill={quoteattr(fill or "none")}' + (f' stroke={quoteattr(outline)}' if outline else "") + "/>\n"
+        )
+        self._rectangle = None
+
+    def __command(self, command: str, dx: int, dy: int) -> None:
+        """
+        Writes a relative path command (the command letter is omitted when it repeats).
+
+        Parameters:
+            command (str): The command letter.
+            dx (int): The relative x-coordinate (in units of the precision).
+            dy (int): The relative y-coordinate (in units of the precision).
+        """
+        pair = self.__pair((dx, dy))
+        if command != self._command:
+            self._file.write(command + pair)
+            self._command = command
+        else:
+            self._file.write(pair if pair[0] == "-" else " " + pair)
+
+    def __pair(self, point: tuple) -> str:
+        """
+        Formats a pair of coordinates.
+
+        Parameters:
+            point (tuple): The coordinates (in units of the precision).
+
+        Returns:
+            str: The formatted pair.
+        """
+        y = self.__format(point[1])
+        return self.__format(point[0]) + (y if y[0] == "-" else " " + y)
+
+    def __format(self, value: int) -> str:
+        """
+        Formats a coordinate as a shortest decimal number.
+
+        Parameters:
+            value (int): The coordinate (in units of the precision).
+
+        Returns:
+            str: The formatted coordinate.
+        """
+        if self._precision == 0:
+            return str(value)
+
+        whole, fraction = divmod(abs(value), self._scale)
+        text = str(whole) if whole or not fraction else ""
+        if fraction:
+            text += "." + str(fraction).rjust(self._precision, "0").rstrip("0")
+        return "-" + text if value < 0 else text
+
+    def __quantize(self, coords: tuple) -> list:
+        """
+        Rounds coordinates to integer units of the precision.
+
+        Parameters:
+            coords (tuple): The coordinates (x0, y0, x1, y1, ...).
+
+        Returns:
+            list: A list of points as pairs of integers.
+        """
+        if len(coords) < 2 or len(coords) % 2:
+            raise ValueError("SVG error: coordinates must be given in pairs.")
+
+        scale = self._scale
+        values = [round(value * scale) for value in coords]
+        return list(zip(values[::2], values[1::2]))
+
+    def __next_id(self) -> int:
+        """
+        Returns a new item identifier.
+
+        Returns:
+            int: The identifier.
+        """
+        self._item_count += 1
+        return self._item_count
@@ -0,0 +1,100 @@
+import os
+from collections import OrderedDict
+
+
+class TileCache:
+    """
+    Two-level cache of encoded tiles: a bounded in-memory LRU in front of a directory of tile files.
+
+    Tiles are identified by (z, x, y) and stored on disk as '<directory>/<z>/<x>/<y>.png'. The memory level only
+    holds the most recently used tiles; the disk level is unbounded.
+    """
+
+    def __init__(self, directory: str, max_tiles: int = 1024) -> None:
+        """
+        Initializes an instance of the TileCache class.
+
+        Parameters:
+            directory (str): The directory of the tile files (created if it does not exist).
+            max_tiles (int): The maximum number of tiles kept in memory. Defaults to 1024.
+        """
+        if max_tiles < 0:
+            raise ValueError("Cache error: the number of tiles kept in memory must not be negative.")
+
+        os.makedirs(directory, exist_ok=True)
+        self._directory = directory
+        self._max_tiles = max_tiles
+        self._tiles = OrderedDict()
+
+    @property
+    def directory(self) -> str:
+        """
+        Gets the directory of the tile files.
+
+        Returns:
+            str: The directory.
+        """
+        return self._directory
+
+    def __len__(self) -> int:
+        return len(self._tiles)
+
+    def path(self, key: tuple) -> str:
+        """
+        Gets the path of the file of a tile.
+
+        Parameters:
+            key (tuple): The tile as (z, x, y).
+
+        Returns:
+            str: The path of the tile file.
+        """
+        z, x, y = key
+        return os.path.join(self._directory, str(z), str(x), f"{y}.png")
+
+    def get(self, key: tuple) -> bytes:
+        """
+        Gets a tile from memory, marking it as recently used.
+
+        Parameters:
+            key (tuple): The tile as (z, x, y).
+
+        Returns:
+            bytes: The encoded tile, or None if it is not in memory.
+        """
+        data = self._tiles.get(key)
+        if data is not None:
+            self._tiles.move_to_end(key)
+        return data
+
+    def put(self, key: tuple, data: bytes) -> None:
+        """
+        Puts a tile into memory, evicting the least recently used tiles over the limit.
+
+        Parameters:
+            key (tuple): The tile as (z, x, y).
+            data (bytes): The encoded tile.
+        """
+        if self._max_tiles == 0:
+            return
+
+        self._tiles[key] = data
+        self._tiles.move_to_end(key)
+        while len(self._tiles) > self._max_tiles:
+            self._tiles.popitem(last=False)
+
+    def load(self, key: tuple) -> bytes:
+        """
+        Reads a tile from disk.
+
+        Parameters:
+            key (tuple): The tile as (z, x, y).
+
+        Returns:
+            bytes: The encoded tile, or None if it is not stored.
+        """
+        try:
+            with open(self.path(key), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
@@ -1,11 +1,21 @@
-from components.vector import Vector
-from components.event import Event
+from components.vector import Vector, transform_points
+from components.event import Event, BatchedEvent
 
 import math
 
+# Lattice coordinates of every heading for rotation angles dividing 360 degrees into
+# 1, 2, 3, 4 or 6 parts. The lattice basis is formed by headings 0 and 1.
+LATTICE_DIRECTIONS = {
+    1: [(1, 0)],
+    2: [(1, 0), (-1, 0)],
+    3: [(1, 0), (0, 1), (-1, -1)],
+    4: [(1, 0), (0, 1), (-1, 0), (0, -1)],
+    6: [(1, 0), (0, 1), (-1, 1), (-1, 0), (0, -1), (1, -1)]
+}
+
 class Turtle:
     """Turtle 2D graphics."""
-    def __init__(self, step: float, position: Vector = Vector(0, 0), angle: float = 0) -> None:
+    def __init__(self, step: float, position: Vector = Vector(0, 0), angle: float = 0, angle_step: float = None, lattice: bool = False) -> None:
         """
         Initializes a new instance of the Turtle class.
         
@@ -13,17 +23,44 @@ class Turtle:
             step (float): The length of each step the turtle takes.
             position (Vector): The starting position of the turtle. Defaults to Vector(0, 0).
             angle (float): The initial direction of the turtle in degrees. Defaults to 0.
+            angle_step (float): The elementary rotation angle in degrees. If given, the heading is tracked as an integer
+                multiple of this angle and directions are looked up in a precomputed table. Defaults to None.
+            lattice (bool): Track positions as exact integer lattice coordinates, if 'angle_step' divides 360 degrees
+                into 1, 2, 3, 4 or 6 parts. Defaults to False.
         """
         self._position = position
         self._step = step
-        self._angle = (angle % 360) * math.pi / 180
+        self._start_angle = angle % 360
+        self._angle = self._start_angle * math.pi / 180
         self._pen_down = False
         self._lines = []
 
+        # Heading (index into the direction table)
+        self._angle_step = angle_step
+        self._heading = None
+        self._heading_count = None
+        self._directions = {}
+        if angle_step:
+            self._heading = 0
+            heading_count = 360 / abs(angle_step)
+            if abs(heading_count - round(heading_count)) < 1e-9:
+                self._heading_count = round(heading_count)
+
+        # Lattice coordinates
+        self._lattice = None
+        self._lattice_origin = position
+        self._lattice_basis = None
+        if lattice and self._heading_count in LATTICE_DIRECTIONS:
+            self._lattice = (0, 0)
+
         self._x_min, self._y_min = position.x, position.y
         self._x_max, self._y_max = position.x, position.y
 
+        # View transform (2x3 affine matrix) applied to the lines when they are read out
+        self._view = ((1, 0, 0), (0, 1, 0))
+
         self._line_drawn = Event()
+        self._segments_drawn = BatchedEvent()
 
     # Events
     def add_line_drawn_subscriber(self, method):
@@ -44,6 +81,33 @@ class Turtle:
         """
         self._line_drawn -= method
 
+    def add_segments_drawn_subscriber(self, method, batch_size: int = None):
+        """
+        Adds a subscriber to the event that triggers when a chunk of lines has been drawn.
+        
+        Parameters:
+            method: The callback function to be called with a list of drawn lines (pairs of Vector objects).
+            batch_size (int): The number of lines delivered in a single chunk. Keeps the current size if None.
+        """
+        if batch_size is not None:
+            self._segments_drawn.batch_size = batch_size
+        self._segments_drawn += method
+
+    def remove_segments_drawn_subscriber(self, method):
+        """
+        Removes a previously added subscriber from the segments drawn event.
+        
+        Parameters:
+            method: The callback function to remove.
+        """
+        self._segments_drawn -= method
+
+    def flush_events(self):
+        """
+        Delivers the pending (incomplete) chunk of drawn lines to the segments drawn subscribers.
+        """
+        self._segments_drawn.flush()
+
     @property
     def position(self) -> Vector:
         """
@@ -54,6 +118,51 @@ class Turtle:
         """
         return Vector(self._position.x, self._position.y)
     
+    @property
+    def bounds(self) -> tuple:
+        """
+        Gets the bounding box of all positions visited by the turtle (with the view transform applied).
+        
+        Returns:
+            tuple: The bounding box as (x_min, y_min, x_max, y_max).
+        """
+        (a, b, e), (c, d, f) = self._view
+        corners = [(a * x + b * y + e, c * x + d * y + f) for x in (self._x_min, self._x_max) for y in (self._y_min, self._y_max)]
+        return (
+            min(x for x, _ in corners), min(y for _, y in corners),
+            max(x for x, _ in corners), max(y for _, y in corners)
+        )
+
+    @property
+    def view(self) -> tuple:
+        """
+        Gets the view transform applied to the lines when they are read out.
+        
+        Returns:
+            tuple: The 2x3 affine matrix as ((a, b, e), (c, d, f)), mapping (x, y) to (a*x + b*y + e, c*x + d*y + f).
+        """
+        return self._view
+
+    @property
+    def lattice_position(self) -> tuple:
+        """
+        Gets the current position of the turtle in integer lattice coordinates.
+        
+        Returns:
+            tuple: A pair of integers (multiples of the first two heading directions), or None if not in lattice mode.
+        """
+        return self._lattice
+
+    @property
+    def state(self) -> tuple:
+        """
+        Gets the complete state of the turtle (position, heading and lattice coordinates).
+        
+        Returns:
+            tuple: An opaque state which can be restored using the 'state' setter.
+        """
+        return (self._position, self._angle, self._heading, self._lattice)
+    
     @property
     def step(self) -> float:
         """
@@ -72,6 +181,8 @@ class Turtle:
         Returns:
             float: The current direction of the turtle in degrees.
         """
+        if self._heading is not None:
+            return (self._start_angle + self._heading * self._angle_step) % 360
         return self._angle * 180 / math.pi
     
     @property
@@ -87,12 +198,16 @@ class Turtle:
     @property
     def lines(self) -> list:
         """
-        Gets the list of lines drawn by the turtle.
+        Gets the list of lines drawn by the turtle (with the view transform applied).
         
         Returns:
             list: A list of lines drawn by the turtle, each represented as a pair of Vector objects.
         """
-        return list(self._lines)
+        if self._view == ((1, 0, 0), (0, 1, 0)):
+            return list(self._lines)
+
+        points = transform_points([point for line in self._lines for point in line], self._view).tolist()
+        return [[Vector(*points[i]), Vector(*points[i + 1])] for i in range(0, len(points), 2)]
     
     @position.setter
     def position(self, new_position: Vector) -> None:
@@ -103,6 +218,19 @@ class Turtle:
             new_position (Vector): The new position of the turtle.
         """
         self._position = new_position
+        self._lattice = None
+
+    @state.setter
+    def state(self, new_state: tuple) -> None:
+        """
+        Restores a state previously obtained from the 'state' getter.
+        
+        Parameters:
+            new_state (tuple): The state to be restored.
+        """
+        self._position, self._angle, self._heading, self._lattice = new_state
+        if self._lattice_origin is None:
+            self._lattice = None
 
     @step.setter
     def step(self, new_step: float) -> None:
@@ -113,6 +241,12 @@ class Turtle:
             new_step (float): The new step length.
         """
         self._step = new_step
+        self._directions.clear()
+        self._lattice_basis = None
+
+        # Lattice coordinates are not comparable across different step lengths
+        self._lattice = None
+        self._lattice_origin = None
 
     @angle.setter
     def angle(self, new_angle: float) -> None:
@@ -124,6 +258,14 @@ class Turtle:
         """
         self._angle = (new_angle % 360) * math.pi / 180
 
+        if self._angle_step:
+            heading = (new_angle - self._start_angle) / self._angle_step
+            if abs(heading - round(heading)) < 1e-9:
+                self._set_heading(round(heading))
+                return
+        self._heading = None
+        self._lattice = None
+
     @pen_down.setter
     def pen_down(self, put_pen_down: bool) -> None:
         """
@@ -147,6 +289,24 @@ class Turtle:
         Parameters:
             rotate_by (float): The angle to rotate the turtle by, in degrees.
         """
+        if self._heading is not None:
+            if rotate_by == self._angle_step:
+                self._set_heading(self._heading + 1)
+                return
+            if rotate_by == -self._angle_step:
+                self._set_heading(self._heading - 1)
+                return
+
+            rotate_by_steps = rotate_by / self._angle_step
+            if abs(rotate_by_steps - round(rotate_by_steps)) < 1e-9:
+                self._set_heading(self._heading + round(rotate_by_steps))
+                return
+
+            # Rotation off the heading table
+            self._angle = self.angle * math.pi / 180
+            self._heading = None
+            self._lattice = None
+
         self._angle += (rotate_by * math.pi / 180) % (2 * math.pi)
 
     def forward(self) -> None:
@@ -155,29 +315,92 @@ class Turtle:
         If the pen is down, it draws a line from the previous position to the new position.
         """
         prev = self._position
-        self._position += self._step * Vector(math.cos(self._angle), math.sin(self._angle))
+        if self._lattice is not None:
+            da, db = LATTICE_DIRECTIONS[self._heading_count][self._heading]
+            a, b = self._lattice[0] + da, self._lattice[1] + db
+            self._lattice = (a, b)
+
+            # Origin and the basis step vectors as plain numbers (they change only with the step length)
+            basis = self._lattice_basis
+            if basis is None:
+                u, v = self._direction(0), self._direction(1)
+                basis = self._lattice_basis = (self._lattice_origin.x, self._lattice_origin.y, u.x, u.y, v.x, v.y)
+            x0, y0, ux, uy, vx, vy = basis
+            x, y = x0 + a * ux + b * vx, y0 + a * uy + b * vy
+            self._position = Vector(x, y)
+        else:
+            if self._heading is not None:
+                self._position += self._direction(self._heading)
+            else:
+                self._position += self._step * Vector(math.cos(self._angle), math.sin(self._angle))
+            x, y = self._position.x, self._position.y
 
         # Recalculate min/max coordinates
-        if self._x_min > self._position.x: self._x_min = self._position.x
-        if self._y_min > self._position.y: self._y_min = self._position.y
-        if self._x_max < self._position.x: self._x_max = self._position.x
-        if self._y_max < self._position.y: self._y_max = self._position.y
+        if self._x_min > x: self._x_min = x
+        if self._y_min > y: self._y_min = y
+        if self._x_max < x: self._x_max = x
+        if self._y_max < y: self._y_max = y
 
         if self._pen_down:
             self._lines.append([prev, self._position])
-            self._line_drawn(prev, self._position)
+            if self._line_drawn:
+                self._line_drawn(prev, self._position)
+            if self._segments_drawn:
+                self._segments_drawn.push((prev, self._position))
 
     def center_to(self, xc: float, yc: float) -> None:
         """
-        Translates all lines (their center) to the specified position.
+        Translates all lines (their center) to the specified position. Only the view transform is updated,
+        the lines are translated when they are read out.
         
         Parameters:
             xc (float): The x-coordinate of the new center position.
             yc (float): The y-coordinate of the new center position.
         """
-        lines_center = Vector((self._x_min + self._x_max) // 2, (self._y_min + self._y_max) // 2)
+        x_min, y_min, x_max, y_max = self.bounds
+        lines_center = Vector((x_min + x_max) // 2, (y_min + y_max) // 2)
         translation_vector = Vector(xc, yc) - lines_center
 
-        for line in self._lines:
-            line[0] += translation_vector
-            line[1] += translation_vector
+        self.transform(((1, 0, translation_vector.x), (0, 1, translation_vector.y)))
+
+    def transform(self, matrix: tuple) -> None:
+        """
+        Composes the view transform with another affine transform (applied after it).
+        
+        Parameters:
+            matrix (tuple): The 2x3 affine matrix as ((a, b, e), (c, d, f)).
+        """
+        (a1, b1, e1), (c1, d1, f1) = matrix
+        (a0, b0, e0), (c0, d0, f0) = self._view
+        self._view = (
+            (a1 * a0 + b1 * c0, a1 * b0 + b1 * d0, a1 * e0 + b1 * f0 + e1),
+            (c1 * a0 + d1 * c0, c1 * b0 + d1 * d0, c1 * e0 + d1 * f0 + f1)
+        )
+
+    def _set_heading(self, heading: int) -> None:
+        """
+        Sets the heading index, reducing it modulo the size of the direction table (if finite).
+        
+        Parameters:
+            heading (int): The new heading index.
+        """
+        if self._heading_count is not None:
+            heading %= self._heading_count
+        self._heading = heading
+
+    def _direction(self, heading: int) -> Vector:
+        """
+        Looks up the step vector for a given heading index, computing it on first use.
+        
+        Parameters:
+            heading (int): The heading index.
+        
+        Returns:
+            Vector: The step vector pointing in the direction of the heading.
+        """
+        direction = self._directions.get(heading)
+        if direction is None:
+            angle = (self._start_angle + heading * self._angle_step) * math.pi / 180
+            direction = self._step * Vector(math.cos(angle), math.sin(angle))
+            self._directions[heading] = direction
+        return direction
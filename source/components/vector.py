@@ -1,14 +1,21 @@
 import math
+import numpy as np
 
 class Vector:
     """
     Represents a 2D vector with basic vector operations.
+
+    Vectors are compact (slotted) and the library treats them as values: operations always return new vectors and
+    never modify their operands (the setters are kept for compatibility). Many points are transformed at once by
+    'transform_points'.
     
     Attributes:
         x (float): X coordinate of the vector.
         y (float): Y coordinate of the vector.
     """
 
+    __slots__ = ("_x", "_y")
+
     def __init__(self, x: float = 0, y: float = 0) -> None:
         """
         Initializes a new Vector instance.
@@ -91,7 +98,7 @@ class Vector:
         Returns:
             list: A list containing the X and Y coordinates of the vector.
         """
-        return [self.x, self.y]
+        return [self._x, self._y]
 
     # Error/exception invoking
     def __raise_instance_error(self, instance: str) -> None:
@@ -120,11 +127,11 @@ class Vector:
         Raises:
             ValueError: If 'other' is not a Vector instance.
         """
-        if (not isinstance(other, Vector)):
+        try:
+            return Vector(self._x + other._x, self._y + other._y)
+        except AttributeError:
             self.__raise_instance_error("Vector")
 
-        return Vector(self._x + other.x, self._y + other.y)
-
     def __sub__(self, other):
         """
         Subtracts another vector from this vector.
@@ -138,10 +145,10 @@ class Vector:
         Raises:
             ValueError: If 'other' is not a Vector instance.
         """
-        if (not isinstance(other, Vector)):
+        try:
+            return Vector(self._x - other._x, self._y - other._y)
+        except AttributeError:
             self.__raise_instance_error("Vector")
-        
-        return Vector(self._x - other.x, self._y - other.y)
     
     def __rmul__(self, number: float):
         """
@@ -165,7 +172,7 @@ class Vector:
         Returns:
             Vector: A new vector that is the result of scalar multiplication.
         """
-        return self.__rmul__(number)
+        return Vector(number * self._x, number * self._y)
 
     def __truediv__(self, number: float):
         """
@@ -177,7 +184,8 @@ class Vector:
         Returns:
             Vector: A new vector that is the result of scalar division.
         """
-        return 1 / number * self
+        factor = 1 / number
+        return Vector(factor * self._x, factor * self._y)
 
     def __str__(self) -> str:
         """
@@ -186,7 +194,7 @@ class Vector:
         Returns:
             str: The string representation of the vector.
         """
-        return __repr__()
+        return self.__repr__()
     
     def __repr__(self) -> str:
         """
@@ -196,3 +204,49 @@ class Vector:
             str: The official string representation of the vector.
         """
         return f"({self._x}, {self._y})"
+
+
+def to_array(points: list) -> np.ndarray:
+    """
+    Converts vectors to an array of coordinates.
+
+    Parameters:
+        points (list): A sequence of Vector objects.
+
+    Returns:
+        np.ndarray: An array of shape (n, 2).
+    """
+    return np.array([(point._x, point._y) for point in points], dtype=float).reshape(-1, 2)
+
+
+def from_array(array: np.ndarray) -> list:
+    """
+    Converts an array of coordinates to vectors.
+
+    Parameters:
+        array (np.ndarray): An array of shape (n, 2) (or any sequence of coordinate pairs).
+
+    Returns:
+        list: A list of Vector objects.
+    """
+    return [Vector(x, y) for x, y in np.asarray(array, dtype=float).reshape(-1, 2).tolist()]
+
+
+def transform_points(points: object, matrix: tuple) -> np.ndarray:
+    """
+    Applies an affine transform to many points at once.
+
+    Parameters:
+        points (object): A sequence of Vector objects or an array of shape (..., 2) of coordinates.
+        matrix (tuple): The 2x3 affine matrix as ((a, b, e), (c, d, f)), mapping (x, y) to
+            (a*x + b*y + e, c*x + d*y + f).
+
+    Returns:
+        np.ndarray: The transformed coordinates (an array of the shape of the points, (n, 2) for vectors).
+    """
+    if not isinstance(points, np.ndarray):
+        points = list(points)
+        points = to_array(points) if points and isinstance(points[0], Vector) else np.asarray(points, dtype=float).reshape(-1, 2)
+
+    matrix = np.asarray(matrix, dtype=float)
+    return points @ matrix[:, :2].T + matrix[:, 2]
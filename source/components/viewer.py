@@ -0,0 +1,394 @@
+import tkinter as tk
+import numpy as np
+
+from .color import color_to_rgb
+from .spatial_index import GridIndex
+from .renderers.geometry_renderer import GeometryRenderer
+from .renderers.raster_renderer import RasterRenderer
+from .renderers.tk_renderer import TkRenderer
+
+
+class Viewer:
+    """
+    Interactive pan/zoom viewer on a Tkinter canvas.
+
+    The view maps screen pixels to world coordinates (the window coordinates of the default view) as
+    world = origin + screen * units. Two modes are supported:
+    - geometry (segments and polygons kept in a GridIndex): only items intersecting the view are drawn; when there
+      are more than 'max_items' of them, they are rasterised into a single image instead (polygons smaller than
+      a pixel drawn as points),
+    - regions (escape-time fractals): the picture is computed on demand by a callback; panning shifts the current
+      picture and computes only the newly exposed strips.
+
+    Dragging with the left mouse button pans, the mouse wheel (or '+' and '-') zooms, arrow keys pan
+    and '0' resets the view.
+    """
+
+    def __init__(self, canvas: tk.Canvas, width: int, height: int, background: str = "white", max_items: int = 20000) -> None:
+        """
+        Initializes an instance of the Viewer class.
+
+        Parameters:
+            canvas (tk.Canvas): The canvas to draw onto.
+            width (int): The width of the view in pixels.
+            height (int): The height of the view in pixels.
+            background (str): The background color. Defaults to "white".
+            max_items (int): The maximum number of items drawn as canvas items. Defaults to 20000.
+        """
+        self._canvas = canvas
+        self._width, self._height = width, height
+        self._background = background
+        self._max_items = max_items
+
+        self._origin = np.zeros(2)
+        self._units = 1.0
+        self._drag = None
+        self._dragged = np.zeros(2)
+        self._photo = None
+        self._redraw_pending = False
+
+        # Geometry mode
+        self._geometry = None
+        self._segments = None
+        self._segment_styles = None
+        self._segment_index = None
+        self._polygons = []
+        self._polygon_offsets = np.zeros(1, dtype=int)
+        self._polygon_index = None
+        self._margin = 0
+
+        # Region mode
+        self._compute_region = None
+        self._cell_size = 1
+        self._image = None
+        self._colors = {None: color_to_rgb(background)}
+
+    @property
+    def view_rectangle(self) -> tuple:
+        """
+        Gets the visible rectangle in world coordinates.
+
+        Returns:
+            tuple: The rectangle as (x_min, y_min, x_max, y_max).
+        """
+        x_max, y_max = self._origin + np.array([self._width, self._height]) * self._units
+        return (self._origin[0], self._origin[1], x_max, y_max)
+
+    @property
+    def zoom_level(self) -> float:
+        """
+        Gets the magnification relative to the default view.
+
+        Returns:
+            float: The magnification.
+        """
+        return 1 / self._units
+
+    def show_geometry(self, geometry: GeometryRenderer) -> None:
+        """
+        Indexes stored geometry and shows it.
+
+        Parameters:
+            geometry (GeometryRenderer): The stored geometry.
+        """
+        self._geometry = geometry
+        self._segments, self._segment_styles = geometry.segments
+        self._segment_index = GridIndex(np.hstack((
+            np.minimum(self._segments[:, :2], self._segments[:, 2:]),
+            np.maximum(self._segments[:, :2], self._segments[:, 2:])
+        )))
+
+        self._polygons = geometry.polygon_batches
+        self._polygon_offsets = np.cumsum([0] + [len(polygons) for polygons, _ in self._polygons])
+        boxes = [np.hstack((polygons.min(axis=1), polygons.max(axis=1))) for polygons, _ in self._polygons]
+        self._polygon_index = GridIndex(np.concatenate(boxes) if boxes else np.empty((0, 4)))
+
+        widths = [style[-1] for style in geometry.styles]
+        self._margin = max(widths, default=0)
+
+        self.redraw()
+
+    def show_regions(self, compute_region: object, cell_size: int = 1) -> None:
+        """
+        Shows a picture computed on demand.
+
+        Parameters:
+            compute_region (object): A function computing the colors of a region. It is called with the region as
+                (x_min, y_min, x_max, y_max) in world coordinates and its width and height in pixels, and returns
+                a list of rows of colors (None for cells which are not drawn), each cell being a square of 'cell_size'
+                pixels.
+            cell_size (int): The size of a cell in pixels. Defaults to 1.
+        """
+        self._compute_region = compute_region
+        self._cell_size = max(1, int(cell_size))
+        self.redraw()
+
+    def bind(self, window: tk.Tk) -> None:
+        """
+        Binds the mouse and keyboard controls.
+
+        Parameters:
+            window (tk.Tk): The window receiving the key events.
+        """
+        self._canvas.bind("<ButtonPress-1>", self.__on_press)
+        self._canvas.bind("<B1-Motion>", self.__on_motion)
+        self._canvas.bind("<ButtonRelease-1>", self.__on_release)
+        self._canvas.bind("<MouseWheel>", lambda event: self.zoom(1.25 if event.delta > 0 else 0.8, event.x, event.y))
+        self._canvas.bind("<Button-4>", lambda event: self.zoom(1.25, event.x, event.y))
+        self._canvas.bind("<Button-5>", lambda event: self.zoom(0.8, event.x, event.y))
+
+        window.bind("<plus>", lambda event: self.zoom(1.25, self._width / 2, self._height / 2))
+        window.bind("<minus>", lambda event: self.zoom(0.8, self._width / 2, self._height / 2))
+        window.bind("<Left>", lambda event: self.pan(self._width // 10, 0))
+        window.bind("<Right>", lambda event: self.pan(-(self._width // 10), 0))
+        window.bind("<Up>", lambda event: self.pan(0, self._height // 10))
+        window.bind("<Down>", lambda event: self.pan(0, -(self._height // 10)))
+        window.bind("0", lambda event: self.reset())
+
+    def pan(self, dx: float, dy: float) -> None:
+        """
+        Moves the picture by a given number of pixels.
+
+        Parameters:
+            dx (float): The horizontal shift in pixels (positive to the right).
+            dy (float): The vertical shift in pixels (positive downwards).
+        """
+        if self._compute_region is not None:
+            # Only whole cells can be reused
+            dx = round(dx / self._cell_size) * self._cell_size
+            dy = round(dy / self._cell_size) * self._cell_size
+            if dx == 0 and dy == 0:
+                self.__show_image(self._image)
+                return
+            self._origin -= np.array([dx, dy]) * self._units
+            self.__shift_regions(int(dx), int(dy))
+            return
+
+        self._origin -= np.array([dx, dy]) * self._units
+        self.redraw()
+
+    def zoom(self, factor: float, x: float, y: float) -> None:
+        """
+        Magnifies the picture around a given screen point.
+
+        Parameters:
+            factor (float): The magnification factor (greater than 1 to zoom in).
+            x (float): The x-coordinate of the fixed screen point.
+            y (float): The y-coordinate of the fixed screen point.
+        """
+        anchor = self._origin + np.array([x, y]) * self._units
+        self._units /= factor
+        self._origin = anchor - np.array([x, y]) * self._units
+
+        if self._compute_region is not None and self._image is not None:
+            # Preview from the current picture, the region is recomputed when idle
+            rows = np.clip(((np.arange(self._height) - y) / factor + y).astype(int), 0, self._height - 1)
+            columns = np.clip(((np.arange(self._width) - x) / factor + x).astype(int), 0, self._width - 1)
+            self._image = self._image[rows][:, columns]
+            self.__show_image(self._image)
+
+        self.__schedule_redraw()
+
+    def reset(self) -> None:
+        """
+        Restores the default view.
+        """
+        self._origin = np.zeros(2)
+        self._units = 1.0
+        self.redraw()
+
+    def redraw(self) -> None:
+        """
+        Redraws the whole view.
+        """
+        self._redraw_pending = False
+        if self._compute_region is not None:
+            self._image = self.__compute_image(0, 0, self._width, self._height)
+            self.__show_image(self._image)
+        elif self._geometry is not None:
+            self.__draw_geometry()
+
+    def __schedule_redraw(self) -> None:
+        """
+        Redraws the view when the event queue is empty (several zoom steps are merged).
+        """
+        if not self._redraw_pending:
+            self._redraw_pending = True
+            self._canvas.after_idle(self.redraw)
+
+    def __on_press(self, event: tk.Event) -> None:
+        self._drag = np.array([event.x, event.y], dtype=float)
+        self._dragged = np.zeros(2)
+
+    def __on_motion(self, event: tk.Event) -> None:
+        if self._drag is None:
+            return
+        position = np.array([event.x, event.y], dtype=float)
+        delta = position - self._drag
+        self._drag = position
+        self._dragged += delta
+        # The drawn items follow the mouse, the view is redrawn when the button is released
+        self._canvas.move("all", delta[0], delta[1])
+
+    def __on_release(self, event: tk.Event) -> None:
+        if self._drag is None:
+            return
+        self._drag = None
+        if self._dragged.any():
+            self.pan(self._dragged[0], self._dragged[1])
+
+    def __draw_geometry(self) -> None:
+        """
+        Draws the indexed items intersecting the view (rasterised if there are too many).
+        """
+        x_min, y_min, x_max, y_max = self.view_rectangle
+        margin = self._margin * self._units
+        rectangle = (x_min - margin, y_min - margin, x_max + margin, y_max + margin)
+
+        segment_indexes = self._segment_index.query(rectangle)
+        polygon_indexes = self._polygon_index.query(rectangle)
+        rasterise = len(segment_indexes) + len(polygon_indexes) > self._max_items or self._geometry.rasters
+
+        if rasterise:
+            renderer = RasterRenderer(None, self._width, self._height, self._background)
+            self.__draw_rasters(renderer.image)
+        else:
+            self._canvas.delete("all")
+            self._photo = None
+            renderer = TkRenderer(self._canvas)
+
+        # Polygons (batch by batch, style by style)
+        batches = np.searchsorted(self._polygon_offsets, polygon_indexes, side="right") - 1
+        for batch in np.unique(batches):
+            polygons, style = self._polygons[batch]
+            fill, outline, width = self._geometry.styles[style]
+            selected = (polygons[polygon_indexes[batches == batch] - self._polygon_offsets[batch]] - self._origin) / self._units
+
+            if rasterise:
+                # Polygons smaller than a pixel drawn as points
+                sizes = (selected.max(axis=1) - selected.min(axis=1)).max(axis=1)
+                small = sizes < 1.5
+                centers = selected[small].mean(axis=1)
+                points = np.hstack((centers, centers))
+                if outline:
+                    renderer.draw_segments(points, outline, width)
+                elif fill:
+                    renderer.draw_segments(points, fill, 1)
+                selected = selected[~small]
+
+            renderer.draw_polygons(selected, fill, outline, width)
+
+        # Segments (style by style)
+        styles = self._segment_styles[segment_indexes]
+        for style in np.unique(styles):
+            color, width = self._geometry.styles[style]
+            selected = (self._segments[segment_indexes[styles == style]] - np.tile(self._origin, 2)) / self._units
+            renderer.draw_segments(selected, color, width)
+
+        if rasterise:
+            self.__show_image(renderer.image)
+
+    def __draw_rasters(self, image: np.ndarray) -> None:
+        """
+        Resamples the stored rasters into an image of the view (nearest cell).
+
+        Parameters:
+            image (np.ndarray): The image of the view.
+        """
+        xs = self._origin[0] + (np.arange(self._width) + 0.5) * self._units
+        ys = self._origin[1] + (np.arange(self._height) + 0.5) * self._units
+        for raster, mask, x, y, cell_size in self._geometry.rasters:
+            columns = np.floor((xs - x) / cell_size).astype(int)
+            rows = np.floor((ys - y) / cell_size).astype(int)
+            valid_columns = (columns >= 0) & (columns < raster.shape[1])
+            valid_rows = (rows >= 0) & (rows < raster.shape[0])
+            if not valid_columns.any() or not valid_rows.any():
+                continue
+
+            target = image[np.ix_(valid_rows, valid_columns)]
+            source_rows, source_columns = np.ix_(rows[valid_rows], columns[valid_columns])
+            drawn = mask[source_rows, source_columns]
+            target[drawn] = raster[source_rows, source_columns][drawn]
+            image[np.ix_(valid_rows, valid_columns)] = target
+
+    def __shift_regions(self, dx: int, dy: int) -> None:
+        """
+        Shifts the current picture and computes the exposed strips.
+
+        Parameters:
+            dx (int): The horizontal shift in pixels.
+            dy (int): The vertical shift in pixels.
+        """
+        image = np.empty_like(self._image)
+        image[:] = self._colors[None]
+
+        # Reused part
+        width, height = self._width - abs(dx), self._height - abs(dy)
+        if width > 0 and height > 0:
+            image[max(dy, 0):max(dy, 0) + height, max(dx, 0):max(dx, 0) + width] = \
+                self._image[max(-dy, 0):max(-dy, 0) + height, max(-dx, 0):max(-dx, 0) + width]
+
+        # Exposed vertical strip (full height), then the exposed horizontal strip (the rest of the width)
+        if dx:
+            left = 0 if dx > 0 else self._width + dx
+            image[:, left:left + abs(dx)] = self.__compute_image(left, 0, abs(dx), self._height)
+        if dy:
+            top = 0 if dy > 0 else self._height + dy
+            left = max(dx, 0)
+            width = self._width - abs(dx)
+            if width > 0:
+                image[top:top + abs(dy), left:left + width] = self.__compute_image(left, top, width, abs(dy))
+
+        self._image = image
+        self.__show_image(image)
+
+    def __compute_image(self, x: int, y: int, width: int, height: int) -> np.ndarray:
+        """
+        Computes a region of the view.
+
+        Parameters:
+            x (int): The x-coordinate of the region (screen pixels).
+            y (int): The y-coordinate of the region (screen pixels).
+            width (int): The width of the region in pixels.
+            height (int): The height of the region in pixels.
+
+        Returns:
+            np.ndarray: An array of shape (height, width, 3) of 8-bit RGB values.
+        """
+        image = np.empty((height, width, 3), dtype=np.uint8)
+        image[:] = self._colors[None]
+        if width <= 0 or height <= 0:
+            return image
+
+        x_min, y_min = self._origin + np.array([x, y]) * self._units
+        x_max, y_max = self._origin + np.array([x + width, y + height]) * self._units
+        raster = self._compute_region((x_min, y_min, x_max, y_max), width, height)
+        if not raster or not raster[0]:
+            return image
+
+        for row in raster:
+            for color in row:
+                if color not in self._colors:
+                    self._colors[color] = color_to_rgb(color)
+        cells = np.array([[self._colors[color] for color in row] for row in raster], dtype=np.uint8)
+        cells = cells.repeat(self._cell_size, axis=0).repeat(self._cell_size, axis=1)[:height, :width]
+        image[:cells.shape[0], :cells.shape[1]] = cells
+        return image
+
+    def __show_image(self, image: np.ndarray) -> None:
+        """
+        Replaces the canvas contents with an image.
+
+        Parameters:
+            image (np.ndarray): An array of shape (height, width, 3) of 8-bit RGB values.
+        """
+        if image is None:
+            return
+        height, width = image.shape[:2]
+        header = f"P6 {width} {height} 255 ".encode()
+        photo = tk.PhotoImage(data=header + np.ascontiguousarray(image).tobytes(), format="PPM")
+
+        self._canvas.delete("all")
+        self._canvas.create_image(0, 0, image=photo, anchor="nw")
+        # Tkinter does not keep a reference to the image
+        self._photo = photo
@@ -1,10 +1,28 @@
 import argparse
+import hashlib
 import sys
 import tkinter as tk
 import json
-import canvasvg
+import time
+import threading
+import traceback
+from contextlib import nullcontext
 
 from components.evaluate import evaluate_recursive
+from components.renderers.i_renderer import IRenderer
+from components.renderers.tk_renderer import TkRenderer
+from components.renderers.svg_renderer import SvgRenderer
+from components.renderers.raster_renderer import RasterRenderer
+from components.renderers.null_renderer import NullRenderer
+from components.renderers.queued_renderer import QueuedRenderer
+from components.renderers.geometry_renderer import GeometryRenderer
+from components.renderers.profiling_renderer import ProfilingRenderer
+from components.profiler import Profiler, profile_phase
+from components.cancellation import RenderCancelled
+from components.viewer import Viewer
+from components.geometry_cache import GeometryCache
+from components.poster import Poster
+from components.color import color_to_rgb
 from components.fractals.fractal import FractalType
 from components.fractals.graphics import *
 from components.fractals.checker import *
@@ -28,12 +46,32 @@ def parse_console_arguments() -> dict:
     parser.add_argument("-fc", "--fill-color", type=str, default='red', help="Fill color (default: red)")
     parser.add_argument("-step", type=int, default=5, help="Step size (default: 5)")
     parser.add_argument("-scale", type=int, default=1, help="Plot scale (default: 1)")
+    parser.add_argument("-fit", action="store_true", help="Fit the step size of an L-system to the window (overrides -step)")
+    parser.add_argument("-viewport", type=float, nargs=4, default=None, metavar=("X_MIN", "Y_MIN", "X_MAX", "Y_MAX"), help="Zoom an L-system into a rectangle given in window coordinates of the whole figure")
     parser.add_argument("-iter", "--iteration-count", type=int, default=None, help="Iteration count (default: None)")
     parser.add_argument("-angle", "--start-angle", type=float, default=0, help="Start angle (default: 0)")
+    parser.add_argument("-chaos", type=int, default=None, help="Render an IFS by random iteration with the given number of samples (default: None)")
+    parser.add_argument("-min-size", type=float, default=None, help="Stop refining IFS figures smaller than the given number of pixels and drop figures outside the window (default: None)")
+    parser.add_argument("-orbits", type=int, default=None, help="Render the orbit density (Buddhabrot) of a TEA fractal from the given number of sampled points (default: None)")
+    parser.add_argument("-orbit-bands", type=int, nargs=3, default=None, metavar=("RED", "GREEN", "BLUE"), help="Iteration limits of the color channels of the orbit density (default: iterations, 1/5 and 1/25 of them)")
+    parser.add_argument("-workers", type=int, default=1, help="Number of worker processes used to interpret an L-system, expand an IFS or sample orbits (default: 1)")
     parser.add_argument("-prompt", action="store_true", help="Enable prompt mode")
+    parser.add_argument("-interactive", action="store_true", help="Open an interactive viewer (drag to pan, mouse wheel to zoom, 0 to reset)")
     parser.add_argument("-path", type=str, help="File path to fractal JSON definition")
-    parser.add_argument("-svg-path", type=str, help="Path to save SVG output")
+    parser.add_argument("--output", type=str, choices=["tk", "svg", "png", "null"], default=None, help="Output backend (default: svg if -svg-path is given, otherwise tk)")
+    parser.add_argument("-svg-path", type=str, help="Path to save SVG output (written directly, no window is displayed)")
+    parser.add_argument("-png-path", type=str, help="Path to save PNG output (used by the png output)")
+    parser.add_argument("-poster", type=str, default=None, metavar="DIR", help="Draw a TEA fractal of any size into the png output, computed tile by tile into files in the given directory (an interrupted run resumes from the completed tiles)")
+    parser.add_argument("-poster-tile", type=int, default=512, help="Size of a poster tile in computed cells (default: 512)")
+    parser.add_argument("-svg-precision", type=int, default=2, help="Number of decimal places of SVG coordinates (default: 2)")
+    parser.add_argument("--no-cache", action="store_true", help="Don't read or store expanded L-system and IFS geometry in the geometry cache")
+    parser.add_argument("-cache-dir", type=str, default=None, help="Directory of the geometry cache (default: fractal-generator/geometry in the cache directory of the user, e.g. ~/.cache)")
+    parser.add_argument("-cache-size", type=int, default=512, help="Maximum size of the geometry cache in MiB (default: 512)")
     parser.add_argument("--no-colors", action='store_false', default=True, help="Don't use colors to distinguish separate iterations (black-and-white coloring is used).")
+    parser.add_argument("--precision", type=str, choices=["single", "double", "double-double", "decimal"], default=None, help="Numeric precision of a TEA fractal (default: chosen from the pixel spacing)")
+    parser.add_argument("-share-tolerance", type=int, default=None, help="Share the orbits of a Julia-type TEA fractal (an approximation): an orbit stops in a cell whose escape time differs by at most this value from its neighbours and inherits it (default: None, every orbit is iterated to the end)")
+    parser.add_argument("--profile", type=str, nargs="?", const="profile.json", default=None, metavar="PATH", help="Save a JSON report of the phase times, hot-path counters and peak memory (default path: profile.json)")
+    parser.add_argument("-profile-stats", type=str, default=None, help="Save cProfile statistics of a profiled run to the given path")
     parser.add_argument("--draw-boundary", action="store_true", help="Draw only the boundary of a TEA fractal (Julia set).")
 
     # Colors
@@ -52,15 +90,37 @@ def parse_console_arguments() -> dict:
     return vars(args)
 
 
+def draw_fractal(fractal: dict, fractal_type: FractalType, args: dict, renderer: IRenderer, cache: GeometryCache = None) -> None:
+    """
+    Draws a fractal of a given type.
+
+    Parameters:
+        fractal (dict): The fractal definition.
+        fractal_type (FractalType): The type of the fractal.
+        args (dict): The parsed command line arguments.
+        renderer (IRenderer): The renderer used for drawing.
+        cache (GeometryCache): The cache of expanded L-system and IFS geometry. Defaults to None.
+    """
+    if fractal_type == FractalType.LSYSTEM:
+        draw_LSystem(fractal, args, renderer, cache)
+    elif fractal_type == FractalType.IFS:
+        with profile_phase(args, "load"):
+            fractal['mappings'] = evaluate_recursive(fractal['mappings'])
+            fractal['starting_figure'] = evaluate_recursive(fractal['starting_figure'])
+            if 'probabilities' in fractal.keys():
+                fractal['probabilities'] = evaluate_recursive(fractal['probabilities'])
+        draw_IFS(fractal, args, renderer, cache)
+    elif fractal_type == FractalType.TEA:
+        draw_TEA(fractal, args, renderer)
+
+
 def main() -> None:
     """
     Main function to initialize the fractal generator application.
 
-    It creates a Tkinter window, parses command line arguments, loads fractal data from a file,
-    determines the fractal type, and draws the fractal on a Tkinter canvas.
+    It parses command line arguments, loads fractal data from a file, determines the fractal type,
+    and draws the fractal with the selected output backend (Tkinter window, SVG or PNG file, or none).
     """
-    window = tk.Tk()
-
     # Attempt to parse command line arguments
     args = parse_console_arguments()
 
@@ -68,9 +128,26 @@ def main() -> None:
     win_height = args['window_height']
     prompt = args["prompt"]
 
+    # Profiling (the profiler is passed to the drawing functions in the arguments)
+    profiler = None
+    if args['profile'] is not None or args['profile_stats'] is not None:
+        if args['interactive']:
+            print("Profile error: profiling is not supported with -interactive.")
+            sys.exit(-1)
+        args['profile'] = args['profile'] or "profile.json"
+        profiler = Profiler(args['profile_stats'])
+        profiler.start()
+    args['profiler'] = profiler
+
+    def write_profile() -> None:
+        profiler.stop()
+        profiler.write(args['profile'])
+        report = profiler.report()
+        print(f"Profile saved to {args['profile']}: {report['wall']:.3f} s, peak memory {report['peak_memory'] / 2**20:.1f} MiB")
+
     # Parse file contents
     file_path = args["path"]
-    with open(file_path) as f:
+    with profile_phase(args, "load"), open(file_path) as f:
         try:
             fractal = json.loads(f.read())
         except json.JSONDecodeError as err:
@@ -85,32 +162,189 @@ def main() -> None:
 
     # Classify fractal
     try:
-        fractal_type = determine_fractal_type(fractal)
+        with profile_phase(args, "load"):
+            fractal_type = determine_fractal_type(fractal)
+    except ValueError as err:
+        print(err)
+        sys.exit(-1)
+
+    if args['orbits'] is not None:
+        if fractal_type != FractalType.TEA or args['interactive']:
+            print("Orbit density error: -orbits requires a TEA fractal and is not supported with -interactive.")
+            sys.exit(-1)
+        if args['orbits'] <= 0 or (args['orbit_bands'] is not None and min(args['orbit_bands']) <= 0):
+            print("Orbit density error: the number of samples and the iteration limits must be positive.")
+            sys.exit(-1)
+
+    if args['chaos'] is not None:
+        if fractal_type != FractalType.IFS:
+            print("Chaos game error: -chaos requires an IFS fractal.")
+            sys.exit(-1)
+        if args['chaos'] <= 0:
+            print("Chaos game error: the number of samples must be positive.")
+            sys.exit(-1)
+
+    if args['share_tolerance'] is not None and args['share_tolerance'] < 0:
+        print("Orbit sharing error: the share tolerance must not be negative.")
+        sys.exit(-1)
+
+    if args['viewport'] is not None:
+        x_min, y_min, x_max, y_max = args['viewport']
+        if not (x_min < x_max and y_min < y_max):
+            print("Viewport error: the viewport must satisfy X_MIN < X_MAX and Y_MIN < Y_MAX.")
+            sys.exit(-1)
+
+    # Colors are resolved by the raster and SVG backends while drawing
+    try:
+        color_to_rgb(args['stroke_color'])
+        color_to_rgb(args['fill_color'])
     except ValueError as err:
         print(err)
         sys.exit(-1)
     
+    output = args['output'] or ("svg" if args['svg_path'] is not None else "tk")
+
+    if args['poster'] is not None:
+        # Out-of-core drawing of large images, the whole grid is never held in memory
+        try:
+            if fractal_type != FractalType.TEA or output != "png" or args['png_path'] is None:
+                raise ValueError("Poster error: -poster requires a TEA fractal, the png output and -png-path.")
+            if args['interactive'] or args['orbits'] is not None or args['draw_boundary']:
+                raise ValueError("Poster error: -poster is not supported with -interactive, -orbits or --draw-boundary.")
+
+            # Everything affecting the computed grid identifies the poster files
+            identity = json.dumps([
+                fractal, args['iteration_count'], args['step'], args['precision'], TEA_share_tolerance(args), win_width, win_height
+            ], sort_keys=True)
+            poster = Poster(
+                args['poster'], win_width // args['step'], win_height // args['step'],
+                hashlib.sha256(identity.encode()).hexdigest(), args['poster_tile']
+            )
+        except (OSError, ValueError) as err:
+            print(err)
+            sys.exit(-1)
+
+        start = time.perf_counter()
+        try:
+            draw_TEA_poster(fractal, args, poster, args['png_path'])
+        finally:
+            poster.close()
+        print(f"Poster saved to {args['png_path']} in {time.perf_counter() - start:.3f} s")
+        if profiler is not None:
+            write_profile()
+        sys.exit(0)
+
+    cache = None
+    if not args['no_cache'] and fractal_type != FractalType.TEA:
+        try:
+            cache = GeometryCache(args['cache_dir'] or GeometryCache.default_directory(), args['cache_size'] << 20)
+        except (OSError, ValueError) as err:
+            print(err)
+            sys.exit(-1)
+
+    if output != "tk":
+        # Draw without a window
+        try:
+            if output == "svg":
+                if args['svg_path'] is None:
+                    raise ValueError("Output error: -svg-path is required for svg output.")
+                renderer = SvgRenderer(args['svg_path'], win_width, win_height, args['svg_precision'])
+            elif output == "png":
+                if args['png_path'] is None:
+                    raise ValueError("Output error: -png-path is required for png output.")
+                renderer = RasterRenderer(args['png_path'], win_width, win_height)
+            else:
+                renderer = NullRenderer()
+        except (OSError, ValueError) as err:
+            print(err)
+            sys.exit(-1)
+
+        counts = renderer
+        if profiler is not None:
+            renderer = ProfilingRenderer(renderer, profiler)
+
+        start = time.perf_counter()
+        try:
+            draw_fractal(fractal, fractal_type, args, renderer, cache)
+        finally:
+            renderer.close()
+
+        if output == "null":
+            print(
+                f"Computed in {time.perf_counter() - start:.3f} s: {counts.segment_count} segments, "
+                f"{counts.polygon_count} polygons, {counts.cell_count} cells"
+            )
+        if profiler is not None:
+            write_profile()
+        sys.exit(0)
+
     # Display window
+    window = tk.Tk()
     window.geometry(f"{win_width}x{win_height}")
     window.title(f"Fractal Generator - {fractal['name']}")
 
     canvas=tk.Canvas(window, width=win_width, height=win_height)
     canvas.pack()
 
-    # Draw fractal
-    if fractal_type == FractalType.LSYSTEM:
-        draw_LSystem(fractal, args, canvas)
-    elif fractal_type == FractalType.IFS:
-        fractal['mappings'] = evaluate_recursive(fractal['mappings'])
-        fractal['starting_figure'] = evaluate_recursive(fractal['starting_figure'])
-        draw_IFS(fractal, args, canvas)
-    elif fractal_type == FractalType.TEA:
-        draw_TEA(fractal, args, canvas)
-    
-    # Save canvas to SVG
-    if args['svg_path'] is not None:
-        canvasvg.saveall(args['svg_path'], canvas)
+    if args['interactive']:
+        viewer = Viewer(canvas, win_width, win_height)
+        if fractal_type == FractalType.TEA:
+            # Regions are computed as they are exposed
+            viewer.show_regions(lambda rectangle, width, height: compute_TEA_region(fractal, args, rectangle, width, height), args['step'])
+        else:
+            geometry = GeometryRenderer()
+            draw_fractal(fractal, fractal_type, args, geometry, cache)
+            viewer.show_geometry(geometry)
+        viewer.bind(window)
+
+        window.mainloop()
+        sys.exit(0)
+
+    # The fractal is computed in a worker thread, the main loop draws the finished chunks as they arrive
+    queued = QueuedRenderer()
+    target = TkRenderer(canvas)
+    if profiler is not None:
+        target = ProfilingRenderer(target, profiler)
+
+    # The computation stops as soon as drawing is cancelled, not only at its next submission
+    args['cancel'] = queued.cancel_event
+    errors = []
+
+    def compute() -> None:
+        try:
+            with profiler.thread() if profiler is not None else nullcontext():
+                draw_fractal(fractal, fractal_type, args, queued, cache)
+        except RenderCancelled:
+            pass
+        except Exception as err:
+            # Reported on stderr and in the title of the window (which can be changed only by the main loop)
+            traceback.print_exc()
+            errors.append(err)
+        finally:
+            queued.close()
+
+    def pump() -> None:
+        if queued.drain(target):
+            window.after(10, pump)
+            return
+        if errors:
+            window.title(f"Fractal Generator - {fractal['name']} (error: {str(errors[0]) or type(errors[0]).__name__})")
+        elif queued.cancelled:
+            window.title(f"Fractal Generator - {fractal['name']} (cancelled)")
+        if profiler is not None:
+            # Everything computed has been drawn
+            write_profile()
+
+    def close() -> None:
+        queued.cancel()
+        window.destroy()
+
+    # Escape stops the computation, closing the window stops it as well
+    window.bind("<Escape>", lambda event: queued.cancel())
+    window.protocol("WM_DELETE_WINDOW", close)
 
+    threading.Thread(target=compute, daemon=True).start()
+    window.after(0, pump)
     window.mainloop()
     sys.exit(0)
 
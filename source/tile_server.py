@@ -0,0 +1,366 @@
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from components.tile_cache import TileCache
+from components.renderers.raster_renderer import RasterRenderer
+from components.fractals.fractal import FractalType
+from components.fractals.graphics import compute_TEA_region
+from components.fractals.checker import determine_fractal_type
+
+
+# Size of a tile in pixels
+TILE_SIZE = 256
+
+# Deepest zoom level served (tile bounds are computed in double precision, deeper tiles would be misplaced)
+MAX_ZOOM = 40
+
+TILE_PATH = re.compile(r"^/(\d+)/(\d+)/(\d+)\.png$")
+
+STATUS_TEXT = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 500: "Internal Server Error"}
+
+
+def parse_console_arguments() -> dict:
+    """
+    Parses command line arguments for the tile server.
+
+    Returns:
+        dict: A dictionary containing the parsed command line arguments.
+    """
+    parser = argparse.ArgumentParser(description="Fractal Tile Server Arguments")
+
+    parser.add_argument("-path", type=str, required=True, help="File path to TEA fractal JSON definition")
+    parser.add_argument("-host", type=str, default="127.0.0.1", help="Host to listen on (default: 127.0.0.1)")
+    parser.add_argument("-port", type=int, default=8080, help="Port to listen on (default: 8080)")
+    parser.add_argument("-step", type=int, default=1, help="Size of a computed cell in pixels, must divide the tile size (default: 1)")
+    parser.add_argument("-iter", "--iteration-count", type=int, default=None, help="Iteration count (default: None)")
+    parser.add_argument("-workers", type=int, default=os.cpu_count(), help="Number of worker processes computing tiles (default: number of CPUs)")
+    parser.add_argument("-cache-dir", type=str, default="tile_cache", help="Directory of the disk tile cache (default: tile_cache)")
+    parser.add_argument("-memory-tiles", type=int, default=1024, help="Number of tiles kept in memory (default: 1024)")
+    parser.add_argument("--no-colors", action='store_false', default=True, help="Don't use colors to distinguish separate iterations (black-and-white coloring is used).")
+    parser.add_argument("--precision", type=str, choices=["single", "double", "double-double", "decimal"], default=None, help="Numeric precision (default: chosen from the pixel spacing of every zoom level)")
+    parser.add_argument("--colors-file", type=str, default=".\\components\\json\\colors\\basic.json", help="Path to JSON defining interpolating colors")
+
+    return vars(parser.parse_args())
+
+
+def tile_region(fractal: dict, args: dict, z: int, x: int, y: int) -> tuple:
+    """
+    Maps a tile to a region of a TEA fractal.
+
+    Zoom level 0 is a single tile showing the square circumscribing the plot range (centered, so that the aspect ratio
+    is kept); every further level halves the tiles of the previous one.
+
+    Parameters:
+        fractal (dict): The fractal definition.
+        args (dict): Configuration for drawing (step, iteration count and colors are used).
+        z (int): The zoom level.
+        x (int): The column of the tile.
+        y (int): The row of the tile.
+
+    Returns:
+        tuple: The fractal definition with the square plot range, the drawing configuration for the whole zoom level
+            and the tile rectangle in its window coordinates.
+    """
+    x_min, x_max, y_min, y_max = fractal["plot_range"]
+    half = max(x_max - x_min, y_max - y_min) / 2
+    x_center, y_center = (x_min + x_max) / 2, (y_min + y_max) / 2
+
+    square = dict(fractal, plot_range=[x_center - half, x_center + half, y_center - half, y_center + half])
+    size = TILE_SIZE << z
+    level_args = dict(args, window_width=size, window_height=size)
+    rectangle = (x * TILE_SIZE, y * TILE_SIZE, (x + 1) * TILE_SIZE, (y + 1) * TILE_SIZE)
+    return square, level_args, rectangle
+
+
+def render_tile(fractal: dict, args: dict, key: tuple, path: str) -> bytes:
+    """
+    Computes a tile and writes it as a PNG file (run in a worker process).
+
+    Parameters:
+        fractal (dict): The fractal definition.
+        args (dict): Configuration for drawing.
+        key (tuple): The tile as (z, x, y).
+        path (str): The path of the tile file.
+
+    Returns:
+        bytes: The encoded tile.
+    """
+    square, level_args, rectangle = tile_region(fractal, args, *key)
+    step = args["step"]
+    raster = compute_TEA_region(square, level_args, rectangle, TILE_SIZE, TILE_SIZE)
+
+    # Written under a temporary name first, so that a tile file is never seen incomplete
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temporary = f"{path}.{os.getpid()}.tmp"
+    renderer = RasterRenderer(temporary, TILE_SIZE, TILE_SIZE)
+    renderer.draw_raster(raster, cell_size=step)
+    renderer.close()
+    os.replace(temporary, path)
+
+    with open(path, "rb") as f:
+        return f.read()
+
+
+class TileServer:
+    """
+    Asynchronous HTTP server of XYZ tiles ('/{z}/{x}/{y}.png') of a TEA fractal.
+
+    Tiles are looked up in the in-memory LRU, then on disk, and only then computed in a process pool. Concurrent
+    requests for a tile which is being loaded or computed wait for the same computation. Counters of cache hits
+    and misses and request latencies are served as JSON at '/stats'.
+    """
+
+    def __init__(self, fractal: dict, args: dict, cache: TileCache, workers: int = None) -> None:
+        """
+        Initializes an instance of the TileServer class.
+
+        Parameters:
+            fractal (dict): The fractal definition.
+            args (dict): Configuration for drawing (step, iteration count and colors are used).
+            cache (TileCache): The tile cache.
+            workers (int): The number of worker processes. Defaults to the number of CPUs.
+        """
+        self._fractal = fractal
+        self._args = args
+        self._cache = cache
+        self._workers = workers
+        self._pool = None
+        self._pending = {}
+
+        self._counters = {"requests": 0, "memory_hits": 0, "disk_hits": 0, "misses": 0, "coalesced": 0, "errors": 0}
+        self._latencies = {source: [0, 0.0, 0.0] for source in ("memory", "disk", "computed")}
+
+    @property
+    def stats(self) -> dict:
+        """
+        Gets the cache counters and latencies (count, mean and maximum in milliseconds) by the tile source.
+
+        Returns:
+            dict: The statistics.
+        """
+        return dict(
+            self._counters,
+            memory_tiles=len(self._cache),
+            pending=len(self._pending),
+            latency={
+                source: {
+                    "count": count,
+                    "mean_ms": round(1000 * total / count, 3) if count else 0,
+                    "max_ms": round(1000 * maximum, 3)
+                }
+                for source, (count, total, maximum) in self._latencies.items()
+            }
+        )
+
+    async def tile(self, key: tuple) -> bytes:
+        """
+        Gets a tile (from a cache or computed).
+
+        Parameters:
+            key (tuple): The tile as (z, x, y).
+
+        Returns:
+            bytes: The encoded tile.
+        """
+        start = time.perf_counter()
+        data = self._cache.get(key)
+        if data is not None:
+            self._counters["memory_hits"] += 1
+            self.__record("memory", start)
+            return data
+
+        task = self._pending.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self.__load(key))
+            self._pending[key] = task
+            task.add_done_callback(lambda _: self._pending.pop(key, None))
+        else:
+            self._counters["coalesced"] += 1
+
+        # Shielded, so that a disconnected client does not cancel the tile for the others
+        data, source = await asyncio.shield(task)
+        self.__record(source, start)
+        return data
+
+    async def serve(self, host: str, port: int) -> None:
+        """
+        Serves tiles until cancelled.
+
+        Parameters:
+            host (str): The host to listen on.
+            port (int): The port to listen on.
+        """
+        with ProcessPoolExecutor(max_workers=self._workers) as self._pool:
+            server = await asyncio.start_server(self.__handle, host, port)
+            async with server:
+                await server.serve_forever()
+
+    async def __load(self, key: tuple) -> tuple:
+        """
+        Loads a tile from disk or computes it, and puts it into memory.
+
+        Parameters:
+            key (tuple): The tile as (z, x, y).
+
+        Returns:
+            tuple: The encoded tile and its source ("disk" or "computed").
+        """
+        loop = asyncio.get_running_loop()
+        data = await loop.run_in_executor(None, self._cache.load, key)
+        if data is not None:
+            self._counters["disk_hits"] += 1
+            source = "disk"
+        else:
+            self._counters["misses"] += 1
+            data = await loop.run_in_executor(self._pool, render_tile, self._fractal, self._args, key, self._cache.path(key))
+            source = "computed"
+
+        self._cache.put(key, data)
+        return data, source
+
+    def __record(self, source: str, start: float) -> None:
+        """
+        Records the latency of a request.
+
+        Parameters:
+            source (str): The source of the tile ("memory", "disk" or "computed").
+            start (float): The time the request started.
+        """
+        elapsed = time.perf_counter() - start
+        latency = self._latencies[source]
+        latency[0] += 1
+        latency[1] += elapsed
+        latency[2] = max(latency[2], elapsed)
+
+    async def __handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """
+        Handles a connection (HTTP/1.1 with keep-alive, GET requests only).
+
+        Parameters:
+            reader (asyncio.StreamReader): The connection reader.
+            writer (asyncio.StreamWriter): The connection writer.
+        """
+        try:
+            while True:
+                request = await reader.readline()
+                if not request:
+                    break
+
+                # Headers are read up to the empty line
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip().lower()
+
+                parts = request.decode("latin-1").split()
+                keep_alive = len(parts) == 3 and parts[2] == "HTTP/1.1" and headers.get("connection") != "close"
+                status, content_type, body = await self.__respond(parts)
+
+                writer.write(
+                    f"HTTP/1.1 {status} {STATUS_TEXT[status]}\r\n"
+                    f"Content-Type: {content_type}\r\n"
+                    f"Content-Length: {len(body)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1") + body
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def __respond(self, parts: list) -> tuple:
+        """
+        Builds the response to a request.
+
+        Parameters:
+            parts (list): The parts of the request line (method, target and version).
+
+        Returns:
+            tuple: The status code, the content type and the body.
+        """
+        if len(parts) != 3:
+            return 400, "text/plain", b"Malformed request."
+        method, target, _ = parts
+        if method != "GET":
+            return 405, "text/plain", b"Only GET requests are supported."
+
+        target = target.split("?")[0]
+        if target == "/stats":
+            return 200, "application/json", json.dumps(self.stats).encode()
+
+        match = TILE_PATH.match(target)
+        if match is None:
+            return 404, "text/plain", b"Unknown path, tiles are served as /{z}/{x}/{y}.png."
+
+        z, x, y = (int(value) for value in match.groups())
+        if z > MAX_ZOOM or x >= 1 << z or y >= 1 << z:
+            return 400, "text/plain", b"Tile coordinates out of range."
+
+        self._counters["requests"] += 1
+        try:
+            return 200, "image/png", await self.tile((z, x, y))
+        except Exception as err:
+            self._counters["errors"] += 1
+            return 500, "text/plain", str(err).encode()
+
+
+def main() -> None:
+    """
+    Main function of the tile server.
+
+    It parses command line arguments, loads a TEA fractal definition and serves its tiles. The disk cache of every
+    definition (together with the iteration count, step, precision and colors) is kept in its own subdirectory.
+    """
+    args = parse_console_arguments()
+
+    with open(args["path"]) as f:
+        try:
+            fractal = json.loads(f.read())
+        except json.JSONDecodeError as err:
+            print(err)
+            sys.exit(-1)
+
+    if args["iteration_count"] is None:
+        args["iteration_count"] = fractal.get("iterations")
+
+    try:
+        if determine_fractal_type(fractal) != FractalType.TEA:
+            raise ValueError("Tile server error: only TEA fractals can be served.")
+        if args["iteration_count"] is None:
+            raise ValueError("Tile server error: iteration count is not specified.")
+        if args["step"] <= 0 or TILE_SIZE % args["step"]:
+            raise ValueError(f"Tile server error: step must divide the tile size ({TILE_SIZE}).")
+
+        with open(args["colors_file"]) as f:
+            colors = f.read()
+    except (OSError, ValueError) as err:
+        print(err)
+        sys.exit(-1)
+
+    # Everything affecting the tile images identifies the cache
+    identity = json.dumps([fractal, args["iteration_count"], args["step"], args["no_colors"], args["precision"], colors], sort_keys=True)
+    directory = os.path.join(args["cache_dir"], hashlib.sha256(identity.encode()).hexdigest()[:16])
+
+    server = TileServer(fractal, args, TileCache(directory, args["memory_tiles"]), args["workers"])
+    print(f"Serving {fractal['name']} at http://{args['host']}:{args['port']}/{{z}}/{{x}}/{{y}}.png (cache: {directory})")
+    try:
+        asyncio.run(server.serve(args["host"], args["port"]))
+    except KeyboardInterrupt:
+        pass
+    sys.exit(0)
+
+
+if __name__ == '__main__':
+    main()